@@ -0,0 +1,65 @@
+"""Benchmark `mcphub ps` answered by the daemon against a fresh ProcessManager.
+
+Starts ``--servers`` listening servers through a daemon, then compares
+what each ``ps`` cost before the daemon (build a ProcessManager, read the
+store, take a socket snapshot) with one request over the daemon's socket.
+
+Run with: python benchmarks/bench_daemon.py [--servers 50]
+"""
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from mcphub.cli.daemon import Daemon, DaemonClient
+from mcphub.cli.process_manager import ProcessManager
+
+SERVER = """
+import socket, sys, time
+s = socket.socket()
+s.bind(("127.0.0.1", int(sys.argv[sys.argv.index("--port") + 1])))
+s.listen()
+time.sleep(3600)
+"""
+
+
+def timed(label: str, func, repeat: int = 1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label:<44} {elapsed * 1e3:10.3f} ms")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--servers", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        daemon = Daemon(data_dir)
+        thread = threading.Thread(target=daemon.serve, daemon=True)
+        thread.start()
+        while DaemonClient.connect(data_dir) is None:
+            time.sleep(0.01)
+        client = DaemonClient.connect(data_dir)
+        try:
+            timed(f"start {args.servers} servers through the daemon", lambda: [
+                client.call("start", name=f"server-{i}", command=[sys.executable, "-c", SERVER], env={})
+                for i in range(args.servers)
+            ])
+            timed("ps without daemon (fresh ProcessManager)",
+                  lambda: ProcessManager(data_dir=data_dir).list_processes(), repeat=5)
+            timed("ps through the daemon", lambda: client.call("list"), repeat=20)
+            timed("daemon ping", lambda: client.call("ping"), repeat=100)
+        finally:
+            client.call("shutdown")
+            thread.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Benchmark MCPServersParams against a large server registry.
+
+Run with: python benchmarks/bench_params.py [--entries 10000]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from mcphub.mcp_servers.config import config_cache
+from mcphub.mcp_servers.params import MCPServersParams
+
+
+def make_registry(path: Path, entries: int) -> None:
+    servers = {
+        f"server-{i}": {
+            "package_name": f"org-{i % 100}/server",
+            "command": "npx",
+            "args": ["-y", f"@org-{i % 100}/server-{i}"],
+            "env": {"API_KEY": "${API_KEY}"},
+            "tags": [f"team-{i % 20}", "registry"],
+        }
+        for i in range(entries)
+    }
+    path.write_text(json.dumps({"mcpServers": servers}))
+    # Backdate the file so the config cache does not treat it as freshly written
+    os.utime(path, ns=(0, 0))
+
+
+def timed(label: str, func, repeat: int = 1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label:<40} {elapsed * 1e3:10.3f} ms")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = Path(tmp) / ".mcphub.json"
+        make_registry(config_path, args.entries)
+        print(f"Registry with {args.entries} entries")
+
+        config_cache.invalidate()
+        timed("load (eager validation, cold)", lambda: MCPServersParams(str(config_path)))
+        timed("load (eager validation, cached file)", lambda: MCPServersParams(str(config_path)))
+        params = timed("load (lazy validation)", lambda: MCPServersParams(str(config_path), lazy=True))
+
+        name = f"server-{args.entries // 2}"
+        timed("first lookup (validates entry)", lambda: params.retrieve_server_params(name))
+        timed("repeat lookup", lambda: params.retrieve_server_params(name), repeat=10_000)
+        timed("find_by_tag (1/20 of entries)", lambda: params.find_by_tag("team-7"), repeat=10)
+        timed("find_by_package (1/100 of entries)", lambda: params.find_by_package("org-3/server"), repeat=100)
+        timed("list view (first access)", lambda: params.servers_params)
+        timed("list view (cached)", lambda: params.servers_params, repeat=10_000)
+
+
+if __name__ == "__main__":
+    main()
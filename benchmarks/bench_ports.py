@@ -0,0 +1,89 @@
+"""Benchmark port discovery in `mcphub ps` with many running servers.
+
+Starts ``--servers`` processes that each listen on a TCP port, records them
+in a ProcessManager, and compares listing them against the previous
+per-process scan, which called ``connections()`` on every process and
+child and repeated the scan for each port to look for conflicts.
+
+Run with: python benchmarks/bench_ports.py [--servers 100]
+"""
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import psutil
+
+from mcphub.cli.process_manager import ProcessManager
+
+LISTENER = """
+import socket, sys, time
+s = socket.socket()
+s.bind(("127.0.0.1", 0))
+s.listen()
+print(s.getsockname()[1], flush=True)
+time.sleep(3600)
+"""
+
+
+def legacy_ports(process: psutil.Process) -> set:
+    ports = set()
+    for member in [process, *process.children(recursive=True)]:
+        for conn in getattr(member, "net_connections", member.connections)():
+            if conn.laddr and conn.status == "LISTEN":
+                ports.add(conn.laddr.port)
+    return ports
+
+
+def legacy_ps(pids) -> None:
+    """The previous list_processes: ports per process, then a full rescan per port."""
+    for pid in pids:
+        for port in legacy_ports(psutil.Process(pid)):
+            for other in pids:
+                if port in legacy_ports(psutil.Process(other)):
+                    break
+
+
+def timed(label: str, func, repeat: int = 1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label:<44} {elapsed * 1e3:10.3f} ms")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--servers", type=int, default=100)
+    args = parser.parse_args()
+
+    servers = [subprocess.Popen([sys.executable, "-c", LISTENER], stdout=subprocess.PIPE, text=True)
+               for _ in range(args.servers)]
+    try:
+        for server in servers:
+            server.stdout.readline()
+        with tempfile.TemporaryDirectory() as tmp:
+            manager = ProcessManager(data_dir=Path(tmp))
+            for i, server in enumerate(servers):
+                manager.store.put(server.pid, {
+                    "name": f"server-{i}", "command": "python listener.py", "status": "running",
+                    "start_time": datetime.now().isoformat(), "ports": [], "warnings": [],
+                    "create_time": psutil.Process(server.pid).create_time(),
+                })
+            print(f"{args.servers} running servers")
+            pids = [server.pid for server in servers]
+            timed("legacy ps (per-process scans)", lambda: legacy_ps(pids))
+            timed("ps (one socket snapshot)", manager.list_processes, repeat=5)
+            timed("get_process_info (one server)", lambda: manager.get_process_info(pids[0]), repeat=5)
+    finally:
+        for server in servers:
+            server.kill()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
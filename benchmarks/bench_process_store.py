@@ -0,0 +1,87 @@
+"""Benchmark the process store behind `mcphub ps` with many records.
+
+Compares the previous processes.json handling, which rewrote the whole
+file for every record listed, with the SQLite store.
+
+Run with: python benchmarks/bench_process_store.py [--records 10000] [--legacy-sample 200]
+"""
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from mcphub.cli.process_manager import ProcessManager
+from mcphub.cli.process_store import ProcessStore
+
+
+def make_record(i: int) -> dict:
+    return {
+        "name": f"server-{i}",
+        "command": f"npx -y @org/server-{i} --port {3000 + i % 1000}",
+        "start_time": f"2024-03-20T10:{i // 600 % 60:02d}:{i // 10 % 60:02d}",
+        "env": {"API_KEY": f"secret-{i}", "REGION": "eu"},
+        "pid": 100_000 + i,
+        "ports": [3000 + i % 1000],
+        "status": "stopped" if i % 50 else "running",
+        "warnings": [],
+    }
+
+
+def timed(label: str, func, repeat: int = 1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label:<44} {elapsed * 1e3:10.3f} ms")
+    return result
+
+
+def legacy_ps(path: Path, sample: int) -> float:
+    """Time the old list_processes: one full-file rewrite per record, for ``sample`` records."""
+    with open(path) as f:
+        processes = json.load(f)
+    start = time.perf_counter()
+    for pid_str in list(processes)[:sample]:
+        processes[pid_str]["status"] = processes[pid_str]["status"]
+        with open(path, "w") as f:
+            json.dump(processes, f, indent=2)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=10_000)
+    parser.add_argument("--legacy-sample", type=int, default=200,
+                        help="Records to rewrite for the legacy timing, extrapolated to --records")
+    args = parser.parse_args()
+    records = {str(100_000 + i): make_record(i) for i in range(args.records)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        print(f"{args.records} process records")
+
+        legacy_path = tmp / "legacy" / "processes.json"
+        legacy_path.parent.mkdir()
+        legacy_path.write_text(json.dumps(records, indent=2))
+        sample = min(args.legacy_sample, args.records)
+        elapsed = legacy_ps(legacy_path, sample) * args.records / sample
+        print(f"{'legacy ps (rewrite per record, extrapolated)':<44} {elapsed * 1e3:10.3f} ms")
+
+        store = ProcessStore(tmp / "import" / "processes.db", legacy_path=legacy_path)
+        timed("import processes.json into SQLite", lambda: len(store))
+
+        manager = ProcessManager(data_dir=tmp / "import")
+        timed("store.all()", manager.store.all, repeat=5)
+        # Stopped records are listed without probing or writing
+        only_stopped = {pid: {**info, "status": "stopped"} for pid, info in records.items()}
+        manager.store.clear()
+        for pid, info in only_stopped.items():
+            manager.store.put(int(pid), info)
+        timed("ps (list_processes, all stopped)", manager.list_processes, repeat=5)
+        timed("single-row status update", lambda: manager.store.update(100_000, {"status": "running"}), repeat=100)
+        timed("insert one record", lambda: manager.store.put(99_999, make_record(0)), repeat=100)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Benchmark shared environments and bytecode precompilation for Python servers.
+
+Compares building one virtualenv per checkout with linking a shared,
+precompiled environment, and the first spawn of a server with and
+without precompiled bytecode.
+
+Run with: python benchmarks/bench_python_spawn.py [--checkouts 8] [--modules 400]
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from mcphub.mcp_servers.envs import SharedEnvStore, compile_bytecode
+
+
+def make_checkout(path: Path, modules: int) -> Path:
+    """A server package whose import pulls in ``modules`` modules."""
+    package = path / "bench_server"
+    package.mkdir(parents=True)
+    body = "\n".join(
+        f"def handler_{j}(value):\n    return [value * {j} for _ in range(3)]\n" for j in range(40)
+    )
+    for i in range(modules):
+        (package / f"tool_{i}.py").write_text(body)
+    (package / "__init__.py").write_text("".join(f"from . import tool_{i}\n" for i in range(modules)))
+    (path / "requirements.txt").write_text("# no third-party dependencies\n")
+    return path
+
+
+def run(command, cwd=None, env=None):
+    subprocess.run(command, cwd=cwd, env={**os.environ, **(env or {})}, check=True, capture_output=True)
+
+
+def tree_blocks(paths) -> int:
+    """Disk usage in bytes, counting hardlinked files once."""
+    seen = set()
+    total = 0
+    for root in paths:
+        for directory, _, files in os.walk(root):
+            for name in files:
+                stat = os.lstat(os.path.join(directory, name))
+                if (stat.st_dev, stat.st_ino) not in seen:
+                    seen.add((stat.st_dev, stat.st_ino))
+                    total += stat.st_blocks * 512
+    return total
+
+
+def timed(label: str, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<48} {(time.perf_counter() - start) * 1e3:10.1f} ms")
+    return result
+
+
+def first_spawn(python: Path, checkout: Path) -> float:
+    start = time.perf_counter()
+    run([str(python), "-c", "import bench_server"], cwd=checkout)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--checkouts", type=int, default=8)
+    parser.add_argument("--modules", type=int, default=400)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        print(f"{args.checkouts} checkouts, {args.modules} modules each")
+
+        # Before: every checkout builds its own environment
+        isolated = [make_checkout(tmp / "isolated" / f"srv-{i}", args.modules) for i in range(args.checkouts)]
+
+        def build_isolated():
+            for checkout in isolated:
+                run([sys.executable, "-m", "venv", str(checkout / ".venv")])
+                run([str(checkout / ".venv" / "bin" / "python"), "-m", "pip", "install",
+                     "--disable-pip-version-check", "-r", "requirements.txt"], cwd=checkout)
+
+        timed("per-checkout venv + pip install", build_isolated)
+        print(f"{'  disk used':<48} {tree_blocks(c / '.venv' for c in isolated) / 2 ** 20:10.1f} MB")
+
+        # After: one shared environment, hardlinked into each checkout
+        store = SharedEnvStore(tmp / "envs")
+        shared = [make_checkout(tmp / "shared" / f"srv-{i}", args.modules) for i in range(args.checkouts)]
+
+        def link_shared():
+            for checkout in shared:
+                env_dir = store.ensure(checkout / "requirements.txt", run)
+                store.link(env_dir, checkout / ".venv")
+
+        timed("shared env (built once, linked)", link_shared)
+        paths = [store.root] + [c / ".venv" for c in shared]
+        print(f"{'  disk used':<48} {tree_blocks(paths) / 2 ** 20:10.1f} MB")
+        timed("link into one more checkout", lambda: store.link(
+            env_dir=store.ensure(shared[0] / "requirements.txt", run),
+            target=make_checkout(tmp / "shared" / "extra", 1) / ".venv",
+        ))
+
+        # First spawn, without and with precompiled bytecode
+        cold, warm = isolated[0], shared[0]
+        shutil.rmtree(warm / "bench_server" / "__pycache__", ignore_errors=True)
+        timed("precompile checkout", lambda: compile_bytecode(str(warm / ".venv" / "bin" / "python"), warm))
+        before = first_spawn(cold / ".venv" / "bin" / "python", cold)
+        after = first_spawn(warm / ".venv" / "bin" / "python", warm)
+        print(f"{'first spawn without precompiled bytecode':<48} {before * 1e3:10.1f} ms")
+        print(f"{'first spawn with precompiled bytecode':<48} {after * 1e3:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Benchmark the cost of sampling server resources for `mcphub top`.
+
+Starts ``--servers`` idle servers, each with one child process, and times
+one sampling pass over all of them.
+
+Run with: python benchmarks/bench_sampler.py [--servers 50]
+"""
+import argparse
+import subprocess
+import sys
+import time
+
+import psutil
+
+from mcphub.cli.resources import ResourceSampler
+
+SERVER = """
+import subprocess, sys, time
+subprocess.Popen([sys.executable, "-c", "import time; time.sleep(3600)"])
+print("ready", flush=True)
+time.sleep(3600)
+"""
+
+
+def timed(label: str, func, repeat: int = 1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label:<44} {elapsed * 1e3:10.3f} ms")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--servers", type=int, default=50)
+    args = parser.parse_args()
+
+    servers = [subprocess.Popen([sys.executable, "-c", SERVER], stdout=subprocess.PIPE, text=True)
+               for _ in range(args.servers)]
+    try:
+        for server in servers:
+            server.stdout.readline()
+        sampler = ResourceSampler()
+        for i, server in enumerate(servers):
+            sampler.track(server.pid, f"server-{i}")
+        print(f"{args.servers} servers, {2 * args.servers} processes")
+        timed("first sample (new psutil handles)", sampler.sample)
+        timed("sample (cached handles)", sampler.sample, repeat=20)
+        timed("export", sampler.export, repeat=20)
+    finally:
+        for server in servers:
+            for child in psutil.Process(server.pid).children(recursive=True):
+                child.kill()
+            server.kill()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
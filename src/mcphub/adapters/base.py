@@ -1,3 +1,4 @@
+import asyncio
 from abc import ABC
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator, List, Tuple, Any
@@ -21,10 +22,12 @@ class MCPBaseAdapter(ABC):
     def get_server_params(self, mcp_name: str) -> StdioServerParameters:
         """Convert server config to StdioServerParameters"""
         server_config = self.get_server_config(mcp_name)
+        env = self.servers_params.resolve_env(server_config)
+        command, args = self.servers_params.launch_command(server_config, env)
         return StdioServerParameters(
-            command=server_config.command,
-            args=server_config.args,
-            env=server_config.env,
+            command=command,
+            args=args,
+            env=env,
             cwd=server_config.cwd
         )
     
@@ -37,7 +40,7 @@ class MCPBaseAdapter(ABC):
     @asynccontextmanager
     async def create_session(self, mcp_name: str) -> AsyncGenerator[ClientSession, None]:
         """Create and initialize a client session for the given MCP server"""
-        server_params = self.get_server_params(mcp_name)
+        server_params = await asyncio.to_thread(self.get_server_params, mcp_name)
         async with stdio_client(server_params) as (read, write):
             async with ClientSession(read, write) as session:
                 await session.initialize()
@@ -5,10 +5,12 @@ try:
     class MCPOpenAIAgentsAdapter(MCPBaseAdapter):
         def create_server(self, mcp_name: str, cache_tools_list: bool = True) -> MCPServerStdio:
             server_config = self.get_server_config(mcp_name)
+            env = self.servers_params.resolve_env(server_config)
+            command, args = self.servers_params.launch_command(server_config, env)
             server_params = MCPServerStdioParams(
-                command=server_config.command,
-                args=server_config.args,
-                env=server_config.env,
+                command=command,
+                args=args,
+                env=env,
                 cwd=server_config.cwd
             )
             return MCPServerStdio(
@@ -2,12 +2,11 @@
 import argparse
 import json
 import sys
-import subprocess
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 import os
-from urllib.parse import urlparse
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
+from rich.live import Live
 from rich.table import Table
 import time
 from rich.prompt import Confirm
@@ -19,6 +18,7 @@ from .utils import (
     save_config,
     DEFAULT_CONFIG,
     get_config_path,
+    get_config_store,
     remove_server_config,
     list_configured_servers,
     console,
@@ -29,56 +29,54 @@ from .utils import (
     show_help_text,
     show_status,
     show_code_block,
-    get_server_status
+    get_server_status,
+    check_env_var,
+    get_env_resolver,
+    get_launch_resolver,
+    load_add_manifest,
+    server_name_from_repo_url
 )
+from .daemon import Daemon, DaemonClient, ensure_daemon
+from .logs import follow, log_path, tail
 from .process_manager import ProcessManager
-
-def check_env_var(var: str) -> Optional[str]:
-    """Check if an environment variable exists and return its value."""
-    try:
-        result = subprocess.run(
-            f"echo ${var}",
-            shell=True,
-            capture_output=True,
-            text=True
-        )
-        value = result.stdout.strip()
-        if not value or value == f"${var}":
-            return None
-        return value
-    except Exception:
-        return None
+from .resources import ResourceSampler, default_sample_interval
+from .readiness import ReadinessProbe
+from ..mcp_servers.bundle import export_bundle, import_bundle
+from ..mcp_servers.cache import RepositoryCache, format_size, global_cache_from_env, parse_size
+from ..mcp_servers.exceptions import BundleError, DaemonError
+from ..mcp_servers.env import CompiledEnv
+from ..mcp_servers.launch import resolve_on_launch
+from ..mcp_servers.params import MCPServersParams
+from ..mcp_servers.servers import MCPServers
 
 def add_command(args):
     """Add an MCP server from a GitHub repository to the local config."""
-    steps = [
-        "Validating repository URL",
-        "Fetching repository README",
-        "Parsing MCP configuration",
-        "Adding server configuration"
-    ]
-    
+    if not args.repo_url:
+        if not args.from_file:
+            show_error(
+                "No repository given",
+                help_text="Usage: mcphub add <repo_url> [name] or mcphub add --from servers.txt"
+            )
+            sys.exit(1)
+            return
+        add_from_manifest(args.from_file)
+        return
+
     repo_url = args.repo_url
     # Extract server name from repo URL if not provided
     if args.mcp_name:
         server_name = args.mcp_name
     else:
-        # Extract username/repo from GitHub URL
-        parsed_url = urlparse(repo_url)
-        if parsed_url.netloc != "github.com":
-            show_error(
-                "Only GitHub repositories are supported",
-                help_text="Please provide a valid GitHub repository URL"
-            )
-            sys.exit(1)
-        path_parts = parsed_url.path.strip("/").split("/")
-        if len(path_parts) != 2:
+        try:
+            # Extract username/repo from GitHub URL
+            server_name = server_name_from_repo_url(repo_url)
+        except ValueError as e:
             show_error(
-                "Invalid GitHub repository URL",
+                str(e),
                 help_text="URL should be in the format: https://github.com/username/repo"
             )
             sys.exit(1)
-        server_name = "/".join(path_parts)
+            return
     
     try:
         with Progress(
@@ -89,14 +87,10 @@ def add_command(args):
             console=console
         ) as progress:
             task = progress.add_task("[cyan]Adding MCP Server", total=100)
-            
-            # Step 1: Validating repository URL
-            progress.update(task, description="[cyan]Validating repository URL")
-            time.sleep(0.5)  # Simulate work
             progress.update(task, advance=25)
             
-            # Step 2: Fetching repository README
-            progress.update(task, description="[cyan]Fetching repository README")
+            # Step 1: Loading configuration
+            progress.update(task, description="[cyan]Loading configuration")
             config_path = get_config_path()
             
             # Create config file if it doesn't exist
@@ -104,22 +98,14 @@ def add_command(args):
                 console.print("[info]Creating new configuration file...[/]")
                 save_config(DEFAULT_CONFIG)
             
-            config = load_config()
-            time.sleep(0.5)  # Simulate work
-            progress.update(task, advance=25)
-            
-            # Step 3: Parsing MCP configuration
-            progress.update(task, description="[cyan]Parsing MCP configuration")
             from ..mcp_servers.params import MCPServersParams
-            servers_params = MCPServersParams(str(config_path))
-            time.sleep(0.5)  # Simulate work
+            servers_params = MCPServersParams(str(config_path), lazy=True)
             progress.update(task, advance=25)
             
-            # Step 4: Adding server configuration
-            progress.update(task, description="[cyan]Adding server configuration")
+            # Step 2: Fetching the README, parsing it and saving the configuration
+            progress.update(task, description="[cyan]Fetching and parsing repository README")
             servers_params.add_server_from_repo(server_name, repo_url)
-            time.sleep(0.5)  # Simulate work
-            progress.update(task, advance=25)
+            progress.update(task, advance=50)
         
         show_success(
             f"Successfully added configuration for '{server_name}' from {repo_url}",
@@ -131,14 +117,6 @@ def add_command(args):
         if hasattr(server_config, 'env') and server_config.env is not None:
             console.print("\n[info]Checking Environment Variables[/]")
             
-            # Initialize config for this server if needed
-            if "mcpServers" not in config:
-                config["mcpServers"] = {}
-            if server_name not in config["mcpServers"]:
-                config["mcpServers"][server_name] = {}
-            if "env" not in config["mcpServers"][server_name]:
-                config["mcpServers"][server_name]["env"] = {}
-            
             # Check each environment variable
             found_vars = {}
             missing_vars = []
@@ -154,8 +132,8 @@ def add_command(args):
             
             # Add found variables to config
             if found_vars:
-                config["mcpServers"][server_name]["env"].update(found_vars)
-                save_config(config)
+                # Patch only this entry's env so concurrent adds are not overwritten
+                get_config_store().patch_server(server_name, {"env": {**server_config.env, **found_vars}})
                 console.print("\n[success]Added existing environment variables to config[/]")
             
             # Handle missing variables
@@ -179,6 +157,102 @@ def add_command(args):
         show_error("Failed to add server", e)
         sys.exit(1)
 
+def add_from_manifest(manifest_path: str) -> None:
+    """Add every repository listed in a manifest file in one batch.
+
+    READMEs are fetched and parsed concurrently, and all servers that were
+    added successfully are saved in a single config write.
+
+    Args:
+        manifest_path: Path to a text or JSON manifest (see load_add_manifest)
+    """
+    try:
+        entries = load_add_manifest(Path(manifest_path))
+    except (OSError, ValueError) as e:
+        show_error(f"Failed to read manifest {manifest_path}", e)
+        sys.exit(1)
+        return
+
+    repos: Dict[str, str] = {}
+    rejected: List[tuple] = []
+    for repo_url, name in entries:
+        try:
+            name = name or server_name_from_repo_url(repo_url)
+        except ValueError as e:
+            rejected.append((repo_url, repo_url, str(e)))
+            continue
+        if name in repos:
+            rejected.append((name, repo_url, f"Duplicate server name '{name}'"))
+            continue
+        repos[name] = repo_url
+
+    config_path = get_config_path()
+    if not config_path.exists():
+        console.print("[info]Creating new configuration file...[/]")
+        save_config(DEFAULT_CONFIG)
+
+    from ..mcp_servers.params import MCPServersParams
+    servers_params = MCPServersParams(str(config_path), lazy=True)
+
+    results: Dict[str, Optional[Exception]] = {}
+    if repos:
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            TaskProgressColumn(),
+            console=console
+        ) as progress:
+            # Each server advances twice: once fetched, once parsed
+            task = progress.add_task(f"[cyan]Adding {len(repos)} MCP servers", total=2 * len(repos))
+            steps_done: Dict[str, int] = {}
+            failed = set()
+
+            def on_progress(name: str, stage: str, error: Optional[Exception]) -> None:
+                steps = 2 if stage in ("parsed", "failed") else 1
+                progress.update(task, advance=steps - steps_done.get(name, 0))
+                steps_done[name] = steps
+                if stage == "failed":
+                    failed.add(name)
+                parsed = sum(1 for n, done in steps_done.items() if done == 2 and n not in failed)
+                progress.update(
+                    task,
+                    description=f"[cyan]Adding MCP servers: {parsed} parsed, {len(failed)} failed"
+                )
+
+            results = servers_params.add_servers_from_repos(repos, on_progress)
+
+    table = Table(title="Added MCP Servers")
+    table.add_column("Server", style="cyan")
+    table.add_column("Repository")
+    table.add_column("Status")
+    added = 0
+    for name, repo_url in repos.items():
+        error = results.get(name)
+        if error is not None:
+            table.add_row(name, repo_url, f"[error]{error}[/]")
+            continue
+        added += 1
+        env = servers_params.retrieve_server_params(name).env or {}
+        missing_vars = [var for var in env if not check_env_var(var)]
+        status = "[success]added[/]"
+        if missing_vars:
+            status += f" [warning](set {', '.join(missing_vars)})[/]"
+        table.add_row(name, repo_url, status)
+    for name, repo_url, reason in rejected:
+        table.add_row(name, repo_url, f"[error]{reason}[/]")
+    console.print(table)
+
+    failures = len(entries) - added
+    if failures:
+        show_error(f"Added {added} of {len(entries)} servers; {failures} failed")
+        sys.exit(1)
+        return
+    show_success(
+        f"Successfully added {added} servers from {manifest_path}",
+        "Set any missing environment variables in .mcphub.json, then run the servers using 'mcphub run'"
+    )
+
 def remove_command(args):
     """Remove an MCP server configuration from the local config."""
     steps = [
@@ -272,9 +346,9 @@ def ps_command(args):
         table.add_column("CREATED", style="cyan")
         table.add_column("UPTIME", style="cyan")
         
-        # Get process information from ProcessManager
-        process_manager = ProcessManager()
-        processes = process_manager.list_processes()
+        # Get process information from the daemon's memory, or by scanning the system without one
+        client = DaemonClient.connect()
+        processes = client.call("list") if client is not None else ProcessManager().list_processes()
         
         # Create a map of process info by name
         process_map = {p["name"]: p for p in processes}
@@ -347,16 +421,212 @@ def status_command(args):
     
     server_config = config["mcpServers"][server_name]
     
-    # TODO: Add actual status check
-    status = "Not Running"
+    # Ask the daemon when one is running, like ps; otherwise read the process store
+    client = DaemonClient.connect()
+    processes = client.call("list") if client is not None else ProcessManager().list_processes()
+    records = [p for p in processes if p.get("name") == server_name]
+    # A running instance wins over stopped records of earlier runs
+    process_info = next((p for p in records if p.get("status") == "running"), records[-1] if records else {})
+    
+    status = process_info.get("status", "Not Running")
+    status = f"[green]{status}[/]" if status == "running" else f"[red]{status}[/]"
     details = {
-        "Command": server_config.get("command", "N/A"),
+        "Command": process_info.get("command", server_config.get("command", "N/A")),
         "Working Directory": server_config.get("cwd", "N/A"),
         "Package": server_config.get("package_name", "N/A"),
         "Repository": server_config.get("repo_url", "N/A")
     }
+    if process_info:
+        details["PID"] = process_info.get("pid", "N/A")
+        details["Ports"] = ", ".join(map(str, process_info.get("ports", []))) or "N/A"
+        details["Uptime"] = process_info.get("uptime", "N/A")
     
     show_status(server_name, status, details)
+    for warning in process_info.get("warnings", []):
+        console.print(f"[warning]⚠ {warning}[/]")
+
+def setup_command(args):
+    """Clone and set up MCP servers, skipping those whose setup is up to date."""
+    config_path = get_config_path()
+    if not config_path.exists():
+        show_error(
+            "No .mcphub.json found in the current directory",
+            help_text="Use 'mcphub add' to configure a server first"
+        )
+        sys.exit(1)
+
+    try:
+        servers_params = MCPServersParams(str(config_path), lazy=True)
+        unknown = [name for name in args.mcp_names if name not in servers_params]
+        if unknown:
+            show_error(
+                f"MCP server(s) not found in configuration: {', '.join(unknown)}",
+                help_text="Use 'mcphub ps' to see available servers"
+            )
+            sys.exit(1)
+
+        servers = MCPServers(servers_params, max_workers=args.workers, auto_setup=False)
+        results = servers.setup_servers(args.mcp_names or None, force=args.force)
+    except Exception as e:
+        show_error("Error setting up servers", e)
+        sys.exit(1)
+
+    failed = [result.server_name for result in results.values() if result.status == "failed"]
+    if failed:
+        show_error(f"Setup failed for: {', '.join(failed)}")
+        sys.exit(1)
+    show_success("Server setup complete")
+
+def update_command(args):
+    """Fetch cached server repositories and fast-forward them, re-running setup where they moved."""
+    config_path = get_config_path()
+    if not config_path.exists():
+        show_error(
+            "No .mcphub.json found in the current directory",
+            help_text="Use 'mcphub add' to configure a server first"
+        )
+        sys.exit(1)
+
+    try:
+        servers_params = MCPServersParams(str(config_path), lazy=True)
+        unknown = [name for name in args.mcp_names if name not in servers_params]
+        if unknown:
+            show_error(
+                f"MCP server(s) not found in configuration: {', '.join(unknown)}",
+                help_text="Use 'mcphub ps' to see available servers"
+            )
+            sys.exit(1)
+
+        servers = MCPServers(servers_params, max_workers=args.workers, auto_setup=False)
+        results = servers.update_servers(args.mcp_names or None)
+    except Exception as e:
+        show_error("Error updating servers", e)
+        sys.exit(1)
+
+    table = Table(title="Server updates")
+    table.add_column("SERVER", style="cyan")
+    table.add_column("STATUS", style="cyan")
+    table.add_column("COMMIT", style="cyan")
+    for result in results.values():
+        if result.status == "updated":
+            commit = f"{(result.old_head or '?')[:12]} -> {(result.new_head or '?')[:12]}"
+        else:
+            commit = (result.new_head or "")[:12] or (result.error or "")
+        table.add_row(result.server_name, result.status, commit)
+    console.print(table)
+
+    counts = {status: sum(1 for r in results.values() if r.status == status)
+              for status in ("updated", "unchanged", "skipped", "failed")}
+    summary = (f"{counts['updated']} updated, {counts['unchanged']} unchanged, "
+               f"{counts['skipped']} skipped, {counts['failed']} failed")
+    if counts["failed"]:
+        for result in results.values():
+            if result.status == "failed":
+                console.print(f"[red]{result.server_name}[/]: {result.error}")
+        show_error(f"Update failed: {summary}")
+        sys.exit(1)
+    show_success(f"Update complete: {summary}")
+
+def refresh_command(args):
+    """Re-resolve the entrypoints behind npx/uvx launch commands."""
+    config_path = get_config_path()
+    if not config_path.exists():
+        show_error(
+            "No .mcphub.json found in the current directory",
+            help_text="Use 'mcphub add' to configure a server first"
+        )
+        sys.exit(1)
+
+    servers_params = MCPServersParams(str(config_path), lazy=True)
+    unknown = [name for name in args.mcp_names if name not in servers_params]
+    if unknown:
+        show_error(
+            f"MCP server(s) not found in configuration: {', '.join(unknown)}",
+            help_text="Use 'mcphub ps' to see available servers"
+        )
+        sys.exit(1)
+
+    servers_params.launch_resolver = get_launch_resolver()
+    with console.status("[cyan]Resolving launch commands..."):
+        resolved = servers_params.refresh_launch_commands(args.mcp_names or None)
+    for server_name, (command, command_args) in resolved.items():
+        console.print(f"[cyan]{server_name}[/]: {' '.join([command, *command_args])}")
+    show_success(f"Refreshed {len(resolved)} launch commands")
+
+def cache_command(args):
+    """List or garbage-collect the user-level repository cache."""
+    cache = RepositoryCache(args.cache_dir) if args.cache_dir else RepositoryCache()
+
+    if args.cache_command == "gc":
+        try:
+            max_size = parse_size(args.max_size)
+        except ValueError as e:
+            show_error(str(e), help_text="Use a size such as 500M or 5G")
+            sys.exit(1)
+        removed = cache.gc(max_size, dry_run=args.dry_run, force=args.force)
+        freed = format_size(sum(entry.size for entry in removed))
+        verb = "Would remove" if args.dry_run else "Removed"
+        for entry in removed:
+            console.print(f"{verb} {entry.repo_url or entry.path.parent.name} @ {entry.commit[:12]} ({format_size(entry.size)})")
+        show_success(f"{verb} {len(removed)} cache entries, {freed} freed")
+        return
+
+    entries = cache.entries()
+    if not entries:
+        show_warning(f"Repository cache at {cache.root} is empty")
+        return
+    table = Table(title=f"Repository cache ({cache.root})")
+    table.add_column("REPOSITORY", style="cyan")
+    table.add_column("COMMIT", style="cyan")
+    table.add_column("SIZE", style="cyan", justify="right")
+    table.add_column("LAST USED", style="cyan")
+    for entry in reversed(entries):
+        table.add_row(
+            entry.repo_url or entry.path.parent.name,
+            entry.commit[:12],
+            format_size(entry.size),
+            datetime.fromtimestamp(entry.last_access).strftime("%Y-%m-%d %H:%M")
+        )
+    console.print(table)
+    console.print(f"Total: {format_size(sum(entry.size for entry in entries))}")
+
+def bundle_command(args):
+    """Export or import a prebuilt .mcphub_cache as a verified archive."""
+    cache_dir = get_config_path().parent / ".mcphub_cache"
+    global_cache = global_cache_from_env() or RepositoryCache()
+
+    try:
+        if args.bundle_command == "export":
+            with console.status("[cyan]Packing .mcphub_cache..."):
+                summary = export_bundle(cache_dir, Path(args.output), global_cache)
+        elif args.bundle_command == "import":
+            with console.status("[cyan]Verifying and restoring bundle..."):
+                summary = import_bundle(Path(args.archive), cache_dir, global_cache)
+        else:
+            show_error(
+                "No bundle command given",
+                help_text="Use 'mcphub bundle export' or 'mcphub bundle import <archive>'"
+            )
+            sys.exit(1)
+            return
+    except BundleError as e:
+        show_error(f"Bundle {args.bundle_command} failed", e)
+        sys.exit(1)
+        return
+
+    for warning in summary.warnings:
+        show_warning(warning)
+    linked = f", {len(summary.links)} linked checkouts" if summary.links else ""
+    if args.bundle_command == "export":
+        show_success(
+            f"Exported {summary.files} files ({format_size(summary.size)}{linked}) to {summary.path}",
+            "Restore it with 'mcphub bundle import' next to the same .mcphub.json"
+        )
+    else:
+        show_success(
+            f"Imported {summary.files} files ({format_size(summary.size)}{linked}) into {cache_dir}",
+            "Servers whose setup stamps match are not set up again"
+        )
 
 def run_command(args):
     """Run an MCP server with optional SSE support."""
@@ -378,6 +648,15 @@ def run_command(args):
     
     server_config = config["mcpServers"][server_name]
     
+    if args.detach and not args.sse:
+        # A detached stdio server has no client on its stdin and exits at once
+        show_error(
+            "--detach needs --sse",
+            help_text=f"stdio servers talk to the client that starts them; use 'mcphub run --detach --sse {server_name}'"
+        )
+        sys.exit(1)
+        return
+    
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
@@ -389,21 +668,32 @@ def run_command(args):
         
         # Step 1: Load config
         progress.update(task, description="[cyan]Loading server configuration")
-        time.sleep(0.5)  # Simulate work
+        try:
+            # stdio servers are not probed unless configured; SSE gateways listen on --port
+            readiness = ReadinessProbe.from_config(server_config.get("readiness", "port" if args.sse else "none"))
+        except ValueError as e:
+            show_error(f"Invalid readiness probe for '{server_name}'", e)
+            sys.exit(1)
         progress.update(task, advance=33)
         
         # Step 2: Prepare command
         progress.update(task, description="[cyan]Preparing command")
         cmd = []
+        server_cmd = []
+        if "command" in server_config:
+            # npx/uvx commands run their cached entrypoint directly
+            command, command_args = get_launch_resolver().resolve(
+                server_config["command"], server_config.get("args", []), server_config.get("cwd"),
+                install=resolve_on_launch()
+            )
+            server_cmd = [command, *command_args]
+        elif "args" in server_config:
+            server_cmd = list(server_config["args"])
         
         # Add SSE support if requested
         if args.sse:
             # Construct the stdio command based on server configuration
-            stdio_cmd = []
-            if "command" in server_config:
-                stdio_cmd.append(server_config["command"])
-            if "args" in server_config:
-                stdio_cmd.extend(server_config["args"])
+            stdio_cmd = list(server_cmd)
             
             # If no command specified, use package_name with npx
             if not stdio_cmd and "package_name" in server_config:
@@ -422,31 +712,45 @@ def run_command(args):
             ])
         else:
             # Use the server's configured command
-            if "command" in server_config:
-                cmd.append(server_config["command"])
-            if "args" in server_config:
-                cmd.extend(server_config["args"])
+            cmd.extend(server_cmd)
         
-        time.sleep(0.5)  # Simulate work
         progress.update(task, advance=33)
         
         # Step 3: Start server
         progress.update(task, description="[cyan]Starting server")
-        time.sleep(0.5)  # Simulate work
         progress.update(task, advance=34)
     
     try:
         show_code_block(" ".join(cmd))
-        console.print("[info]Server is running...[/]")
+        if not args.detach:
+            console.print("[info]Server is running...[/]")
         
-        # Set up environment variables from config
+        # Set up environment variables from config, substituting ${VAR} templates
         env = os.environ.copy()
         if "env" in server_config:
-            env.update(server_config["env"])
+            compiled = CompiledEnv(server_config["env"])
+            resolver = get_env_resolver()
+            for var in compiled.missing(resolver):
+                show_warning(f"Environment variable {var} is not set")
+            env.update(compiled.resolve(resolver))
+        
+        if args.detach:
+            # The daemon owns the server, so it outlives this terminal
+            info = ensure_daemon().call("start", name=server_name, command=cmd, env=env,
+                                        readiness=server_config.get("readiness", "port" if args.sse else "none"))
+            for warning in info.get("warnings", []):
+                show_warning(warning)
+            show_success(f"Started {server_name} in the background (pid {info['pid']})")
+            return
         
         # Start process using ProcessManager
         process_manager = ProcessManager()
-        pid = process_manager.start_process(server_name, cmd, env)
+        pid = process_manager.start_process(server_name, cmd, env, readiness=readiness)
+        info = process_manager.get_process_info(pid) or {}
+        for warning in info.get("warnings", []):
+            show_warning(warning)
+        if "ready_after" in info and readiness.kind != "none":
+            console.print(f"[info]Ready after {info['ready_after']:.2f}s[/]")
         
         # Wait for process to complete
         process = psutil.Process(pid)
@@ -458,6 +762,105 @@ def run_command(args):
         show_error("Error running server", e)
         sys.exit(1)
 
+def logs_command(args):
+    """Print the last lines of a server's log, then follow it with -f."""
+    path = log_path(ProcessManager().log_dir, args.mcp_name)
+    if not path.exists():
+        show_error(
+            f"No logs for '{args.mcp_name}'",
+            help_text="Servers write their output to a log once started with 'mcphub run'"
+        )
+        sys.exit(1)
+    for line in tail(path, args.lines):
+        print(line)
+    if args.follow:
+        try:
+            for line in follow(path):
+                print(line, flush=True)
+        except KeyboardInterrupt:
+            pass
+
+def daemon_command(args):
+    """Start, stop or query the background daemon, or run it in the foreground."""
+    if args.daemon_command == "run":
+        try:
+            Daemon().serve()
+        except DaemonError as e:
+            show_error("Cannot start the daemon", e)
+            sys.exit(1)
+        return
+    if args.daemon_command == "start":
+        try:
+            client = ensure_daemon()
+        except DaemonError as e:
+            show_error("Cannot start the daemon", e)
+            sys.exit(1)
+        show_success(f"Daemon running (pid {client.call('ping')['pid']})")
+        return
+    
+    client = DaemonClient.connect()
+    if client is None:
+        show_warning("The daemon is not running", "Start it with 'mcphub daemon start'")
+        sys.exit(1)
+    if args.daemon_command == "stop":
+        client.call("shutdown")
+        show_success("Daemon stopped; the servers it started were stopped too")
+        return
+    status = client.call("ping")
+    console.print(f"Daemon pid {status['pid']}, up {status['uptime']:.0f}s, "
+                  f"{status['servers']} running servers, socket {client.path}")
+
+def _resources_table(resources: Dict[str, Any]) -> Table:
+    table = Table(title="MCP Server Resources")
+    table.add_column("NAME", style="cyan")
+    table.add_column("PID", style="cyan", justify="right")
+    table.add_column("CPU%", style="cyan", justify="right")
+    table.add_column("MEMORY", style="cyan", justify="right")
+    table.add_column("FDS", style="cyan", justify="right")
+    table.add_column("THREADS", style="cyan", justify="right")
+    table.add_column("PROCS", style="cyan", justify="right")
+    latest = [(server, server["samples"][-1]) for server in resources["servers"] if server["samples"]]
+    for server, sample in sorted(latest, key=lambda item: -item[1]["cpu_percent"]):
+        table.add_row(server["name"], str(server["pid"]), f"{sample['cpu_percent']:.1f}",
+                      format_size(sample["rss"]), str(sample["fds"]), str(sample["threads"]),
+                      str(sample["processes"]))
+    return table
+
+def top_command(args):
+    """Show the CPU, memory, file descriptors and threads of running servers."""
+    interval = args.interval if args.interval is not None else default_sample_interval()
+    client = DaemonClient.connect()
+    sampler = None
+    if client is not None:
+        # The daemon has been sampling all along; show its series
+        collect = lambda: client.call("resources")
+    else:
+        sampler = ResourceSampler(interval=interval)
+        for info in ProcessManager().list_processes():
+            if info.get("status") == "running":
+                sampler.track(info["pid"], info["name"])
+        # Prime cpu_percent, whose first reading is always 0
+        sampler.sample()
+        collect = sampler.export
+    
+    if args.json:
+        if sampler is not None:
+            for _ in range(args.samples):
+                time.sleep(interval)
+                sampler.sample()
+        print(json.dumps(collect(), indent=2))
+        return
+    
+    try:
+        with Live(_resources_table(collect()), console=console, auto_refresh=False) as live:
+            while True:
+                time.sleep(interval)
+                if sampler is not None:
+                    sampler.sample()
+                live.update(_resources_table(collect()), refresh=True)
+    except KeyboardInterrupt:
+        pass
+
 def parse_args(args=None):
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(
@@ -475,6 +878,7 @@ def parse_args(args=None):
     )
     add_parser.add_argument(
         "repo_url",
+        nargs="?",
         help="GitHub repository URL of the MCP server"
     )
     add_parser.add_argument(
@@ -487,6 +891,12 @@ def parse_args(args=None):
         action="store_true",
         help="Don't prompt for environment variables"
     )
+    add_parser.add_argument(
+        "--from",
+        dest="from_file",
+        metavar="FILE",
+        help="Add every repository listed in FILE: '<repo_url> [name]' per line, or a JSON list/object"
+    )
     
     # Remove command
     remove_parser = subparsers.add_parser(
@@ -517,6 +927,124 @@ def parse_args(args=None):
         help="Name of the MCP server to check"
     )
     
+    # Setup command
+    setup_parser = subparsers.add_parser(
+        "setup",
+        help="Clone and set up MCP servers",
+        description="Clone and set up configured MCP servers. Servers whose commit, setup script "
+                    "and tool versions are unchanged since their last setup are skipped."
+    )
+    setup_parser.add_argument(
+        "mcp_names",
+        nargs="*",
+        help="Names of the MCP servers to set up (defaults to all servers)"
+    )
+    setup_parser.add_argument(
+        "-f", "--force",
+        action="store_true",
+        help="Re-run setup scripts even if the servers are up to date"
+    )
+    setup_parser.add_argument(
+        "--workers",
+        type=int,
+        help="Maximum number of servers to set up concurrently"
+    )
+    
+    # Update command
+    update_parser = subparsers.add_parser(
+        "update",
+        help="Fetch and fast-forward cached server repositories",
+        description="Fetch the repositories of set-up servers concurrently and fast-forward them to "
+                    "their branch or pinned ref. Setup runs again, and cached tool lists are dropped, "
+                    "only for servers whose checked-out commit moved."
+    )
+    update_parser.add_argument(
+        "mcp_names",
+        nargs="*",
+        help="Names of the MCP servers to update (defaults to all servers)"
+    )
+    update_parser.add_argument(
+        "--workers",
+        type=int,
+        help="Maximum number of repositories to fetch concurrently"
+    )
+    
+    # Refresh command
+    refresh_parser = subparsers.add_parser(
+        "refresh",
+        help="Resolve the entrypoints behind npx/uvx launch commands",
+        description="Resolve npx/uvx launch commands to their entrypoints, installing their packages, "
+                    "so later spawns skip the shim; run again to pick up a new @latest release. "
+                    "Resolved entrypoints are cached in .mcphub_cache/launch.json."
+    )
+    refresh_parser.add_argument(
+        "mcp_names",
+        nargs="*",
+        help="Names of the MCP servers to refresh (defaults to all servers)"
+    )
+    
+    # Cache command
+    cache_parser = subparsers.add_parser(
+        "cache",
+        help="Manage the user-level repository cache",
+        description="Manage the repository cache shared between projects "
+                    "(enabled with MCPHUB_GLOBAL_CACHE)."
+    )
+    cache_parser.add_argument(
+        "--cache-dir",
+        help="Cache directory (default: MCPHUB_CACHE_DIR or ~/.cache/mcphub)"
+    )
+    cache_subparsers = cache_parser.add_subparsers(dest="cache_command", help="Cache commands")
+    cache_subparsers.add_parser(
+        "list",
+        help="List cached repository checkouts"
+    )
+    gc_parser = cache_subparsers.add_parser(
+        "gc",
+        help="Remove least recently used checkouts until the cache fits a size limit"
+    )
+    gc_parser.add_argument(
+        "--max-size",
+        default=os.getenv("MCPHUB_CACHE_MAX_SIZE", "5G"),
+        help="Maximum cache size, e.g. 500M or 5G (default: MCPHUB_CACHE_MAX_SIZE or 5G)"
+    )
+    gc_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Show what would be removed without removing it"
+    )
+    gc_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Also remove checkouts that projects still link to"
+    )
+
+    # Bundle command
+    bundle_parser = subparsers.add_parser(
+        "bundle",
+        help="Export or import prebuilt server caches",
+        description="Pack the project's .mcphub_cache (checkouts, setup stamps, launch "
+                    "commands and tool catalogs) into an archive, or restore one."
+    )
+    bundle_subparsers = bundle_parser.add_subparsers(dest="bundle_command", help="Bundle commands")
+    export_parser = bundle_subparsers.add_parser(
+        "export",
+        help="Write .mcphub_cache to an archive"
+    )
+    export_parser.add_argument(
+        "-o", "--output",
+        default="mcphub-bundle.tar.gz",
+        help="Archive to write; .tar.gz, .tar.xz or .tar (default: mcphub-bundle.tar.gz)"
+    )
+    import_parser = bundle_subparsers.add_parser(
+        "import",
+        help="Verify an archive and restore it into .mcphub_cache"
+    )
+    import_parser.add_argument(
+        "archive",
+        help="Archive created by 'mcphub bundle export'"
+    )
+    
     # Run command
     run_parser = subparsers.add_parser(
         "run",
@@ -554,7 +1082,76 @@ def parse_args(args=None):
         help="Path for message endpoint (default: /message)"
     )
     
-    return parser.parse_args(args)
+    run_parser.add_argument(
+        "-d", "--detach",
+        action="store_true",
+        help="Start the server through the background daemon and return once it is ready (needs --sse)"
+    )
+    
+    # Logs command
+    logs_parser = subparsers.add_parser(
+        "logs",
+        help="Show the output of an MCP server",
+        description="Show the last lines of an MCP server's stdout and stderr, read from its log file."
+    )
+    logs_parser.add_argument(
+        "mcp_name",
+        help="Name of the MCP server"
+    )
+    logs_parser.add_argument(
+        "-f", "--follow",
+        action="store_true",
+        help="Keep printing new lines as the server writes them"
+    )
+    logs_parser.add_argument(
+        "-n", "--lines",
+        type=int,
+        default=50,
+        help="Number of lines to show (default: 50)"
+    )
+    
+    # Top command
+    top_parser = subparsers.add_parser(
+        "top",
+        help="Show the resource usage of running MCP servers",
+        description="Show CPU, memory, open file descriptors and threads of each running server's "
+                    "process tree, updated live. Uses the daemon's history when it is running."
+    )
+    top_parser.add_argument(
+        "--interval",
+        type=float,
+        help="Seconds between samples (default: MCPHUB_SAMPLE_INTERVAL or 1)"
+    )
+    top_parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the sampled time series as JSON instead of a live view"
+    )
+    top_parser.add_argument(
+        "--samples",
+        type=int,
+        default=1,
+        help="Samples to take for --json when the daemon is not running (default: 1)"
+    )
+    
+    # Daemon command
+    daemon_parser = subparsers.add_parser(
+        "daemon",
+        help="Manage the background daemon that supervises servers",
+        description="The daemon owns servers started with 'mcphub run --detach --sse', so they survive the "
+                    "terminal, and answers 'mcphub ps' from memory over a Unix socket."
+    )
+    daemon_subparsers = daemon_parser.add_subparsers(dest="daemon_command", required=True,
+                                                     help="Daemon commands")
+    daemon_subparsers.add_parser("start", help="Start the daemon in the background")
+    daemon_subparsers.add_parser("stop", help="Stop the daemon and the servers it started")
+    daemon_subparsers.add_parser("status", help="Show whether the daemon is running")
+    daemon_subparsers.add_parser("run", help="Run the daemon in the foreground")
+    
+    parsed = parser.parse_args(args)
+    if getattr(parsed, "command", None) == "add" and parsed.repo_url and parsed.from_file:
+        add_parser.error("give either a repository URL or --from, not both")
+    return parsed
 
 def main():
     """Main entry point for the CLI."""
@@ -568,16 +1165,40 @@ def main():
         ps_command(args)
     elif args.command == "status":
         status_command(args)
+    elif args.command == "setup":
+        setup_command(args)
+    elif args.command == "update":
+        update_command(args)
+    elif args.command == "refresh":
+        refresh_command(args)
+    elif args.command == "cache":
+        cache_command(args)
+    elif args.command == "bundle":
+        bundle_command(args)
     elif args.command == "run":
         run_command(args)
+    elif args.command == "logs":
+        logs_command(args)
+    elif args.command == "daemon":
+        daemon_command(args)
+    elif args.command == "top":
+        top_command(args)
     else:
         show_help_text(
             "mcphub",
             "MCPHub CLI tool for managing MCP server configurations",
             [
                 "mcphub add https://github.com/username/repo",
+                "mcphub add --from servers.txt",
                 "mcphub ps",
+                "mcphub setup --force server-name",
+                "mcphub update",
+                "mcphub cache gc --max-size 5G",
+                "mcphub bundle export -o mcphub-bundle.tar.gz",
                 "mcphub run server-name",
+                "mcphub run --detach --sse server-name",
+                "mcphub logs -f server-name",
+                "mcphub top",
                 "mcphub status server-name"
             ]
         )
@@ -0,0 +1,286 @@
+"""Resident supervisor for MCP servers, controlled over a Unix domain socket.
+
+The daemon owns the servers it starts, so they keep running after the
+terminal that asked for them closes, and keeps their state in memory so
+``mcphub ps`` is answered without scanning the system. Requests and
+responses are single lines of JSON::
+
+    {"method": "list", "params": {}}
+    {"result": [...]}   or   {"error": "..."}
+
+Run it in the foreground with ``python -m mcphub.cli.daemon``.
+"""
+import argparse
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..mcp_servers.exceptions import DaemonError, LockTimeout
+from ..mcp_servers.locks import FileLock
+from .process_manager import ProcessManager
+from .readiness import ReadinessProbe
+from .resources import ResourceSampler
+
+logger = logging.getLogger("mcphub")
+
+
+def default_data_dir() -> Path:
+    return Path.home() / ".mcphub"
+
+
+def socket_path(data_dir: Optional[Path] = None) -> Path:
+    """The daemon's socket: MCPHUB_DAEMON_SOCKET, or ``mcphubd.sock`` in the data directory."""
+    value = os.getenv("MCPHUB_DAEMON_SOCKET")
+    if value:
+        return Path(value)
+    return Path(data_dir or default_data_dir()) / "mcphubd.sock"
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                response = {"result": self.server.supervisor.dispatch(request["method"], request.get("params") or {})}
+            except Exception as e:
+                response = {"error": f"{type(e).__name__}: {e}"}
+            self.wfile.write((json.dumps(response) + "\n").encode())
+            self.wfile.flush()
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class Daemon:
+    """Starts, stops and watches MCP servers on behalf of CLI and library clients.
+
+    Listings are served from records refreshed every ``interval`` seconds,
+    and right after every start or stop, so answering ``ps`` costs no
+    system scan. Exited servers the daemon started are reaped on each
+    refresh, and running servers' resource usage is sampled for ``top``.
+    Servers started by CLIs without the daemon appear in the listings too,
+    since all records live in the same process store.
+    """
+
+    def __init__(self, data_dir: Optional[Path] = None, interval: float = 2.0):
+        self.data_dir = Path(data_dir) if data_dir is not None else default_data_dir()
+        self.socket_path = socket_path(self.data_dir)
+        self.interval = interval
+        self.started = time.time()
+        # Starts and stops; listings use their own manager and socket snapshot
+        self.manager = ProcessManager(data_dir=self.data_dir)
+        self._monitor = ProcessManager(data_dir=self.data_dir)
+        # Handler threads and the watch thread share both managers, which are not thread-safe;
+        # holding it across start_process also keeps reap() from forgetting a server mid-start
+        self._manager_lock = threading.RLock()
+        self.records: List[Dict[str, Any]] = []
+        self.sampler = ResourceSampler()
+        self._stop = threading.Event()
+        self._server: Optional[_Server] = None
+        self._lock = FileLock(self.data_dir / "mcphubd.lock")
+
+    def refresh(self) -> None:
+        with self._manager_lock:
+            self.manager.reap()
+            self.records = self._monitor.list_processes()
+            running = {r["pid"]: r["name"] for r in self.records if r.get("status") == "running"}
+            for pid in self.sampler.tracked():
+                if pid not in running:
+                    self.sampler.untrack(pid)
+            for pid, name in running.items():
+                self.sampler.track(pid, name)
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Failed to refresh server state")
+
+    def dispatch(self, method: str, params: Dict[str, Any]) -> Any:
+        """Answer one request."""
+        if method == "ping":
+            return {"pid": os.getpid(), "uptime": time.time() - self.started,
+                    "servers": sum(1 for r in self.records if r.get("status") == "running")}
+        if method == "list":
+            return self.records
+        if method == "get":
+            pid = int(params["pid"])
+            record = next((r for r in self.records if r["pid"] == pid), None)
+            if record is not None:
+                return record
+            with self._manager_lock:
+                return self.manager.get_process_info(pid)
+        if method == "start":
+            probe = ReadinessProbe.from_config(params.get("readiness"))
+            with self._manager_lock:
+                pid = self.manager.start_process(params["name"], list(params["command"]), params.get("env"),
+                                                 readiness=probe)
+                self.refresh()
+                return self.manager.get_process_info(pid)
+        if method == "stop":
+            with self._manager_lock:
+                stopped = self.manager.stop_process(int(params["pid"]))
+                self.refresh()
+            return stopped
+        if method == "output":
+            with self._manager_lock:
+                return self.manager.recent_output(int(params["pid"]))
+        if method == "resources":
+            return self.sampler.export()
+        if method == "shutdown":
+            self.shutdown()
+            return True
+        raise ValueError(f"Unknown method '{method}'")
+
+    def serve(self) -> None:
+        """Serve requests until ``shutdown``; servers the daemon started are stopped on exit.
+
+        Raises:
+            DaemonError: If another daemon already serves this data directory
+        """
+        try:
+            self._lock.acquire(timeout=0)
+        except LockTimeout:
+            raise DaemonError(f"A daemon is already running for {self.data_dir}")
+        try:
+            # Holding the lock, any socket left behind belongs to a daemon that died
+            self.socket_path.unlink(missing_ok=True)
+            self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+            umask = os.umask(0o177)
+            try:
+                self._server = _Server(str(self.socket_path), _Handler)
+            finally:
+                os.umask(umask)
+            self._server.supervisor = self
+            self.refresh()
+            self.sampler.start()
+            threading.Thread(target=self._watch, name="mcphubd-watch", daemon=True).start()
+            if threading.current_thread() is threading.main_thread():
+                for signum in (signal.SIGTERM, signal.SIGINT):
+                    signal.signal(signum, lambda *_: self.shutdown())
+            logger.info(f"mcphub daemon {os.getpid()} listening on {self.socket_path}")
+            self._server.serve_forever(poll_interval=0.5)
+        finally:
+            self._stop.set()
+            self.sampler.stop()
+            with self._manager_lock:
+                for pid in self.manager.started_pids():
+                    self.manager.stop_process(pid)
+            if self._server is not None:
+                self._server.server_close()
+            self.socket_path.unlink(missing_ok=True)
+            self._lock.release()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        if self._server is not None:
+            # serve_forever must be stopped from another thread
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+
+
+class DaemonClient:
+    """Sends requests to a running daemon, one connection per request."""
+
+    def __init__(self, path: Path, timeout: Optional[float] = 60):
+        self.path = Path(path)
+        self.timeout = timeout
+
+    @classmethod
+    def connect(cls, data_dir: Optional[Path] = None) -> Optional["DaemonClient"]:
+        """A client for the daemon serving ``data_dir``, or None if no daemon is running."""
+        if not hasattr(socket, "AF_UNIX"):
+            return None
+        path = socket_path(data_dir)
+        if not path.exists():
+            return None
+        try:
+            # A daemon that is shutting down may accept but never answer
+            cls(path, timeout=2).call("ping")
+        except DaemonError:
+            return None
+        return cls(path)
+
+    def call(self, method: str, **params: Any) -> Any:
+        """Send one request and return its result.
+
+        Raises:
+            DaemonError: If the daemon cannot be reached or the request failed
+        """
+        request = json.dumps({"method": method, "params": params}) + "\n"
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout)
+                sock.connect(str(self.path))
+                sock.sendall(request.encode())
+                with sock.makefile("rb") as stream:
+                    line = stream.readline()
+        except OSError as e:
+            raise DaemonError(f"Cannot reach the mcphub daemon at {self.path}: {e}") from e
+        if not line:
+            raise DaemonError("The mcphub daemon closed the connection")
+        response = json.loads(line)
+        if "error" in response:
+            raise DaemonError(response["error"])
+        return response["result"]
+
+
+def start_daemon(data_dir: Optional[Path] = None, timeout: float = 10) -> DaemonClient:
+    """Start a daemon in the background, detached from this terminal, and wait until it answers.
+
+    Raises:
+        DaemonError: If the daemon exits or does not answer within ``timeout`` seconds
+    """
+    data_dir = Path(data_dir) if data_dir is not None else default_data_dir()
+    log_file = data_dir / "logs" / "mcphubd.log"
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(log_file, "ab") as log:
+        process = subprocess.Popen(
+            [sys.executable, "-m", "mcphub.cli.daemon", "--data-dir", str(data_dir)],
+            stdin=subprocess.DEVNULL, stdout=log, stderr=log, start_new_session=True,
+        )
+    deadline = time.monotonic() + timeout
+    interval = 0.01
+    while True:
+        client = DaemonClient.connect(data_dir)
+        if client is not None:
+            return client
+        if process.poll() is not None:
+            raise DaemonError(f"The mcphub daemon exited with code {process.returncode}; see {log_file}")
+        if time.monotonic() >= deadline:
+            raise DaemonError(f"The mcphub daemon did not start within {timeout:g}s; see {log_file}")
+        time.sleep(interval)
+        interval = min(interval * 2, 0.2)
+
+
+def ensure_daemon(data_dir: Optional[Path] = None) -> DaemonClient:
+    """A client for the running daemon, starting one if needed."""
+    return DaemonClient.connect(data_dir) or start_daemon(data_dir)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run the mcphub daemon in the foreground")
+    parser.add_argument("--data-dir", type=Path, default=None)
+    parser.add_argument("--interval", type=float, default=2.0,
+                        help="Seconds between refreshes of server state (default: 2)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    try:
+        Daemon(args.data_dir, interval=args.interval).serve()
+    except DaemonError as e:
+        logger.error(str(e))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
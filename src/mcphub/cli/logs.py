@@ -0,0 +1,135 @@
+"""Log files of servers started by the CLI."""
+import mmap
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional
+
+from ..mcp_servers.cache import parse_size
+
+
+def default_max_log_bytes() -> int:
+    """Size at which a server's log is rotated (MCPHUB_LOG_MAX_SIZE, default 10M)."""
+    return parse_size(os.getenv("MCPHUB_LOG_MAX_SIZE", "10M"))
+
+
+def default_log_backups() -> int:
+    """Rotated logs kept per server (MCPHUB_LOG_BACKUPS, default 3)."""
+    return int(os.getenv("MCPHUB_LOG_BACKUPS", 3))
+
+
+def log_path(log_dir: Path, name: str) -> Path:
+    """Log file of the server called ``name``; "owner/repo" names become "owner__repo.log"."""
+    return Path(log_dir) / f"{name.replace('/', '__')}.log"
+
+
+class RotatingLog:
+    """A server's output, appended line by line and rotated by size.
+
+    ``server.log`` is renamed to ``server.log.1`` when it would grow past
+    ``max_bytes``, shifting older files up to ``server.log.<backups>``.
+    Lines are written with one ``write`` on an ``O_APPEND`` descriptor, so
+    readers see whole lines as soon as the server prints them. Safe to
+    share between the threads reading a server's stdout and stderr.
+    """
+
+    def __init__(self, path: Path, max_bytes: Optional[int] = None, backups: Optional[int] = None):
+        self.path = Path(path)
+        self.max_bytes = default_max_log_bytes() if max_bytes is None else max_bytes
+        self.backups = default_log_backups() if backups is None else backups
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd: Optional[int] = self._open()
+        self._size = os.fstat(self._fd).st_size
+
+    def _open(self) -> int:
+        return os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def _rotate(self) -> None:
+        os.close(self._fd)
+        if self.backups > 0:
+            for index in range(self.backups - 1, 0, -1):
+                older = self.path.with_name(f"{self.path.name}.{index}")
+                if older.exists():
+                    os.replace(older, self.path.with_name(f"{self.path.name}.{index + 1}"))
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        else:
+            os.truncate(self.path, 0)
+        self._fd = self._open()
+        self._size = 0
+
+    def write(self, line: str) -> None:
+        data = (line + "\n").encode(errors="replace")
+        with self._lock:
+            if self._fd is None:
+                return
+            if self._size and self._size + len(data) > self.max_bytes:
+                self._rotate()
+            os.write(self._fd, data)
+            self._size += len(data)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+
+def tail(path: Path, lines: int = 10) -> List[str]:
+    """The last ``lines`` lines of ``path``.
+
+    The file is memory-mapped and searched backwards for newlines, so only
+    the pages holding those lines are read, however large the log is.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0 or lines <= 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            end = size - 1 if data[size - 1:size] == b"\n" else size
+            position = end
+            for _ in range(lines):
+                position = data.rfind(b"\n", 0, position)
+                if position < 0:
+                    break
+            return data[position + 1:end].decode(errors="replace").split("\n")
+
+
+def follow(path: Path, interval: float = 0.2,
+           stopped: Callable[[], bool] = lambda: False) -> Iterator[str]:
+    """Yield lines appended to ``path`` from now on, like ``tail -f``.
+
+    Reads only what was appended since the last read. When the log is
+    rotated or truncated, the new file is followed from its start.
+
+    Args:
+        path: Log file to follow
+        interval: Seconds to wait when there is nothing new
+        stopped: Checked between reads; following ends once it returns True
+    """
+    f = open(path, "rb")
+    try:
+        f.seek(0, os.SEEK_END)
+        inode = os.fstat(f.fileno()).st_ino
+        pending = b""
+        while not stopped():
+            chunk = f.read(65536)
+            if chunk:
+                *complete, pending = (pending + chunk).split(b"\n")
+                for line in complete:
+                    yield line.decode(errors="replace")
+                continue
+            try:
+                current = os.stat(path)
+            except FileNotFoundError:
+                current = None
+            if current is not None and (current.st_ino != inode or current.st_size < f.tell()):
+                f.close()
+                f = open(path, "rb")
+                inode = os.fstat(f.fileno()).st_ino
+                pending = b""
+                continue
+            time.sleep(interval)
+    finally:
+        f.close()
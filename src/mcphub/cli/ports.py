@@ -0,0 +1,164 @@
+"""Port reservations for servers started by the CLI."""
+import os
+import socket
+import sqlite3
+import time
+from typing import Dict, List, Optional
+
+import psutil
+
+from .process_store import ProcessStore
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS port_bitmap (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    bits BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS port_reservations (
+    port INTEGER PRIMARY KEY,
+    pid INTEGER NOT NULL,
+    create_time REAL,
+    reserved_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS port_reservations_pid ON port_reservations (pid);
+"""
+
+_BITMAP_SIZE = 65536 // 8
+
+
+def port_is_free(port: int, host: str = "localhost") -> bool:
+    """Whether ``port`` can be bound on ``host`` right now."""
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.bind((host, port))
+            return True
+    except OSError:
+        return False
+
+
+def _create_time(pid: int) -> Optional[float]:
+    try:
+        return psutil.Process(pid).create_time()
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return None
+
+
+class PortAllocator:
+    """Hands out TCP ports to servers, never the same port twice at once.
+
+    Reserved ports are bits in a bitmap kept in ``processes.db``, next to
+    the process records, with the pid owning each reservation. Reserving
+    happens in one ``BEGIN IMMEDIATE`` transaction, so CLIs starting servers
+    in parallel are serialised and can never pick the same port. A port is
+    reserved by the CLI while it starts a server, then handed to the
+    server's pid; reservations of processes that have exited are reclaimed
+    on the next reservation.
+    """
+
+    def __init__(self, store: ProcessStore, host: str = "localhost"):
+        self.store = store
+        self.host = host
+        self._ready = False
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = self.store.connection()
+        if not self._ready:
+            conn.executescript(_SCHEMA)
+            self._ready = True
+        return conn
+
+    def _transaction(self):
+        self._connection()
+        return self.store.transaction()
+
+    @staticmethod
+    def _load_bitmap(conn: sqlite3.Connection) -> bytearray:
+        row = conn.execute("SELECT bits FROM port_bitmap WHERE id = 0").fetchone()
+        return bytearray(row[0]) if row is not None else bytearray(_BITMAP_SIZE)
+
+    @staticmethod
+    def _save_bitmap(conn: sqlite3.Connection, bits: bytearray) -> None:
+        conn.execute("INSERT OR REPLACE INTO port_bitmap (id, bits) VALUES (0, ?)", (bytes(bits),))
+
+    @staticmethod
+    def _reclaim(conn: sqlite3.Connection, bits: bytearray) -> None:
+        """Clear reservations whose owner has exited or whose pid was reused."""
+        for port, pid, create_time in conn.execute("SELECT port, pid, create_time FROM port_reservations").fetchall():
+            current = _create_time(pid)
+            if current is None or (create_time is not None and current != create_time):
+                bits[port >> 3] &= ~(1 << (port & 7)) & 0xFF
+                conn.execute("DELETE FROM port_reservations WHERE port = ?", (port,))
+
+    def reserve(self, start: int = 3000, count: int = 100, pid: Optional[int] = None) -> int:
+        """Reserve the first free port in ``[start, start + count)``.
+
+        A port is free when no live process holds a reservation for it and
+        it can be bound. Ports bound by processes mcphub did not start are
+        skipped, not reserved.
+
+        Args:
+            start: First port to consider
+            count: Number of ports to consider
+            pid: Owner of the reservation (defaults to this process)
+
+        Returns:
+            The reserved port
+
+        Raises:
+            RuntimeError: If every port in the range is taken
+        """
+        pid = os.getpid() if pid is None else pid
+        end = min(start + count, 65536)
+        with self._transaction() as conn:
+            bits = self._load_bitmap(conn)
+            self._reclaim(conn, bits)
+            port = start
+            while port < end:
+                byte = bits[port >> 3]
+                if byte == 0xFF and port & 7 == 0:
+                    port += 8
+                    continue
+                if not byte >> (port & 7) & 1 and port_is_free(port, self.host):
+                    bits[port >> 3] |= 1 << (port & 7)
+                    conn.execute("INSERT OR REPLACE INTO port_reservations VALUES (?, ?, ?, ?)",
+                                 (port, pid, _create_time(pid), time.time()))
+                    self._save_bitmap(conn, bits)
+                    return port
+                port += 1
+            self._save_bitmap(conn, bits)
+        raise RuntimeError(f"Could not find an available port after {count} attempts")
+
+    def assign(self, port: int, pid: int, create_time: Optional[float] = None) -> None:
+        """Hand the reservation of ``port`` to ``pid``, reserving it if it is not already."""
+        with self._transaction() as conn:
+            bits = self._load_bitmap(conn)
+            bits[port >> 3] |= 1 << (port & 7)
+            conn.execute("INSERT OR REPLACE INTO port_reservations VALUES (?, ?, ?, ?)",
+                         (port, pid, create_time if create_time is not None else _create_time(pid), time.time()))
+            self._save_bitmap(conn, bits)
+
+    def release(self, *, port: Optional[int] = None, pid: Optional[int] = None) -> List[int]:
+        """Release ``port``, or every port reserved by ``pid``.
+
+        Returns:
+            The released ports
+        """
+        with self._transaction() as conn:
+            if port is not None:
+                rows = conn.execute("SELECT port FROM port_reservations WHERE port = ?", (port,)).fetchall()
+            else:
+                rows = conn.execute("SELECT port FROM port_reservations WHERE pid = ?", (pid,)).fetchall()
+            released = [row[0] for row in rows]
+            if not released:
+                return []
+            bits = self._load_bitmap(conn)
+            for freed in released:
+                bits[freed >> 3] &= ~(1 << (freed & 7)) & 0xFF
+                conn.execute("DELETE FROM port_reservations WHERE port = ?", (freed,))
+            self._save_bitmap(conn, bits)
+        return released
+
+    def reservations(self) -> Dict[int, int]:
+        """Reserved ports and the pids holding them."""
+        rows = self._connection().execute("SELECT port, pid FROM port_reservations ORDER BY port")
+        return {port: pid for port, pid in rows.fetchall()}
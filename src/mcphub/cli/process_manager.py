@@ -1,14 +1,19 @@
 """Process manager for MCP servers."""
 import os
-import json
 import psutil
 import subprocess
 import signal
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Iterator, Optional, List
 from datetime import datetime
 import logging
-import socket
+
+from .logs import RotatingLog, log_path
+from .ports import PortAllocator
+from .process_store import ProcessStore
+from .readiness import OutputWatcher, ReadinessProbe, wait_until_ready
+from .sockets import SocketSnapshot
 
 logger = logging.getLogger("mcphub")
 
@@ -26,55 +31,99 @@ class ProcessManager:
         else:
             self.data_dir = data_dir
             
-        self.processes_file = self.data_dir / "processes.json"
+        self.db_path = self.data_dir / "processes.db"
+        # Written by older versions; imported into the database on first use
+        self.legacy_file = self.data_dir / "processes.json"
         self._ensure_data_dir()
-        self._load_processes()
+        self.store = ProcessStore(self.db_path, legacy_path=self.legacy_file)
+        self.ports = PortAllocator(self.store)
+        self.log_dir = self.data_dir / "logs"
+        # Servers started by this manager and their output readers, by pid
+        self._children: Dict[int, subprocess.Popen] = {}
+        self._watchers: Dict[int, OutputWatcher] = {}
+        self._in_snapshot = False
+        self._snapshot: Optional[SocketSnapshot] = None
+        self._live_records: Optional[Dict[int, Dict[str, Any]]] = None
     
     def _ensure_data_dir(self):
         """Ensure the data directory exists."""
         self.data_dir.mkdir(parents=True, exist_ok=True)
     
-    def _load_processes(self):
-        """Load process metadata from file."""
-        if self.processes_file.exists():
-            with open(self.processes_file, "r") as f:
-                self.processes = json.load(f)
-        else:
-            self.processes = {}
-            self._save_processes()
+    @property
+    def processes(self) -> Dict[str, Dict[str, Any]]:
+        """A snapshot of all process records, keyed by pid."""
+        return {str(info["pid"]): info for info in self.store.all()}
     
-    def _save_processes(self):
-        """Save process metadata to file."""
-        with open(self.processes_file, "w") as f:
-            json.dump(self.processes, f, indent=2)
+    @contextmanager
+    def socket_snapshot(self) -> Iterator[None]:
+        """Share one snapshot of the system's listening sockets between all port lookups in the block.
+
+        The snapshot is taken on the first lookup, so a block that looks up
+        no ports takes none.
+        """
+        if self._in_snapshot:
+            yield
+            return
+        self._in_snapshot = True
+        try:
+            yield
+        finally:
+            self._in_snapshot = False
+            self._snapshot = None
+            self._live_records = None
+    
+    def _sockets(self) -> SocketSnapshot:
+        if not self._in_snapshot:
+            return SocketSnapshot.take()
+        if self._snapshot is None:
+            self._snapshot = SocketSnapshot.take()
+        return self._snapshot
     
-    def _check_port_conflict(self, port: int) -> Optional[Dict[str, Any]]:
-        """Check if a port is already in use by another process.
+    def _running_records(self, sockets: SocketSnapshot) -> Dict[int, Dict[str, Any]]:
+        """Records of managed processes that are still running, keyed by pid."""
+        if self._live_records is not None and sockets is self._snapshot:
+            return self._live_records
+        records = {}
+        for info in self.store.all():
+            if info.get("status") == "stopped":
+                continue
+            create_time = info.get("create_time")
+            pid = int(info["pid"])
+            if sockets.is_running(pid, create_time if isinstance(create_time, (int, float)) else None):
+                records[pid] = info
+        if sockets is self._snapshot:
+            self._live_records = records
+        return records
+    
+    def _check_port_conflict(self, port: int, exclude_pid: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Check if a port is already in use by another managed process.
         
         Args:
             port: Port to check
+            exclude_pid: Managed process whose own use of the port is not a conflict
             
         Returns:
             Process info dict if port is in use, None otherwise
         """
-        for pid_str, info in self.processes.items():
-            try:
-                pid = int(pid_str)
-                process = psutil.Process(pid)
-                if process.is_running():
-                    ports = self._get_process_ports(process)
-                    if port in ports:
-                        return {
-                            "pid": pid,
-                            "name": info.get("name", "Unknown"),
-                            "command": info.get("command", "Unknown")
-                        }
-            except (psutil.NoSuchProcess, psutil.AccessDenied, ValueError):
-                continue
+        sockets = self._sockets()
+        managed = self._running_records(sockets)
+        candidates = [pid for pid in managed if pid != exclude_pid]
+        for owner in sorted(sockets.owners(port, candidates)):
+            root = sockets.root_of(owner, candidates)
+            if root is not None:
+                info = managed[root]
+                return {
+                    "pid": root,
+                    "name": info.get("name", "Unknown"),
+                    "command": info.get("command", "Unknown")
+                }
         return None
 
     def _find_available_port(self, start_port: int = 3000, max_attempts: int = 100) -> int:
-        """Find an available port starting from start_port.
+        """Reserve an available port starting from start_port.
+        
+        The port stays reserved for this process until ``start_process``
+        hands it to the server, so no other CLI can pick it meanwhile.
         
         Args:
             start_port: Port to start checking from
@@ -83,28 +132,31 @@ class ProcessManager:
         Returns:
             Available port number
         """
-        for port in range(start_port, start_port + max_attempts):
-            try:
-                # Try to bind to the port
-                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                    s.bind(('localhost', port))
-                    return port
-            except OSError:
-                continue
-        
-        raise RuntimeError(f"Could not find an available port after {max_attempts} attempts")
+        return self.ports.reserve(start_port, max_attempts)
 
-    def start_process(self, name: str, command: List[str], env: Dict[str, str] = None) -> int:
-        """Start a new MCP server process.
+    def _reserve_port(self, port: int) -> bool:
+        """Reserve exactly ``port``; False if it is reserved or bound already."""
+        try:
+            self.ports.reserve(port, 1)
+            return True
+        except RuntimeError:
+            return False
+
+    def start_process(self, name: str, command: List[str], env: Dict[str, str] = None,
+                      readiness: Optional[ReadinessProbe] = None) -> int:
+        """Start a new MCP server process and wait until it is ready.
         
         Args:
             name: Name of the MCP server
             command: Command to run
             env: Environment variables
+            readiness: How to tell the server is ready; defaults to waiting
+                for it to listen on its port
             
         Returns:
             Process ID of the started process
         """
+        readiness = readiness or ReadinessProbe()
         # Extract port from command if present
         port = None
         port_index = -1
@@ -117,8 +169,8 @@ class ProcessManager:
                     pass
                 break
         
-        # If no port specified, find an available one
         if port is None:
+            # No port specified: reserve one
             try:
                 port = self._find_available_port()
                 # Add port to command
@@ -127,15 +179,21 @@ class ProcessManager:
             except RuntimeError as e:
                 logger.error(f"Failed to find available port: {e}")
                 raise
-        
-        # Check for port conflicts
-        if port:
+        elif port == 0:
+            # The server binds to a free port itself; it is read once the server is ready
+            logger.info("Letting the server choose its port")
+        else:
             conflict = self._check_port_conflict(port)
-            if conflict:
-                logger.warning(
-                    f"Port {port} is already in use by process {conflict['pid']} "
-                    f"({conflict['name']}): {conflict['command']}"
-                )
+            if conflict is None and self._reserve_port(port):
+                pass
+            else:
+                if conflict:
+                    logger.warning(
+                        f"Port {port} is already in use by process {conflict['pid']} "
+                        f"({conflict['name']}): {conflict['command']}"
+                    )
+                else:
+                    logger.warning(f"Port {port} is already in use or reserved by another server")
                 # Try to find another available port
                 try:
                     new_port = self._find_available_port(port + 1)
@@ -149,9 +207,12 @@ class ProcessManager:
                     logger.error(f"Failed to find alternative port: {e}")
                     raise
         
+        log_file = log_path(self.log_dir, name)
+        
         # Create process metadata
         process_info = {
             "name": name,
+            "log_file": str(log_file),
             "command": " ".join(command),
             "start_time": datetime.now().isoformat(),
             "env": env or {},
@@ -166,34 +227,57 @@ class ProcessManager:
             process = subprocess.Popen(
                 command,
                 env={**os.environ, **(env or {})},
+                # The MCP probe speaks JSON-RPC to the server on stdin
+                stdin=subprocess.PIPE if readiness.kind == "mcp" else None,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 text=True
             )
+            # Drains the pipes into the server's log, so it never blocks writing to them
+            watcher = OutputWatcher({"stdout": process.stdout, "stderr": process.stderr},
+                                    log=RotatingLog(log_file))
+            self._children[process.pid] = process
+            self._watchers[process.pid] = watcher
             
             # Update process info
             process_info["pid"] = process.pid
             process_info["status"] = "running"
-            
-            # Check for port conflicts after process starts
+            try:
+                # Identifies the process should its pid be reused later
+                process_info["create_time"] = psutil.Process(process.pid).create_time()
+            except (psutil.NoSuchProcess, psutil.AccessDenied, TypeError, ValueError):
+                pass
             if port:
-                # Wait a moment for the process to start
-                import time
-                time.sleep(1)
-                
-                # Check if our process got the port
-                try:
-                    our_ports = self._get_process_ports(process)
-                    if port not in our_ports:
-                        process_info["warnings"].append(
-                            f"Port {port} is not available. The process may not be running correctly."
-                        )
-                except Exception as e:
-                    logger.debug(f"Failed to check process ports: {e}")
+                # The reservation now lasts as long as the server runs
+                self.ports.assign(port, process.pid, process_info.get("create_time"))
+            
+            port_lookup = None
+            if "docker" in command[0].lower():
+                # Published container ports are bound by the Docker daemon, not the client
+                port_lookup = lambda pid: self._get_process_ports(psutil.Process(pid))
+            result = wait_until_ready(process, readiness, port=port or None, watcher=watcher,
+                                      port_lookup=port_lookup)
+            process_info["readiness"] = readiness.kind
+            if result.ready:
+                process_info["ready_after"] = round(result.elapsed, 3)
+                logger.info(f"{name} ready after {result.elapsed:.3f}s ({result.detail})")
+                if port == 0:
+                    process_info["ports"] = self._get_process_ports(psutil.Process(process.pid))
+                    for chosen in process_info["ports"]:
+                        self.ports.assign(chosen, process.pid, process_info.get("create_time"))
+            else:
+                if process.poll() is not None:
+                    process_info["status"] = "failed"
+                    self.ports.release(pid=process.pid)
+                warning = f"Server not ready: {result.detail}."
+                if readiness.kind == "port" and port:
+                    warning = f"Port {port} is not available. The process may not be running correctly ({result.detail})."
+                if watcher.tail:
+                    warning += f" Last output: {watcher.tail[-1]}"
+                process_info["warnings"].append(warning)
             
             # Store process info
-            self.processes[str(process.pid)] = process_info
-            self._save_processes()
+            self.store.put(process.pid, process_info)
             
             return process.pid
             
@@ -201,10 +285,42 @@ class ProcessManager:
             logger.error(f"Failed to start process: {e}")
             process_info["status"] = "failed"
             process_info["error"] = str(e)
-            self.processes[str(process.pid)] = process_info
-            self._save_processes()
+            if port:
+                self.ports.release(port=port)
+            if process_info["pid"] is not None:
+                self.store.put(process_info["pid"], process_info)
             raise
     
+    def recent_output(self, pid: int) -> List[str]:
+        """Last lines printed by a server this manager started, without reading its log file."""
+        watcher = self._watchers.get(pid)
+        return list(watcher.tail) if watcher is not None else []
+    
+    def started_pids(self) -> List[int]:
+        """Pids of the servers this manager started that have not been reaped."""
+        return list(self._children)
+    
+    def reap(self) -> List[int]:
+        """Collect servers started by this manager that have exited.
+        
+        Exited children are waited for, so none is left a zombie, recorded
+        as stopped and their ports released.
+        
+        Returns:
+            Pids of the servers that exited
+        """
+        exited = [pid for pid, child in list(self._children.items()) if child.poll() is not None]
+        for pid in exited:
+            self._forget(pid, {"status": "stopped", "stop_time": datetime.now().isoformat()})
+        return exited
+    
+    def _forget(self, pid: int, stopped: Dict[str, Any]) -> None:
+        """Record a server as stopped and release what it held."""
+        self._children.pop(pid, None)
+        self._watchers.pop(pid, None)
+        self.store.update(pid, stopped)
+        self.ports.release(pid=pid)
+    
     def stop_process(self, pid: int) -> bool:
         """Stop a running MCP server process.
         
@@ -214,9 +330,9 @@ class ProcessManager:
         Returns:
             True if process was stopped, False otherwise
         """
-        pid_str = str(pid)
-        if pid_str not in self.processes:
+        if self.store.get(pid) is None:
             return False
+        stopped = {"status": "stopped", "stop_time": datetime.now().isoformat()}
         
         try:
             # Try graceful shutdown first
@@ -231,17 +347,13 @@ class ProcessManager:
                 os.kill(pid, signal.SIGKILL)
             
             # Update process info
-            self.processes[pid_str]["status"] = "stopped"
-            self.processes[pid_str]["stop_time"] = datetime.now().isoformat()
-            self._save_processes()
+            self._forget(pid, stopped)
             
             return True
             
         except ProcessLookupError:
             # Process already gone
-            self.processes[pid_str]["status"] = "stopped"
-            self.processes[pid_str]["stop_time"] = datetime.now().isoformat()
-            self._save_processes()
+            self._forget(pid, stopped)
             return True
         except Exception as e:
             logger.error(f"Failed to stop process {pid}: {e}")
@@ -256,53 +368,63 @@ class ProcessManager:
         Returns:
             Process information dictionary or None if not found
         """
-        pid_str = str(pid)
-        if pid_str not in self.processes:
+        info = self.store.get(pid)
+        if info is None:
             return None
-        
-        info = self.processes[pid_str].copy()
+        with self.socket_snapshot():
+            return self._refresh(info)
+    
+    def _refresh(self, info: Dict[str, Any]) -> Dict[str, Any]:
+        """Add live status, uptime and ports to a stored record.
+
+        Only fields that changed are written back, so listing processes
+        whose state is unchanged writes nothing.
+        """
+        pid = int(info["pid"])
+        stored = {key: info.get(key) for key in ("status", "ports", "warnings")}
+        info = dict(info)
+        if info.get("status") == "stopped":
+            # Never probe again: the pid may belong to an unrelated process by now
+            return info
         
         try:
             process = psutil.Process(pid)
+            create_time = info.get("create_time")
+            if isinstance(create_time, (int, float)) and process.create_time() != create_time:
+                raise psutil.NoSuchProcess(pid)
             
             # Update runtime info
             info["status"] = "running" if process.is_running() else "stopped"
             info["uptime"] = self._get_uptime(process)
             
-            # Get ports with retry for Docker containers
+            # start_process waited for the server to be ready, so ports are read once
             ports = self._get_process_ports(process)
-            if not ports and "docker" in info.get("command", "").lower():
-                # Retry after a short delay for Docker containers
-                import time
-                time.sleep(1)
-                ports = self._get_process_ports(process)
-            
             info["ports"] = ports
             
             # Check for port conflicts
             if ports:
                 for port in ports:
-                    conflict = self._check_port_conflict(port)
-                    if conflict and conflict["pid"] != pid:
+                    conflict = self._check_port_conflict(port, exclude_pid=pid)
+                    if conflict:
                         warning = (
                             f"Port {port} is also in use by process {conflict['pid']} "
                             f"({conflict['name']}): {conflict['command']}"
                         )
                         if warning not in info.get("warnings", []):
-                            if "warnings" not in info:
-                                info["warnings"] = []
-                            info["warnings"].append(warning)
-            
-            # Update process info
-            self.processes[pid_str].update(info)
-            self._save_processes()
+                            info["warnings"] = [*info.get("warnings", []), warning]
+            if info["status"] == "stopped":
+                info["stop_time"] = datetime.now().isoformat()
             
         except psutil.NoSuchProcess:
             info["status"] = "stopped"
             info["stop_time"] = datetime.now().isoformat()
-            self.processes[pid_str].update(info)
-            self._save_processes()
         
+        changed = {key: info.get(key) for key in stored if info.get(key) != stored[key]}
+        if changed:
+            if info["status"] == "stopped":
+                changed["stop_time"] = info["stop_time"]
+                self.ports.release(pid=pid)
+            self.store.update(pid, changed)
         return info
     
     def list_processes(self) -> List[Dict[str, Any]]:
@@ -311,16 +433,8 @@ class ProcessManager:
         Returns:
             List of process information dictionaries
         """
-        processes = []
-        for pid_str, info in self.processes.items():
-            try:
-                pid = int(pid_str)
-                process_info = self.get_process_info(pid)
-                if process_info:
-                    processes.append(process_info)
-            except ValueError:
-                continue
-        return processes
+        with self.socket_snapshot():
+            return [self._refresh(info) for info in self.store.all()]
     
     def _get_uptime(self, process: psutil.Process) -> str:
         """Get process uptime in human readable format."""
@@ -344,29 +458,18 @@ class ProcessManager:
     def _get_process_ports(self, process: psutil.Process) -> List[int]:
         """Get list of ports used by a process and its children.
         
+        Ports come from the current socket snapshot (see ``socket_snapshot``),
+        plus the published ports of Docker containers.
+        
         Args:
             process: Process to check
             
         Returns:
             List of ports in use
         """
-        ports = set()
+        ports = set(self._sockets().ports(process.pid))
         
         try:
-            # Check the main process
-            for conn in process.connections():
-                if conn.laddr and conn.status == 'LISTEN':
-                    ports.add(conn.laddr.port)
-            
-            # Check child processes
-            for child in process.children(recursive=True):
-                try:
-                    for conn in child.connections():
-                        if conn.laddr and conn.status == 'LISTEN':
-                            ports.add(conn.laddr.port)
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
-            
             # Check for Docker containers
             if "docker" in process.name().lower():
                 try:
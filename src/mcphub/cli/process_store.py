@@ -0,0 +1,206 @@
+"""SQLite store for the metadata of processes started by the CLI."""
+import hashlib
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterator, List, Mapping, Optional
+
+# Fields kept in their own columns; anything else goes to the "extra" JSON column
+_COLUMNS = ("name", "command", "start_time", "stop_time", "status", "create_time",
+            "env_digest", "env_keys", "ports", "warnings", "error")
+_JSON_COLUMNS = {"env_keys", "ports", "warnings"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS processes (
+    pid INTEGER PRIMARY KEY,
+    name TEXT,
+    command TEXT,
+    start_time TEXT,
+    stop_time TEXT,
+    status TEXT,
+    create_time REAL,
+    env_digest TEXT,
+    env_keys TEXT,
+    ports TEXT,
+    warnings TEXT,
+    error TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS processes_status ON processes (status);
+"""
+
+
+def env_digest(env: Optional[Mapping[str, str]]) -> str:
+    """Hash an environment so that changes can be detected without storing its values."""
+    items = sorted((env or {}).items())
+    return "sha256:" + hashlib.sha256(json.dumps(items).encode()).hexdigest()
+
+
+def redact_env(info: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace a record's ``env`` with its key names and a digest of its values."""
+    info = dict(info)
+    if "env" in info:
+        env = info.pop("env") or {}
+        info["env_keys"] = sorted(env)
+        info["env_digest"] = env_digest(env)
+    return info
+
+
+class ProcessStore:
+    """Process records in ``processes.db``, one row per pid.
+
+    The database runs in WAL mode, so ``mcphub ps`` reads never block on,
+    or are blocked by, another CLI starting or stopping a server. Writes
+    touch single rows in short ``BEGIN IMMEDIATE`` transactions. Environment
+    values are never stored, only their key names and a digest.
+
+    Records written by older versions to ``processes.json`` are imported
+    on first use, and the file, which held plain-text env values, is removed.
+    """
+
+    def __init__(self, path: Path, legacy_path: Optional[Path] = None):
+        self.path = Path(path)
+        self.legacy_path = Path(legacy_path) if legacy_path is not None else None
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode; transactions are opened explicitly in _write
+        conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        self._local.conn = conn
+        self._import_legacy(conn)
+        return conn
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def connection(self) -> sqlite3.Connection:
+        """This thread's connection to ``processes.db``, for tables kept next to the records."""
+        return self._connect()
+
+    def transaction(self) -> ContextManager[sqlite3.Connection]:
+        """An immediate write transaction, serialised with every other writer of the database."""
+        return self._write()
+
+    def _import_legacy(self, conn: sqlite3.Connection) -> None:
+        if self.legacy_path is None or not self.legacy_path.exists():
+            return
+        try:
+            with open(self.legacy_path) as f:
+                records = json.load(f)
+        except (OSError, ValueError):
+            records = {}
+        with self._write():
+            for pid, info in records.items():
+                try:
+                    row = self._row(int(pid), redact_env(info))
+                except (TypeError, ValueError):
+                    continue
+                placeholders = ", ".join("?" for _ in row)
+                conn.execute(f"INSERT OR IGNORE INTO processes ({', '.join(row)}) VALUES ({placeholders})",
+                             list(row.values()))
+        try:
+            self.legacy_path.unlink()
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _row(pid: int, info: Mapping[str, Any]) -> Dict[str, Any]:
+        row: Dict[str, Any] = {"pid": pid}
+        extra = {}
+        for key, value in info.items():
+            if key == "pid":
+                continue
+            if key in _COLUMNS:
+                row[key] = json.dumps(value) if key in _JSON_COLUMNS else value
+            else:
+                extra[key] = value
+        if extra:
+            row["extra"] = json.dumps(extra)
+        return row
+
+    @staticmethod
+    def _record(row: sqlite3.Row) -> Dict[str, Any]:
+        record: Dict[str, Any] = json.loads(row["extra"]) if row["extra"] else {}
+        record["pid"] = row["pid"]
+        for key in _COLUMNS:
+            value = row[key]
+            if value is None:
+                continue
+            record[key] = json.loads(value) if key in _JSON_COLUMNS else value
+        record.setdefault("ports", [])
+        record.setdefault("warnings", [])
+        return record
+
+    def put(self, pid: int, info: Mapping[str, Any]) -> None:
+        """Insert or replace the record for ``pid``; an ``env`` is stored as a digest."""
+        row = self._row(pid, redact_env(dict(info)))
+        placeholders = ", ".join("?" for _ in row)
+        with self._write() as conn:
+            conn.execute(f"INSERT OR REPLACE INTO processes ({', '.join(row)}) VALUES ({placeholders})",
+                         list(row.values()))
+
+    def update(self, pid: int, fields: Mapping[str, Any]) -> bool:
+        """Update some fields of one record.
+
+        Returns:
+            False if there is no record for ``pid``
+        """
+        fields = redact_env(dict(fields))
+        columns = {k: v for k, v in self._row(pid, fields).items() if k not in ("pid", "extra")}
+        extra = {k: v for k, v in fields.items() if k not in _COLUMNS and k != "pid"}
+        with self._write() as conn:
+            if extra:
+                current = conn.execute("SELECT extra FROM processes WHERE pid = ?", (pid,)).fetchone()
+                if current is None:
+                    return False
+                columns["extra"] = json.dumps({**json.loads(current["extra"] or "{}"), **extra})
+            if not columns:
+                return conn.execute("SELECT 1 FROM processes WHERE pid = ?", (pid,)).fetchone() is not None
+            assignments = ", ".join(f"{key} = ?" for key in columns)
+            cursor = conn.execute(f"UPDATE processes SET {assignments} WHERE pid = ?", [*columns.values(), pid])
+            return cursor.rowcount > 0
+
+    def get(self, pid: int) -> Optional[Dict[str, Any]]:
+        row = self._connect().execute("SELECT * FROM processes WHERE pid = ?", (pid,)).fetchone()
+        return self._record(row) if row is not None else None
+
+    def all(self) -> List[Dict[str, Any]]:
+        """Return every record, in the order the processes were started, in a single read."""
+        rows = self._connect().execute("SELECT * FROM processes ORDER BY start_time, pid").fetchall()
+        return [self._record(row) for row in rows]
+
+    def delete(self, pid: int) -> bool:
+        with self._write() as conn:
+            return conn.execute("DELETE FROM processes WHERE pid = ?", (pid,)).rowcount > 0
+
+    def clear(self) -> None:
+        with self._write() as conn:
+            conn.execute("DELETE FROM processes")
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM processes").fetchone()[0]
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
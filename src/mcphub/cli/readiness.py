@@ -0,0 +1,231 @@
+"""Readiness probes for servers started by the CLI."""
+import json
+import os
+import re
+import subprocess
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import IO, Callable, Deque, Iterable, List, Mapping, Optional, Set, Tuple
+
+import psutil
+from mcp.types import LATEST_PROTOCOL_VERSION
+
+from .logs import RotatingLog
+
+PROBE_KINDS = ("port", "log", "mcp", "none")
+
+_PROBE_REQUEST_ID = "mcphub-ready"
+
+
+def default_ready_timeout() -> float:
+    """Seconds to wait for a server to become ready (MCPHUB_READY_TIMEOUT, default 10)."""
+    return float(os.getenv("MCPHUB_READY_TIMEOUT", 10))
+
+
+@dataclass
+class ReadinessProbe:
+    """How to tell that a started server is ready.
+
+    Kinds:
+        port: The server, or one of its children, listens on its port
+            (on any port if none is known)
+        log: A line on stdout or stderr matches ``pattern``
+        mcp: The server answers an MCP ``initialize`` request on stdin/stdout
+        none: Do not wait
+    """
+    kind: str = "port"
+    pattern: Optional[str] = None
+    timeout: Optional[float] = None
+    initial_interval: float = 0.01
+    max_interval: float = 0.5
+
+    def __post_init__(self):
+        if self.kind not in PROBE_KINDS:
+            raise ValueError(f"Unknown readiness probe '{self.kind}'; expected one of {', '.join(PROBE_KINDS)}")
+        if self.kind == "log":
+            if not self.pattern:
+                raise ValueError("A 'log' readiness probe needs a pattern")
+            re.compile(self.pattern)
+        if self.timeout is None:
+            self.timeout = default_ready_timeout()
+
+    @classmethod
+    def from_config(cls, config: Optional[Mapping]) -> "ReadinessProbe":
+        """Build a probe from a server's ``readiness`` setting in .mcphub.json.
+
+        Accepts a kind ("port", "log", "mcp" or "none") or a mapping with
+        ``type``, ``pattern`` and ``timeout``.
+        """
+        if config is None:
+            return cls()
+        if isinstance(config, str):
+            return cls(kind=config)
+        return cls(kind=config.get("type", "port"), pattern=config.get("pattern"),
+                   timeout=config.get("timeout"))
+
+
+@dataclass
+class Readiness:
+    """Outcome of waiting for a server."""
+    ready: bool
+    elapsed: float
+    detail: str
+
+
+class OutputWatcher:
+    """Reads a process's output streams on daemon threads and signals matching lines.
+
+    The streams are drained for as long as the process runs, so a server
+    never blocks on a full pipe. Every line is appended to ``log`` if given,
+    and the last ``tail`` lines are kept in memory.
+    """
+
+    def __init__(self, streams: Mapping[str, Optional[IO[str]]], tail: int = 200,
+                 log: Optional[RotatingLog] = None):
+        self.tail: Deque[str] = deque(maxlen=tail)
+        self.log = log
+        self._lock = threading.Lock()
+        self._waiters: List[Tuple[Set[str], Callable[[str], bool], threading.Event]] = []
+        self._open = sum(stream is not None for stream in streams.values())
+        for name, stream in streams.items():
+            if stream is not None:
+                threading.Thread(target=self._read, args=(name, stream),
+                                 name=f"mcphub-{name}", daemon=True).start()
+
+    def expect(self, predicate: Callable[[str], bool],
+               streams: Tuple[str, ...] = ("stdout", "stderr")) -> threading.Event:
+        """Return an event that is set when a line on ``streams`` satisfies ``predicate``."""
+        event = threading.Event()
+        with self._lock:
+            self._waiters.append((set(streams), predicate, event))
+        return event
+
+    def _read(self, name: str, stream: IO[str]) -> None:
+        try:
+            for line in stream:
+                line = line.rstrip("\n")
+                if self.log is not None:
+                    self.log.write(line)
+                with self._lock:
+                    self.tail.append(line)
+                    waiters = list(self._waiters)
+                for streams, predicate, event in waiters:
+                    if name in streams and not event.is_set() and predicate(line):
+                        event.set()
+        except (OSError, ValueError):
+            pass
+        finally:
+            with self._lock:
+                self._open -= 1
+                drained = self._open == 0
+            if drained and self.log is not None:
+                self.log.close()
+
+
+def listening_ports(pid: int) -> Set[int]:
+    """Ports that ``pid`` or its children listen on, read for this process tree only."""
+    ports: Set[int] = set()
+    try:
+        root = psutil.Process(pid)
+        members = [root, *root.children(recursive=True)]
+    except psutil.NoSuchProcess:
+        return ports
+    for member in members:
+        try:
+            connections = getattr(member, "net_connections", member.connections)(kind="inet")
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+        ports.update(c.laddr.port for c in connections if c.laddr and c.status == psutil.CONN_LISTEN)
+    return ports
+
+
+def _initialize_request() -> str:
+    return json.dumps({
+        "jsonrpc": "2.0", "id": _PROBE_REQUEST_ID, "method": "initialize",
+        "params": {"protocolVersion": LATEST_PROTOCOL_VERSION, "capabilities": {},
+                   "clientInfo": {"name": "mcphub", "version": "readiness-probe"}},
+    }) + "\n"
+
+
+def _is_initialize_response(line: str) -> bool:
+    try:
+        message = json.loads(line)
+    except ValueError:
+        return False
+    return isinstance(message, dict) and message.get("id") == _PROBE_REQUEST_ID and "result" in message
+
+
+def wait_until_ready(process: subprocess.Popen, probe: ReadinessProbe, port: Optional[int] = None,
+                     watcher: Optional[OutputWatcher] = None,
+                     port_lookup: Optional[Callable[[int], Iterable[int]]] = None) -> Readiness:
+    """Wait until ``probe`` passes, the process exits, or the probe times out.
+
+    Port probes poll with exponential backoff from ``initial_interval`` up
+    to ``max_interval``; log and MCP probes wake up as soon as the line
+    they wait for is read.
+
+    Args:
+        process: The started server
+        probe: What to wait for
+        port: Port the server was told to listen on, if any
+        watcher: Reader of the server's output, needed by log and MCP probes
+        port_lookup: Returns the ports a pid listens on, for port probes;
+            defaults to ``listening_ports``
+    """
+    port_lookup = port_lookup or listening_ports
+    start = time.monotonic()
+    if probe.kind == "none":
+        return Readiness(True, 0.0, "not probed")
+
+    event: Optional[threading.Event] = None
+    if probe.kind in ("log", "mcp"):
+        if watcher is None:
+            raise ValueError(f"A '{probe.kind}' readiness probe needs the process output")
+        if probe.kind == "log":
+            pattern = re.compile(probe.pattern)
+            event = watcher.expect(lambda line: pattern.search(line) is not None)
+        else:
+            event = watcher.expect(_is_initialize_response, streams=("stdout",))
+            try:
+                process.stdin.write(_initialize_request())
+                process.stdin.flush()
+            except (AttributeError, OSError, ValueError) as e:
+                return Readiness(False, time.monotonic() - start, f"could not send initialize: {e}")
+
+    def passed() -> bool:
+        if event is not None:
+            return event.is_set()
+        ports = set(port_lookup(process.pid))
+        return port in ports if port is not None else bool(ports)
+
+    interval = probe.initial_interval
+    deadline = start + probe.timeout
+    while True:
+        if passed():
+            if probe.kind == "mcp":
+                try:
+                    process.stdin.write(json.dumps({"jsonrpc": "2.0", "method": "notifications/initialized"}) + "\n")
+                    process.stdin.flush()
+                except (OSError, ValueError):
+                    pass
+            return Readiness(True, time.monotonic() - start, _passed_detail(probe, port))
+        if process.poll() is not None:
+            return Readiness(False, time.monotonic() - start, f"exited with code {process.returncode}")
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return Readiness(False, time.monotonic() - start, f"not ready after {probe.timeout:g}s")
+        if event is not None:
+            event.wait(min(interval, remaining))
+        else:
+            time.sleep(min(interval, remaining))
+        interval = min(interval * 2, probe.max_interval)
+
+
+def _passed_detail(probe: ReadinessProbe, port: Optional[int]) -> str:
+    if probe.kind == "port":
+        return f"listening on port {port}" if port is not None else "listening"
+    if probe.kind == "log":
+        return f"logged /{probe.pattern}/"
+    return "answered initialize"
@@ -0,0 +1,169 @@
+"""CPU, memory, file descriptor and thread usage of managed servers."""
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional
+
+import psutil
+
+
+def default_sample_interval() -> float:
+    """Seconds between samples (MCPHUB_SAMPLE_INTERVAL, default 1)."""
+    return float(os.getenv("MCPHUB_SAMPLE_INTERVAL", 1))
+
+
+@dataclass
+class ResourceSample:
+    """Usage of one server's process tree at one moment."""
+    time: float
+    cpu_percent: float
+    rss: int
+    fds: int
+    threads: int
+    processes: int
+
+
+class _Tracked:
+    """A server being sampled: its history and the psutil handles of its tree.
+
+    Handles are kept between samples because ``cpu_percent`` measures the
+    CPU time used since the previous call on the same handle.
+    """
+
+    def __init__(self, root: psutil.Process, name: str, capacity: int):
+        self.root = root
+        self.name = name
+        self.samples: Deque[ResourceSample] = deque(maxlen=capacity)
+        self.members: Dict[int, psutil.Process] = {}
+
+
+class ResourceSampler:
+    """Samples managed servers into fixed-size ring buffers.
+
+    Every ``interval`` seconds each tracked server's process tree is read
+    with one ``oneshot()`` per process, and the totals are appended to the
+    server's series, which keeps the last ``capacity`` samples. psutil
+    handles are reused between samples.
+    """
+
+    def __init__(self, interval: Optional[float] = None, capacity: int = 300):
+        self.interval = default_sample_interval() if interval is None else interval
+        self.capacity = capacity
+        self._tracked: Dict[int, _Tracked] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def track(self, pid: int, name: str) -> bool:
+        """Start sampling the server ``pid``; False if it is not running."""
+        with self._lock:
+            if pid in self._tracked:
+                return True
+            try:
+                self._tracked[pid] = _Tracked(psutil.Process(pid), name, self.capacity)
+            except psutil.NoSuchProcess:
+                return False
+        return True
+
+    def untrack(self, pid: int) -> None:
+        with self._lock:
+            self._tracked.pop(pid, None)
+
+    def tracked(self) -> List[int]:
+        with self._lock:
+            return list(self._tracked)
+
+    def _read(self, tracked: _Tracked, children_of: Dict[int, List[int]]) -> Optional[ResourceSample]:
+        if not tracked.root.is_running():
+            return None
+        members = {tracked.root.pid: tracked.root}
+        stack = list(children_of.get(tracked.root.pid, ()))
+        while stack:
+            pid = stack.pop()
+            stack.extend(children_of.get(pid, ()))
+            # Keep the handle from the previous sample so cpu_percent has a baseline
+            member = tracked.members.get(pid)
+            if member is None:
+                try:
+                    member = psutil.Process(pid)
+                except psutil.NoSuchProcess:
+                    continue
+            members[pid] = member
+        tracked.members = members
+        sample = ResourceSample(time=time.time(), cpu_percent=0.0, rss=0, fds=0, threads=0, processes=0)
+        for process in members.values():
+            try:
+                with process.oneshot():
+                    sample.cpu_percent += process.cpu_percent(None)
+                    sample.rss += process.memory_info().rss
+                    sample.threads += process.num_threads()
+                    try:
+                        sample.fds += process.num_fds() if hasattr(process, "num_fds") else process.num_handles()
+                    except psutil.AccessDenied:
+                        pass
+                    sample.processes += 1
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        sample.cpu_percent = round(sample.cpu_percent, 1)
+        return sample
+
+    def sample(self) -> Dict[int, ResourceSample]:
+        """Take one sample of every tracked server; servers that exited stop being tracked.
+
+        The process table is read once per sample to find every server's
+        descendants, however many servers are tracked.
+        """
+        with self._lock:
+            tracked = dict(self._tracked)
+        if not tracked:
+            return {}
+        children_of: Dict[int, List[int]] = {}
+        for process in psutil.process_iter(["ppid"]):
+            children_of.setdefault(process.info["ppid"], []).append(process.pid)
+        taken = {}
+        for pid, server in tracked.items():
+            sample = self._read(server, children_of)
+            if sample is None:
+                self.untrack(pid)
+                continue
+            taken[pid] = sample
+        # Series are read under the lock by latest() and export()
+        with self._lock:
+            for pid, sample in taken.items():
+                tracked[pid].samples.append(sample)
+        return taken
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def start(self) -> None:
+        """Sample in a background thread every ``interval`` seconds."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        # Prime cpu_percent, whose first reading of a process is always 0
+        self.sample()
+        self._thread = threading.Thread(target=self._run, name="mcphub-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def latest(self) -> Dict[int, ResourceSample]:
+        """The most recent sample of every tracked server that has one."""
+        with self._lock:
+            return {pid: server.samples[-1] for pid, server in self._tracked.items() if server.samples}
+
+    def export(self) -> Dict[str, Any]:
+        """Every tracked server's series as JSON-serialisable data, for capacity planning."""
+        with self._lock:
+            # Samples hold only numbers, so a shallow copy is enough (asdict deep-copies each field)
+            servers = [{"pid": pid, "name": server.name, "samples": [dict(vars(s)) for s in server.samples]}
+                       for pid, server in self._tracked.items()]
+        return {"interval": self.interval, "capacity": self.capacity, "servers": servers}
@@ -0,0 +1,115 @@
+"""System-wide snapshots of listening sockets, for port discovery in the CLI."""
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+import psutil
+
+
+class SocketSnapshot:
+    """The process tree and listening TCP ports of the whole system at one moment.
+
+    Taking a snapshot costs one ``psutil.net_connections`` call and one
+    pass over the process table; every port and conflict lookup after that
+    is a dictionary access. Where listing all sockets is not permitted
+    (macOS without root), ports are read per process on first use instead.
+    """
+
+    def __init__(self, parents: Dict[int, int], create_times: Dict[int, float],
+                 listening: Optional[Dict[int, Set[int]]]):
+        """
+        Args:
+            parents: Parent pid of every process
+            create_times: Creation time of every process
+            listening: Listening ports by pid, or None to look them up per process
+        """
+        self.parents = parents
+        self.create_times = create_times
+        self.taken_at = time.time()
+        # Without a system-wide listing, ports are filled in per process as they are asked for
+        self._complete = listening is not None
+        self._listening: Dict[int, Set[int]] = listening if listening is not None else {}
+        self._by_port: Optional[Dict[int, Set[int]]] = None
+        self._children: Dict[int, List[int]] = {}
+        for pid, ppid in parents.items():
+            self._children.setdefault(ppid, []).append(pid)
+
+    @classmethod
+    def take(cls) -> "SocketSnapshot":
+        parents: Dict[int, int] = {}
+        create_times: Dict[int, float] = {}
+        for process in psutil.process_iter(["ppid", "create_time"]):
+            parents[process.pid] = process.info["ppid"]
+            create_times[process.pid] = process.info["create_time"]
+        try:
+            connections = psutil.net_connections(kind="inet")
+        except psutil.AccessDenied:
+            return cls(parents, create_times, None)
+        listening: Dict[int, Set[int]] = {}
+        for conn in connections:
+            if conn.pid is not None and conn.laddr and conn.status == psutil.CONN_LISTEN:
+                listening.setdefault(conn.pid, set()).add(conn.laddr.port)
+        return cls(parents, create_times, listening)
+
+    def _own_ports(self, pid: int) -> Set[int]:
+        if not self._complete and pid not in self._listening:
+            try:
+                process = psutil.Process(pid)
+                # Process.connections was renamed in psutil 6
+                connections = getattr(process, "net_connections", process.connections)(kind="inet")
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                connections = []
+            self._listening[pid] = {c.laddr.port for c in connections if c.laddr and c.status == psutil.CONN_LISTEN}
+        return self._listening.get(pid, set())
+
+    def is_running(self, pid: int, create_time: Optional[float] = None) -> bool:
+        """Whether ``pid`` exists, and is the process created at ``create_time`` if given."""
+        if pid not in self.create_times:
+            return False
+        return create_time is None or self.create_times[pid] == create_time
+
+    def descendants(self, pid: int) -> List[int]:
+        """All children of ``pid``, recursively."""
+        found = []
+        stack = list(self._children.get(pid, ()))
+        while stack:
+            child = stack.pop()
+            found.append(child)
+            stack.extend(self._children.get(child, ()))
+        return found
+
+    def ports(self, pid: int) -> List[int]:
+        """Ports that ``pid`` or any of its descendants listen on."""
+        ports: Set[int] = set()
+        for member in [pid, *self.descendants(pid)]:
+            ports |= self._own_ports(member)
+        return sorted(ports)
+
+    def owners(self, port: int, candidates: Iterable[int] = ()) -> Set[int]:
+        """Pids listening on ``port``.
+
+        When ports are looked up per process, only ``candidates`` and their
+        descendants are checked.
+        """
+        if not self._complete:
+            return {pid for root in candidates for pid in [root, *self.descendants(root)]
+                    if port in self._own_ports(pid)}
+        if self._by_port is None:
+            self._by_port = {}
+            for pid, ports in self._listening.items():
+                for listened in ports:
+                    self._by_port.setdefault(listened, set()).add(pid)
+        return self._by_port.get(port, set())
+
+    def root_of(self, pid: int, roots: Iterable[int]) -> Optional[int]:
+        """The nearest of ``roots`` that is ``pid`` or one of its ancestors."""
+        roots = set(roots)
+        seen = set()
+        while pid not in seen:
+            if pid in roots:
+                return pid
+            seen.add(pid)
+            parent = self.parents.get(pid)
+            if parent is None:
+                return None
+            pid = parent
+        return None
@@ -3,6 +3,7 @@ import json
 import os
 import re
 from pathlib import Path
+from urllib.parse import urlparse
 from typing import Dict, Any, Optional, List, Tuple
 from rich.console import Console
 from rich.theme import Theme
@@ -23,6 +24,10 @@ import psutil
 import socket
 from datetime import datetime
 
+from ..mcp_servers.config import ConfigStore, config_cache
+from ..mcp_servers.env import CompiledEnv, EnvResolver, get_env_var
+from ..mcp_servers.launch import LaunchResolver
+
 # Initialize rich console with custom theme
 console = Console(theme=Theme({
     "info": "cyan",
@@ -188,14 +193,89 @@ def load_config() -> Dict[str, Any]:
     config_path = get_config_path()
     if not config_path.exists():
         save_config(DEFAULT_CONFIG)
-    with open(config_path, "r") as f:
-        return json.load(f)
+    return config_cache.load(config_path)
+
+def get_config_store() -> ConfigStore:
+    """Get a locked, atomic writer for the .mcphub.json config file."""
+    return ConfigStore(get_config_path())
 
 def save_config(config: Dict[str, Any]) -> None:
-    """Save the config to the .mcphub.json file."""
-    config_path = get_config_path()
-    with open(config_path, "w") as f:
-        json.dump(config, f, indent=2)
+    """Save the config to the .mcphub.json file.
+    
+    Prefer get_config_store().patch_server() for single-entry changes, which
+    does not overwrite entries written concurrently by other processes.
+    """
+    get_config_store().write(config)
+
+_env_resolvers: Dict[Path, EnvResolver] = {}
+
+def get_env_resolver() -> EnvResolver:
+    """Get the resolver for ${VAR} templates: os.environ, then .env next to .mcphub.json."""
+    env_file = get_config_path().parent / ".env"
+    if env_file not in _env_resolvers:
+        _env_resolvers[env_file] = EnvResolver([env_file])
+    return _env_resolvers[env_file]
+
+def get_launch_resolver() -> LaunchResolver:
+    """Get the cache of resolved npx/uvx entrypoints in .mcphub_cache."""
+    return LaunchResolver(get_config_path().parent / ".mcphub_cache" / "launch.json")
+
+def server_name_from_repo_url(repo_url: str) -> str:
+    """Derive the default server name ("username/repo") from a GitHub URL.
+    
+    Raises:
+        ValueError: If the URL is not a github.com repository URL
+    """
+    parsed_url = urlparse(repo_url)
+    if parsed_url.netloc != "github.com":
+        raise ValueError("Only GitHub repositories are supported")
+    path_parts = parsed_url.path.strip("/").split("/")
+    if len(path_parts) != 2:
+        raise ValueError("Invalid GitHub repository URL")
+    return "/".join(path_parts)
+
+def load_add_manifest(path: Path) -> List[Tuple[str, Optional[str]]]:
+    """Read the repositories to add from a manifest file.
+    
+    Text manifests have one "<repo_url> [name]" entry per line; blank lines
+    and lines starting with # are ignored. JSON manifests are a list of
+    URLs or {"repo_url": ..., "name": ...} objects, or an object mapping
+    names to URLs.
+    
+    Args:
+        path: Path to the manifest file
+        
+    Returns:
+        List of (repo_url, name or None) entries in file order
+        
+    Raises:
+        ValueError: If the manifest is malformed
+    """
+    text = Path(path).read_text()
+    entries: List[Tuple[str, Optional[str]]] = []
+    if Path(path).suffix.lower() == ".json":
+        data = json.loads(text)
+        if isinstance(data, dict):
+            data = [{"name": name, "repo_url": url} for name, url in data.items()]
+        if not isinstance(data, list):
+            raise ValueError("JSON manifest must be a list or an object")
+        for item in data:
+            if isinstance(item, str):
+                entries.append((item, None))
+            elif isinstance(item, dict) and isinstance(item.get("repo_url"), str):
+                entries.append((item["repo_url"], item.get("name")))
+            else:
+                raise ValueError(f"Invalid manifest entry: {item!r}")
+        return entries
+    for line_number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = line.split()
+        if len(parts) > 2:
+            raise ValueError(f"Line {line_number}: expected '<repo_url> [name]'")
+        entries.append((parts[0], parts[1] if len(parts) == 2 else None))
+    return entries
 
 def detect_env_vars(server_config: Dict[str, Any]) -> List[str]:
     """Detect environment variables in a server configuration.
@@ -206,42 +286,25 @@ def detect_env_vars(server_config: Dict[str, Any]) -> List[str]:
     Returns:
         List of environment variable names found in the configuration
     """
-    env_vars = []
-    
-    # Check if the server has env section
-    if "env" in server_config and isinstance(server_config["env"], dict):
-        for key, value in server_config["env"].items():
-            # Check if value is a template like ${ENV_VAR}
-            if isinstance(value, str) and value.startswith("${") and value.endswith("}"):
-                env_var = value[2:-1]  # Extract ENV_VAR from ${ENV_VAR}
-                env_vars.append(env_var)
-    
-    return env_vars
+    env = server_config.get("env")
+    if not isinstance(env, dict):
+        return []
+    # Finds ${VAR} references anywhere in a value, including ${VAR:-default}
+    return list(CompiledEnv(env).variables)
 
 def check_env_var(var: str) -> Optional[str]:
     """Check if an environment variable exists and return its value.
     
+    Reads the process environment and .env file directly instead of
+    spawning a shell for each variable.
+    
     Args:
         var: Environment variable name
         
     Returns:
         The value of the environment variable if it exists, None otherwise
     """
-    try:
-        # Use subprocess to run echo command and capture output
-        result = subprocess.run(
-            f"echo ${var}",
-            shell=True,
-            capture_output=True,
-            text=True
-        )
-        value = result.stdout.strip()
-        # If echo returns empty or the variable name, the variable doesn't exist
-        if not value or value == f"${var}":
-            return None
-        return value
-    except Exception:
-        return None
+    return get_env_var(var, get_env_resolver())
 
 def prompt_env_vars(env_vars: List[str]) -> Dict[str, str]:
     """Check and prompt for environment variables.
@@ -312,26 +375,17 @@ def process_env_vars(server_config: Dict[str, Any]) -> Dict[str, Any]:
     if "env" not in config or not isinstance(config["env"], dict):
         return config
     
-    # New env dict to store processed values
-    new_env = {}
+    compiled = CompiledEnv(config["env"])
+    resolver = get_env_resolver()
     
-    for key, value in config["env"].items():
-        if isinstance(value, str) and value.startswith("${") and value.endswith("}"):
-            env_var = value[2:-1]  # Extract ENV_VAR from ${ENV_VAR}
-            
-            # Check if variable exists in environment
-            env_value = check_env_var(env_var)
-            if env_value:
-                new_env[key] = env_value
-            else:
-                show_error(
-                    f"Required environment variable {env_var} is not set",
-                    help_text=f"Please set it using: export {env_var}=<value>"
-                )
-                sys.exit(1)
-        else:
-            # Keep non-template values as is
-            new_env[key] = value
+    for env_var in compiled.missing(resolver):
+        show_error(
+            f"Required environment variable {env_var} is not set",
+            help_text=f"Please set it using: export {env_var}=<value>"
+        )
+        sys.exit(1)
+    
+    new_env = compiled.resolve(resolver)
     
     # Update the env section
     config["env"] = new_env
@@ -346,12 +400,7 @@ def remove_server_config(name: str) -> bool:
     Returns:
         bool: True if the server was removed, False if it wasn't in the config
     """
-    config = load_config()
-    if name in config.get("mcpServers", {}):
-        del config["mcpServers"][name]
-        save_config(config)
-        return True
-    return False
+    return get_config_store().remove_server(name)
 
 def list_configured_servers() -> Dict[str, Any]:
     """List all servers in the local config."""
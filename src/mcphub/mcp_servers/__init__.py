@@ -1,4 +1,4 @@
 from .params import MCPServerConfig, MCPServersParams
-from .servers import MCPServers
+from .servers import MCPServers, SetupResult, UpdateResult
 
-__all__ = ["MCPServerConfig", "MCPServersParams", "MCPServers"]
\ No newline at end of file
+__all__ = ["MCPServerConfig", "MCPServersParams", "MCPServers", "SetupResult", "UpdateResult"]
\ No newline at end of file
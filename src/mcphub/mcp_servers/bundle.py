@@ -0,0 +1,399 @@
+"""Export and import prebuilt ``.mcphub_cache`` directories as verified archives."""
+import hashlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import tarfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .cache import RepositoryCache
+from .exceptions import BundleError
+
+BUNDLE_VERSION = 1
+MANIFEST_NAME = "mcphub-bundle.json"
+
+# Regenerated or process-local files that are never bundled
+_SKIPPED_TOP_LEVEL = {"logs"}
+_SKIPPED_SUFFIXES = (".lock", ".tmp", ".link")
+_SKIPPED_NAMES = {"setup_temp.sh"}
+_SKIPPED_PREFIXES = (".mcphub-setup-",)
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class BundleSummary:
+    """What a bundle export or import covered."""
+    path: Path
+    files: int = 0
+    size: int = 0
+    links: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+
+
+def _skipped(name: str) -> bool:
+    return name in _SKIPPED_NAMES or name.endswith(_SKIPPED_SUFFIXES) or name.startswith(_SKIPPED_PREFIXES)
+
+
+def _walk(root: Path) -> Iterator[Path]:
+    """Yield every directory, file and symlink below ``root`` without following symlinks."""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        for entry in sorted(os.scandir(directory), key=lambda e: e.name, reverse=True):
+            if _skipped(entry.name):
+                continue
+            path = Path(entry.path)
+            yield path
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(path)
+
+
+def _dissociate(repo_dir: Path, staging: Path) -> Optional[Path]:
+    """Copy a clone's git directory into ``staging`` with the objects it borrows from a shared mirror.
+
+    The live clone is left untouched; the returned git directory is bundled
+    in its place so the checkout works on other hosts. Returns None for
+    clones that borrow nothing.
+    """
+    alternates = repo_dir / ".git" / "objects" / "info" / "alternates"
+    if not alternates.exists():
+        return None
+    git_dir = staging / f"{repo_dir.parent.name}-{repo_dir.name}.git"
+    shutil.copytree(repo_dir / ".git", git_dir, symlinks=True)
+    subprocess.run(["git", "--git-dir", str(git_dir), "repack", "-a", "-d", "-q"],
+                   check=True, capture_output=True, text=True)
+    (git_dir / "objects" / "info" / "alternates").unlink()
+    return git_dir
+
+
+class _ArchiveWriter:
+    def __init__(self, tar: tarfile.TarFile):
+        self.tar = tar
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.size = 0
+
+    def add_tree(self, root: Path, prefix: str, git_dir: Optional[Path] = None) -> None:
+        """Add ``root`` and everything below it, taking its ``.git`` from ``git_dir`` if given."""
+        self.add(root, prefix)
+        for path in _walk(root):
+            relative = path.relative_to(root)
+            if git_dir is not None and relative.parts[0] == ".git":
+                continue
+            self.add(path, f"{prefix}/{relative.as_posix()}")
+        if git_dir is not None:
+            self.add_tree(git_dir, f"{prefix}/.git")
+
+    def add(self, path: Path, name: str) -> None:
+        info = self.tar.gettarinfo(str(path), arcname=name)
+        # Ownership is meaningless on the importing host
+        info.uid = info.gid = 0
+        info.uname = info.gname = ""
+        if info.issym():
+            self.tar.addfile(info)
+            self.entries[name] = {"type": "symlink", "target": info.linkname}
+        elif info.isdir():
+            self.tar.addfile(info)
+            self.entries[name] = {"type": "dir", "mode": info.mode}
+        elif info.isfile():
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                reader = _HashingReader(f, digest)
+                self.tar.addfile(info, reader)
+            self.entries[name] = {"type": "file", "mode": info.mode, "size": info.size,
+                                  "sha256": digest.hexdigest()}
+            self.size += info.size
+        # Sockets, fifos and devices are skipped
+
+
+class _HashingReader(io.RawIOBase):
+    """File wrapper that hashes everything read through it."""
+
+    def __init__(self, f, digest):
+        self.f = f
+        self.digest = digest
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.f.read(size)
+        self.digest.update(data)
+        return data
+
+    def readable(self) -> bool:
+        return True
+
+
+def export_bundle(cache_dir: Path, output: Path, global_cache: Optional[RepositoryCache] = None) -> BundleSummary:
+    """Pack a project's ``.mcphub_cache`` into a compressed archive.
+
+    Checkouts, setup stamps, resolved launch commands and tool catalogs are
+    included; logs and lock files are not. Checkouts that link into the
+    user-level repository cache are bundled together with their cache entry
+    and stamp, so the importing host can restore the same layout.
+
+    Every file is listed in a manifest with its SHA-256, which
+    ``import_bundle`` verifies before anything is installed.
+
+    Args:
+        cache_dir: The project's .mcphub_cache directory
+        output: Archive to write (.tar.gz, .tar.xz or .tar)
+        global_cache: Repository cache that symlinked checkouts point into
+
+    Returns:
+        A summary of the exported files
+    """
+    cache_dir = Path(cache_dir)
+    if not cache_dir.is_dir():
+        raise BundleError(f"Cache directory {cache_dir} does not exist")
+    output = Path(output)
+    summary = BundleSummary(output)
+    links: Dict[str, str] = {}
+    global_entries: List[Path] = []
+    local_entries: List[Path] = []
+    repos_root = global_cache.repos_dir.resolve() if global_cache is not None else None
+
+    for entry in sorted(cache_dir.iterdir()):
+        if entry.name in _SKIPPED_TOP_LEVEL or _skipped(entry.name):
+            continue
+        if entry.is_symlink():
+            target = entry.resolve()
+            if repos_root is None or repos_root not in target.parents or not target.is_dir():
+                summary.warnings.append(f"{entry.name}: skipped link to {target} outside the repository cache")
+                continue
+            links[entry.name] = target.relative_to(repos_root).as_posix()
+            if target not in global_entries:
+                global_entries.append(target)
+        else:
+            local_entries.append(entry)
+
+    mode = {".xz": "w:xz", ".tar": "w"}.get(output.suffix, "w:gz")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_output = output.with_name(f".{output.name}.{os.getpid()}.tmp")
+    staging = output.with_name(f".{output.name}.{os.getpid()}.staging")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir()
+    try:
+        git_dirs: Dict[Path, Path] = {}
+        for entry in local_entries + global_entries:
+            if entry.is_dir() and (entry / ".git").is_dir():
+                try:
+                    git_dir = _dissociate(entry, staging)
+                except (OSError, subprocess.CalledProcessError) as e:
+                    raise BundleError(f"Failed to make {entry} self-contained: {getattr(e, 'stderr', e)}")
+                if git_dir is not None:
+                    git_dirs[entry] = git_dir
+                    summary.warnings.append(f"{entry.name}: bundled objects borrowed from the git mirror")
+
+        with tarfile.open(tmp_output, mode) as tar:
+            writer = _ArchiveWriter(tar)
+            for entry in local_entries:
+                if entry.is_dir():
+                    writer.add_tree(entry, f"cache/{entry.name}", git_dirs.get(entry))
+                else:
+                    writer.add(entry, f"cache/{entry.name}")
+            for target in global_entries:
+                relative = target.relative_to(repos_root).as_posix()
+                writer.add_tree(target, f"global/{relative}", git_dirs.get(target))
+                for extra in [target.parent / "url"] + RepositoryCache.stamp_paths(target):
+                    if extra.is_file():
+                        writer.add(extra, f"global/{extra.relative_to(repos_root).as_posix()}")
+
+            manifest = json.dumps({
+                "version": BUNDLE_VERSION,
+                "created_at": time.time(),
+                "cache_dir": str(cache_dir.resolve()),
+                "links": links,
+                "entries": writer.entries,
+            }, indent=2).encode()
+            info = tarfile.TarInfo(MANIFEST_NAME)
+            info.size = len(manifest)
+            info.mtime = int(time.time())
+            tar.addfile(info, io.BytesIO(manifest))
+        os.replace(tmp_output, output)
+    finally:
+        if tmp_output.exists():
+            tmp_output.unlink()
+        shutil.rmtree(staging, ignore_errors=True)
+
+    summary.files = sum(1 for e in writer.entries.values() if e["type"] == "file")
+    summary.size = writer.size
+    summary.links = sorted(links)
+    return summary
+
+
+def _read_manifest(tar: tarfile.TarFile) -> Dict[str, Any]:
+    try:
+        member = tar.getmember(MANIFEST_NAME)
+        manifest = json.load(tar.extractfile(member))
+    except (KeyError, ValueError, AttributeError) as e:
+        raise BundleError(f"Bundle has no valid {MANIFEST_NAME}: {e}")
+    if manifest.get("version") != BUNDLE_VERSION:
+        raise BundleError(f"Unsupported bundle version {manifest.get('version')}")
+    return manifest
+
+
+def _safe_path(root: Path, name: str) -> Path:
+    """Resolve an archive member below ``root``, refusing anything that escapes it."""
+    parts = Path(name).parts
+    if not parts or Path(name).is_absolute() or ".." in parts:
+        raise BundleError(f"Refusing unsafe path {name!r} in bundle")
+    path = root.joinpath(*parts)
+    # Parents must be real directories below root, never symlinks out of it
+    if not os.path.realpath(path.parent).startswith(os.path.realpath(root) + os.sep) and path.parent != root:
+        raise BundleError(f"Refusing path {name!r} that resolves outside the bundle")
+    return path
+
+
+def _check_links(links: Dict[str, str], cache_dir: Path, staged_global: Path,
+                 repos_dir: Path) -> List[Tuple[Path, Path]]:
+    """Resolve the manifest's links to (link path, cache entry) pairs, refusing any that escape.
+
+    Link names must be single entries of ``cache_dir`` and targets must be
+    bundled entries below ``repos_dir``.
+    """
+    if not staged_global.is_dir():
+        raise BundleError("Bundle lists linked checkouts but contains no repository cache entries")
+    resolved = []
+    for name, relative in links.items():
+        if "/" in name or os.sep in name:
+            raise BundleError(f"Refusing unsafe link name {name!r} in bundle")
+        link_path = _safe_path(cache_dir, name)
+        if not _safe_path(staged_global, relative).is_dir():
+            raise BundleError(f"Link {name!r} points to {relative!r}, which is not in the bundle")
+        resolved.append((link_path, _safe_path(repos_dir, relative)))
+    return resolved
+
+
+def _extract_verified(tar: tarfile.TarFile, manifest: Dict[str, Any], staging: Path) -> Tuple[int, int]:
+    """Extract every listed member into ``staging``, checking it against the manifest."""
+    entries: Dict[str, Dict[str, Any]] = manifest["entries"]
+    seen = set()
+    files = size = 0
+    for member in tar:
+        if member.name == MANIFEST_NAME:
+            continue
+        expected = entries.get(member.name)
+        if expected is None:
+            raise BundleError(f"{member.name} is not listed in the bundle manifest")
+        path = _safe_path(staging, member.name)
+        if member.isdir() and expected["type"] == "dir":
+            path.mkdir(parents=True, exist_ok=True)
+        elif member.issym() and expected["type"] == "symlink" and member.linkname == expected["target"]:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.symlink(member.linkname, path)
+        elif member.isfile() and expected["type"] == "file":
+            path.parent.mkdir(parents=True, exist_ok=True)
+            digest = hashlib.sha256()
+            source = tar.extractfile(member)
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_NOFOLLOW", 0),
+                         expected["mode"] & 0o777)
+            with os.fdopen(fd, "wb") as f:
+                for chunk in iter(lambda: source.read(_CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                    f.write(chunk)
+            if digest.hexdigest() != expected["sha256"]:
+                raise BundleError(f"Checksum mismatch for {member.name}")
+            files += 1
+            size += member.size
+        else:
+            raise BundleError(f"{member.name} does not match its manifest entry")
+        seen.add(member.name)
+    missing = set(entries) - seen
+    if missing:
+        raise BundleError(f"Bundle is missing {len(missing)} files, e.g. {sorted(missing)[0]}")
+    # Directory modes are restored last so read-only directories can be filled first
+    for name, expected in entries.items():
+        if expected["type"] == "dir":
+            os.chmod(_safe_path(staging, name), expected["mode"] & 0o777)
+    return files, size
+
+
+def _install(source: Path, destination: Path) -> None:
+    """Move ``source`` to ``destination``, replacing whatever is there."""
+    if destination.is_symlink() or destination.is_file():
+        destination.unlink()
+    elif destination.exists():
+        shutil.rmtree(destination)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(source, destination)
+
+
+def import_bundle(archive: Path, cache_dir: Path, global_cache: Optional[RepositoryCache] = None) -> BundleSummary:
+    """Restore a bundle created by ``export_bundle`` into ``cache_dir``.
+
+    The archive is extracted into a staging directory and every file is
+    checked against the manifest checksums first; nothing in ``cache_dir``
+    changes unless the whole bundle verifies. Entries already present in
+    ``cache_dir`` with the same name are replaced.
+
+    Checkouts should be restored at the same absolute path they were
+    exported from, since virtualenvs and installed scripts embed it; a
+    warning is returned otherwise.
+
+    Args:
+        archive: Bundle to import
+        cache_dir: The project's .mcphub_cache directory
+        global_cache: Repository cache to restore linked checkouts into
+            (defaults to the user-level cache)
+
+    Returns:
+        A summary of the imported files
+    """
+    archive = Path(archive)
+    cache_dir = Path(cache_dir)
+    summary = BundleSummary(archive)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    staging = cache_dir.parent / f".{cache_dir.name}.import-{os.getpid()}"
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir()
+    try:
+        try:
+            with tarfile.open(archive, "r:*") as tar:
+                manifest = _read_manifest(tar)
+                summary.files, summary.size = _extract_verified(tar, manifest, staging)
+        except (tarfile.TarError, EOFError, OSError) as e:
+            raise BundleError(f"Failed to read bundle {archive}: {e}")
+
+        if manifest.get("cache_dir") != str(cache_dir.resolve()):
+            summary.warnings.append(
+                f"Bundle was exported from {manifest.get('cache_dir')}; environments that embed "
+                f"absolute paths may need their setup re-run (mcphub setup --force)"
+            )
+
+        links: Dict[str, str] = manifest.get("links", {})
+        if links:
+            global_cache = global_cache or RepositoryCache()
+            staged_global = staging / "global"
+            # Every link is checked before anything is installed
+            resolved = _check_links(links, cache_dir, staged_global, global_cache.repos_dir)
+            for repo_dir in sorted(staged_global.iterdir()):
+                target_repo = global_cache.repos_dir / repo_dir.name
+                target_repo.mkdir(parents=True, exist_ok=True)
+                for item in sorted(repo_dir.iterdir()):
+                    if item.name == ".stamps":
+                        for stamp in item.iterdir():
+                            _install(stamp, target_repo / ".stamps" / stamp.name)
+                    elif item.name == "url":
+                        if not (target_repo / "url").exists():
+                            _install(item, target_repo / "url")
+                    else:
+                        _install(item, target_repo / item.name)
+            for link_path, entry in resolved:
+                if link_path.exists() and not link_path.is_symlink():
+                    # A project-local clone with the same name is superseded by the link
+                    shutil.rmtree(link_path)
+                global_cache.link(entry, link_path)
+                global_cache.record_access(entry, cache_dir)
+            summary.links = sorted(links)
+
+        staged_cache = staging / "cache"
+        if staged_cache.is_dir():
+            for item in sorted(staged_cache.iterdir()):
+                _install(item, cache_dir / item.name)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return summary
@@ -0,0 +1,281 @@
+"""User-level repository cache shared between projects."""
+import hashlib
+import os
+import re
+import shutil
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+from .locks import path_lock
+
+_SIZE_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([kmgt]?)i?b?\s*$", re.IGNORECASE)
+_SIZE_UNITS = {"": 1, "k": 1024, "m": 1024 ** 2, "g": 1024 ** 3, "t": 1024 ** 4}
+
+
+def parse_size(value: str) -> int:
+    """Parse sizes such as "500M", "2G" or "1073741824" into bytes."""
+    match = _SIZE_RE.match(value)
+    if not match:
+        raise ValueError(f"Invalid size: {value!r}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).lower()])
+
+
+def format_size(size: int) -> str:
+    for unit in ("B", "K", "M", "G"):
+        if size < 1024:
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}T"
+
+
+def default_cache_root() -> Path:
+    """Return MCPHUB_CACHE_DIR, or ``mcphub`` under the XDG cache directory."""
+    value = os.getenv("MCPHUB_CACHE_DIR")
+    if value:
+        return Path(value).expanduser()
+    return Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "mcphub"
+
+
+def global_cache_from_env() -> Optional["RepositoryCache"]:
+    """Return the cache enabled by MCPHUB_GLOBAL_CACHE ("1" or a directory), if any."""
+    value = os.getenv("MCPHUB_GLOBAL_CACHE", "").strip()
+    if not value or value.lower() in ("0", "false", "no"):
+        return None
+    if value.lower() in ("1", "true", "yes"):
+        return RepositoryCache()
+    return RepositoryCache(Path(value).expanduser())
+
+
+def _tree_size(path: Path) -> int:
+    total = 0
+    stack = [path]
+    while stack:
+        try:
+            entries = list(os.scandir(stack.pop()))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(Path(entry.path))
+                else:
+                    total += entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                continue
+    return total
+
+
+@dataclass
+class CacheEntry:
+    """A checkout of one repository at one commit."""
+    path: Path
+    repo_url: Optional[str]
+    commit: str
+    size: int
+    last_access: float
+
+
+class RepositoryCache:
+    """Checkouts keyed by (repository URL, commit), shared between projects.
+
+    Layout::
+
+        <root>/repos/<name>-<url hash>/<commit>/   checkout
+        <root>/repos/<name>-<url hash>/.stamps/    setup stamps per commit and setup script
+        <root>/repos/<name>-<url hash>/url         the repository URL
+        <root>/access.log                          "<time>\\t<entry>\\t<project>" lines
+
+    Projects link to entries from their ``.mcphub_cache``. ``gc`` removes the
+    least recently used entries until the cache fits a size budget.
+    """
+
+    def __init__(self, root: Optional[Union[str, Path]] = None):
+        self.root = Path(root) if root is not None else default_cache_root()
+        self.repos_dir = self.root / "repos"
+        self.access_log = self.root / "access.log"
+
+    def repo_dir(self, repo_url: str) -> Path:
+        name = repo_url.rstrip("/").split("/")[-1]
+        if name.endswith(".git"):
+            name = name[:-len(".git")]
+        digest = hashlib.sha256(repo_url.encode()).hexdigest()[:16]
+        return self.repos_dir / f"{name}-{digest}"
+
+    def entry_dir(self, repo_url: str, commit: str) -> Path:
+        return self.repo_dir(repo_url) / commit
+
+    def prepare(self, repo_url: str) -> Path:
+        """Create the repository's directory and record its URL."""
+        repo_dir = self.repo_dir(repo_url)
+        repo_dir.mkdir(parents=True, exist_ok=True)
+        url_file = repo_dir / "url"
+        if not url_file.exists():
+            url_file.write_text(repo_url + "\n")
+        return repo_dir
+
+    def record_access(self, entry: Path, project: Optional[Path] = None) -> None:
+        """Append a line to the access log.
+
+        The log lock is held so an append never lands between a compaction's
+        read and its replace of the log.
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        relative = entry.relative_to(self.repos_dir).as_posix()
+        line = f"{time.time():.3f}\t{relative}\t{project or ''}\n"
+        with path_lock(self.access_log):
+            fd = os.open(self.access_log, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line.encode())
+            finally:
+                os.close(fd)
+
+    def _access_records(self) -> Dict[str, Dict[str, float]]:
+        """Return the last access of each entry by each project ("" when unknown)."""
+        records: Dict[str, Dict[str, float]] = {}
+        try:
+            with open(self.access_log, "r") as f:
+                for line in f:
+                    parts = line.rstrip("\n").split("\t")
+                    if len(parts) < 2:
+                        continue
+                    try:
+                        timestamp = float(parts[0])
+                    except ValueError:
+                        continue
+                    projects = records.setdefault(parts[1], {})
+                    project = parts[2] if len(parts) > 2 else ""
+                    if timestamp > projects.get(project, 0.0):
+                        projects[project] = timestamp
+        except FileNotFoundError:
+            pass
+        return records
+
+    def _last_access(self) -> Dict[str, float]:
+        return {relative: max(projects.values()) for relative, projects in self._access_records().items()}
+
+    @staticmethod
+    def _is_linked(entry: Path, projects: List[str]) -> bool:
+        """True if one of the projects' caches still has a link resolving to ``entry``."""
+        target = entry.resolve()
+        for project in projects:
+            if not project:
+                continue
+            try:
+                children = list(os.scandir(project))
+            except OSError:
+                continue
+            for child in children:
+                if child.is_symlink() and Path(child.path).resolve() == target:
+                    return True
+        return False
+
+    def _iter_entry_dirs(self) -> Iterator[Path]:
+        if not self.repos_dir.is_dir():
+            return
+        for repo_dir in sorted(self.repos_dir.iterdir()):
+            if not repo_dir.is_dir():
+                continue
+            for entry in sorted(repo_dir.iterdir()):
+                # Skip stamps, lock files and half-finished clones
+                if entry.is_dir() and not entry.name.startswith(".") and "." not in entry.name:
+                    yield entry
+
+    def entries(self) -> List[CacheEntry]:
+        """Return all entries, least recently used first."""
+        last_access = self._last_access()
+        entries = []
+        for path in self._iter_entry_dirs():
+            relative = path.relative_to(self.repos_dir).as_posix()
+            try:
+                repo_url = (path.parent / "url").read_text().strip() or None
+            except OSError:
+                repo_url = None
+            accessed = last_access.get(relative)
+            if accessed is None:
+                accessed = path.stat().st_mtime
+            entries.append(CacheEntry(path, repo_url, path.name, _tree_size(path), accessed))
+        entries.sort(key=lambda e: e.last_access)
+        return entries
+
+    @staticmethod
+    def stamp_paths(entry: Path) -> List[Path]:
+        """The setup stamps of an entry, one per setup script run in it."""
+        stamps_dir = entry.parent / ".stamps"
+        if not stamps_dir.is_dir():
+            return []
+        return sorted(p for p in stamps_dir.iterdir()
+                      if p.name == f"{entry.name}.json" or (p.name.startswith(f"{entry.name}-") and p.suffix == ".json"))
+
+    def remove(self, entry: Path) -> None:
+        """Delete an entry and its setup stamps."""
+        with path_lock(entry):
+            shutil.rmtree(entry, ignore_errors=True)
+            for stamp in self.stamp_paths(entry):
+                try:
+                    stamp.unlink()
+                except FileNotFoundError:
+                    pass
+        try:
+            os.unlink(f"{entry}.lock")
+        except FileNotFoundError:
+            pass
+
+    def gc(self, max_size: int, dry_run: bool = False, force: bool = False) -> List[CacheEntry]:
+        """Remove least recently used entries until the cache is at most ``max_size`` bytes.
+
+        Entries that a project recorded in the access log still links to are
+        kept, since removing them would leave a dangling checkout that is
+        cloned again on the next setup, unless ``force`` is True.
+
+        Returns:
+            The removed entries (or the ones that would be removed when ``dry_run``)
+        """
+        entries = self.entries()
+        records = self._access_records()
+        total = sum(e.size for e in entries)
+        removed = []
+        for entry in entries:
+            if total <= max_size:
+                break
+            relative = entry.path.relative_to(self.repos_dir).as_posix()
+            if not force and self._is_linked(entry.path, list(records.get(relative, ()))):
+                continue
+            if not dry_run:
+                self.remove(entry.path)
+            removed.append(entry)
+            total -= entry.size
+        if not dry_run and removed:
+            self._compact_access_log()
+        return removed
+
+    def _compact_access_log(self) -> None:
+        """Rewrite the access log with one line per remaining entry and project."""
+        with path_lock(self.access_log):
+            existing = {e.relative_to(self.repos_dir).as_posix() for e in self._iter_entry_dirs()}
+            lines = sorted(
+                (timestamp, relative, project)
+                for relative, projects in self._access_records().items() if relative in existing
+                for project, timestamp in projects.items()
+            )
+            tmp_path = self.access_log.with_name(f"{self.access_log.name}.{os.getpid()}.tmp")
+            with open(tmp_path, "w") as f:
+                for timestamp, relative, project in lines:
+                    f.write(f"{timestamp:.3f}\t{relative}\t{project}\n")
+            os.replace(tmp_path, self.access_log)
+
+    @staticmethod
+    def link(entry: Path, link_path: Path) -> None:
+        """Point ``link_path`` at ``entry``, atomically replacing an older link."""
+        if link_path.is_symlink() and os.readlink(link_path) == str(entry):
+            return
+        if link_path.exists() and not link_path.is_symlink():
+            raise FileExistsError(f"{link_path} exists and is not a link into the repository cache")
+        tmp_link = link_path.with_name(f".{link_path.name}.{os.getpid()}.link")
+        try:
+            os.unlink(tmp_link)
+        except FileNotFoundError:
+            pass
+        os.symlink(entry, tmp_link, target_is_directory=True)
+        os.replace(tmp_link, link_path)
@@ -0,0 +1,90 @@
+"""Cached tool lists, so servers are not spawned just to list their tools."""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote
+
+from mcp import StdioServerParameters, Tool
+
+from .fingerprint import git_head
+
+CATALOG_VERSION = 1
+
+
+def catalog_fingerprint(server_params: StdioServerParameters) -> str:
+    """Hash everything that decides which tools a server exposes.
+
+    The environment is part of the hash, so values such as API keys are
+    never stored in the catalog itself.
+    """
+    cwd = str(server_params.cwd) if server_params.cwd else None
+    payload = json.dumps([
+        CATALOG_VERSION,
+        server_params.command,
+        list(server_params.args),
+        dict(sorted((server_params.env or {}).items())),
+        cwd,
+        git_head(Path(cwd)) if cwd else None,
+    ])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ToolCatalog:
+    """Per-server tool lists kept in ``<cache_dir>/tools``.
+
+    An entry is used only while the server's launch command, environment
+    and checked-out commit are unchanged.
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.catalog_dir = Path(cache_dir) / "tools"
+
+    def _path(self, server_name: str) -> Path:
+        return self.catalog_dir / (quote(server_name, safe="") + ".json")
+
+    def _read(self, server_name: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(server_name), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def get(self, server_name: str, fingerprint: str) -> Optional[List[Tool]]:
+        entry = self._read(server_name)
+        if entry is None or entry.get("fingerprint") != fingerprint:
+            return None
+        try:
+            return [Tool.model_validate(tool) for tool in entry["tools"]]
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def put(self, server_name: str, fingerprint: str, tools: List[Tool]) -> None:
+        try:
+            self.catalog_dir.mkdir(parents=True, exist_ok=True)
+            path = self._path(server_name)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, "w") as f:
+                json.dump({
+                    "fingerprint": fingerprint,
+                    "created_at": time.time(),
+                    "tools": [tool.model_dump(mode="json", exclude_none=True) for tool in tools],
+                }, f, indent=2)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+    def forget(self, server_name: str) -> None:
+        try:
+            self._path(server_name).unlink()
+        except FileNotFoundError:
+            pass
+
+    def server_names(self) -> List[str]:
+        """Return the servers that have a cached tool list."""
+        if not self.catalog_dir.is_dir():
+            return []
+        return sorted(path.name[:-len(".json")] for path in self.catalog_dir.glob("*.json"))
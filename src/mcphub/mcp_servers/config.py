@@ -0,0 +1,376 @@
+"""Loading, caching and watching of .mcphub.json configuration files."""
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from .locks import FileLock
+
+PathLike = Union[str, Path]
+
+# Fields that change how a server process is launched; a change requires a restart.
+RESTART_FIELDS = ("command", "args", "env", "cwd")
+# Fields that change how a server is installed; a change requires a new setup.
+SETUP_FIELDS = ("repo_url", "repo_ref", "setup_script", "setup_mode")
+
+# Files modified this close to the time they were cached are re-read on the next
+# lookup, since coarse filesystem timestamps cannot tell two quick writes apart.
+_RACY_WINDOW_NS = 2_000_000_000
+
+StatSignature = Tuple[int, int, int, int]
+
+
+def stat_signature(path: PathLike) -> Optional[StatSignature]:
+    """Return (device, inode, mtime_ns, size) for a file, or None if it is missing."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def copy_json(value: Any) -> Any:
+    """Copy a JSON-compatible value; much cheaper than copy.deepcopy."""
+    if isinstance(value, dict):
+        return {k: copy_json(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [copy_json(v) for v in value]
+    return value
+
+
+class ConfigCache:
+    """Process-wide cache of parsed configuration files.
+
+    Entries are keyed by absolute path and invalidated when the file's inode,
+    mtime or size changes, so an unchanged file is parsed only once.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[StatSignature, int, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def load(self, path: PathLike, copy: bool = True) -> Dict[str, Any]:
+        """Return the parsed configuration at ``path``.
+
+        Args:
+            path: Configuration file to load
+            copy: Return a private copy. Callers that never mutate the result
+                can pass False to share the cached object and skip the copy.
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+            ValueError: If the file does not contain valid JSON
+        """
+        key = os.path.abspath(path)
+        signature = stat_signature(key)
+        if signature is None:
+            self.invalidate(key)
+            raise FileNotFoundError(f"Configuration file not found: {path}")
+
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            cached_signature, cached_at, config = entry
+            if cached_signature == signature and signature[2] < cached_at - _RACY_WINDOW_NS:
+                return copy_json(config) if copy else config
+
+        cached_at = time.time_ns()
+        try:
+            with open(key, "r") as f:
+                config = json.load(f)
+        except FileNotFoundError:
+            self.invalidate(key)
+            raise FileNotFoundError(f"Configuration file not found: {path}")
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON in configuration file: {e}")
+
+        # Re-stat after reading so a write racing with the read is not cached
+        if stat_signature(key) == signature:
+            with self._lock:
+                self._entries[key] = (signature, cached_at, config)
+        return copy_json(config) if copy else config
+
+    def invalidate(self, path: Optional[PathLike] = None) -> None:
+        """Drop the cached entry for ``path``, or every entry when no path is given."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(path), None)
+
+
+config_cache = ConfigCache()
+
+
+def load_config_file(path: PathLike, copy: bool = True) -> Dict[str, Any]:
+    """Load a configuration file through the shared cache."""
+    return config_cache.load(path, copy=copy)
+
+
+class ConfigStore:
+    """Read-modify-write access to a configuration file that is safe across processes.
+
+    Updates run under an inter-process ``FileLock`` on ``<path>.lock``, re-read
+    the file while holding it, and are written to a temporary file that is
+    atomically moved into place with ``os.replace``. Unknown fields are
+    preserved, and nothing is written when an update changes nothing.
+    """
+
+    def __init__(self, path: PathLike, indent: int = 2, cache: ConfigCache = config_cache):
+        self.path = os.path.abspath(path)
+        self.lock_path = self.path + ".lock"
+        self.indent = indent
+        self._cache = cache
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """Hold the store's inter-process lock."""
+        with FileLock(self.lock_path):
+            yield
+
+    def read(self) -> Dict[str, Any]:
+        """Return a private copy of the current configuration ({} if the file is missing)."""
+        try:
+            return self._cache.load(self.path)
+        except FileNotFoundError:
+            return {}
+
+    def update(self, mutator: Callable[[Dict[str, Any]], None]) -> bool:
+        """Apply ``mutator`` to the freshly read configuration and save the result.
+
+        Returns:
+            True if the file was written, False if the update changed nothing
+        """
+        with self.locked():
+            exists = os.path.exists(self.path)
+            original = self.read()
+            config = copy_json(original)
+            mutator(config)
+            if exists and config == original:
+                return False
+            self._write(config)
+            return True
+
+    def write(self, config: Dict[str, Any]) -> bool:
+        """Replace the whole configuration, skipping the write if it is unchanged."""
+        def replace(current: Dict[str, Any]) -> None:
+            current.clear()
+            current.update(copy_json(config))
+        return self.update(replace)
+
+    def patch_servers(self, patches: Dict[str, Optional[Dict[str, Any]]]) -> bool:
+        """Merge field updates into several ``mcpServers`` entries in one write.
+
+        Each patch is merged into the existing entry, creating it if needed;
+        fields set to None are removed. A patch of None removes the entry.
+        """
+        def apply(config: Dict[str, Any]) -> None:
+            servers = config.setdefault("mcpServers", {})
+            for name, fields in patches.items():
+                if fields is None:
+                    servers.pop(name, None)
+                    continue
+                entry = servers.setdefault(name, {})
+                for key, value in fields.items():
+                    if value is None:
+                        entry.pop(key, None)
+                    else:
+                        entry[key] = copy_json(value)
+        return self.update(apply)
+
+    def patch_server(self, name: str, fields: Dict[str, Any]) -> bool:
+        """Merge ``fields`` into the ``mcpServers`` entry for ``name``."""
+        return self.patch_servers({name: fields})
+
+    def remove_server(self, name: str) -> bool:
+        """Remove the ``mcpServers`` entry for ``name``; returns False if it did not exist."""
+        removed = []
+
+        def apply(config: Dict[str, Any]) -> None:
+            if name in config.get("mcpServers", {}):
+                del config["mcpServers"][name]
+                removed.append(name)
+        self.update(apply)
+        return bool(removed)
+
+    def _write(self, config: Dict[str, Any]) -> None:
+        directory = os.path.dirname(self.path)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(self.path) + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(config, f, indent=self.indent)
+                f.flush()
+                os.fsync(f.fileno())
+            try:
+                os.chmod(tmp_path, os.stat(self.path).st_mode & 0o777)
+            except FileNotFoundError:
+                pass
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        self._cache.invalidate(self.path)
+
+
+@dataclass
+class ConfigDiff:
+    """Differences between two ``mcpServers`` mappings."""
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    # Servers whose launch fields (command/args/env/cwd) changed and need a restart
+    changed: List[str] = field(default_factory=list)
+    # Servers whose installation fields changed, or new servers that need a setup
+    resetup: List[str] = field(default_factory=list)
+    # Servers where only descriptive fields such as description or tags changed
+    updated: List[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed or self.resetup or self.updated)
+
+
+def diff_servers(old: Dict[str, Dict[str, Any]], new: Dict[str, Dict[str, Any]]) -> ConfigDiff:
+    """Compare two ``mcpServers`` mappings entry by entry."""
+    diff = ConfigDiff()
+    for name, entry in new.items():
+        previous = old.get(name)
+        if previous is None:
+            diff.added.append(name)
+            if entry.get("repo_url") and (entry.get("setup_script") or entry.get("setup_mode")):
+                diff.resetup.append(name)
+            continue
+        if previous == entry:
+            continue
+        launch_changed = any(previous.get(f) != entry.get(f) for f in RESTART_FIELDS)
+        setup_changed = any(previous.get(f) != entry.get(f) for f in SETUP_FIELDS)
+        if launch_changed:
+            diff.changed.append(name)
+        if setup_changed:
+            diff.resetup.append(name)
+        if not (launch_changed or setup_changed):
+            diff.updated.append(name)
+    diff.removed = [name for name in old if name not in new]
+    return diff
+
+
+# inotify constants from <sys/inotify.h>
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_WATCH_MASK = (_IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM
+                  | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE)
+
+
+def _open_inotify(directory: str) -> Optional[int]:
+    """Return an inotify descriptor watching ``directory``, or None if unavailable."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    if libc.inotify_add_watch(fd, os.fsencode(directory), _IN_WATCH_MASK) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+class ConfigWatcher:
+    """Background thread that calls ``callback`` whenever a config file changes.
+
+    The parent directory is watched with inotify where available, so editors
+    that save by renaming a temporary file are noticed as well. On other
+    platforms, or when inotify cannot be initialised, the file is polled.
+    """
+
+    def __init__(self, path: PathLike, callback: Callable[[], None],
+                 poll_interval: float = 1.0, use_inotify: bool = True,
+                 debounce: float = 0.05):
+        self.path = os.path.abspath(path)
+        self.callback = callback
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.debounce = debounce
+        self._signature = stat_signature(self.path)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._inotify_fd: Optional[int] = None
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._inotify_fd is not None
+
+    def start(self) -> "ConfigWatcher":
+        if self._thread is not None:
+            return self
+        if self.use_inotify:
+            self._inotify_fd = _open_inotify(os.path.dirname(self.path))
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="mcphub-config-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._inotify_fd is not None:
+            os.close(self._inotify_fd)
+            self._inotify_fd = None
+
+    def __enter__(self) -> "ConfigWatcher":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _wait_for_event(self) -> None:
+        if self._inotify_fd is None:
+            self._stop.wait(self.poll_interval)
+            return
+        # Wake up periodically to notice stop requests
+        readable, _, _ = select.select([self._inotify_fd], [], [], min(self.poll_interval, 0.5))
+        if readable:
+            try:
+                while os.read(self._inotify_fd, 4096):
+                    pass
+            except BlockingIOError:
+                pass
+            # Let the writer finish before looking at the file
+            self._stop.wait(self.debounce)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wait_for_event()
+            if self._stop.is_set():
+                break
+            signature = stat_signature(self.path)
+            if signature == self._signature:
+                continue
+            self._signature = signature
+            if signature is None:
+                # File removed or in the middle of being replaced; wait for it to reappear
+                continue
+            try:
+                self.callback()
+            except Exception as e:
+                print(f"Error while reloading configuration {self.path}: {e}")
@@ -0,0 +1,190 @@
+"""Environment variable resolution and ${VAR} template interpolation."""
+import os
+import re
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+from .config import StatSignature, stat_signature
+from .exceptions import EnvVarNotFoundError
+
+# ${VAR}, ${VAR:-default} (default when unset or empty) and ${VAR-default} (default when unset)
+_TEMPLATE_RE = re.compile(r"\$\{([A-Za-z_][A-Za-z0-9_]*)(?:(:?-)([^}]*))?\}")
+
+# A template part is either literal text or (variable, default operator, default value)
+_Part = Union[str, Tuple[str, Optional[str], str]]
+
+
+class EnvTemplate:
+    """A string with ${VAR} references, parsed once and resolved many times."""
+
+    __slots__ = ("source", "parts", "variables")
+
+    def __init__(self, source: str):
+        self.source = source
+        parts: List[_Part] = []
+        position = 0
+        for match in _TEMPLATE_RE.finditer(source):
+            if match.start() > position:
+                parts.append(source[position:match.start()])
+            parts.append((match.group(1), match.group(2), match.group(3) or ""))
+            position = match.end()
+        if position < len(source):
+            parts.append(source[position:])
+        self.parts: Tuple[_Part, ...] = tuple(parts)
+        self.variables: Tuple[str, ...] = tuple(p[0] for p in parts if not isinstance(p, str))
+
+    @property
+    def is_literal(self) -> bool:
+        return not self.variables
+
+    def missing(self, resolver: "EnvResolver") -> List[str]:
+        """Return the referenced variables that are unset or empty and have no default.
+
+        Empty values count as missing, as they do for ``get_env_var``.
+        """
+        return [
+            p[0] for p in self.parts
+            if not isinstance(p, str) and p[1] is None and not resolver.get(p[0])
+        ]
+
+    def resolve(self, resolver: "EnvResolver", strict: bool = False) -> str:
+        """Substitute every reference.
+
+        Unset variables without a default are left as written, or raise
+        EnvVarNotFoundError when ``strict`` is True, as do empty ones.
+        """
+        if not self.variables:
+            return self.source
+        out = []
+        for part in self.parts:
+            if isinstance(part, str):
+                out.append(part)
+                continue
+            name, operator, default = part
+            value = resolver.get(name)
+            if operator == ":-" and not value:
+                value = default
+            elif operator == "-" and value is None:
+                value = default
+            if strict and operator is None and not value:
+                raise EnvVarNotFoundError(f"Required environment variable {name} is not set")
+            if value is None:
+                if strict:
+                    raise EnvVarNotFoundError(f"Required environment variable {name} is not set")
+                value = "${" + name + "}"
+            out.append(value)
+        return "".join(out)
+
+
+@lru_cache(maxsize=4096)
+def compile_template(value: str) -> EnvTemplate:
+    """Compile a template string; identical strings share one compiled template."""
+    return EnvTemplate(value)
+
+
+class CompiledEnv:
+    """A server's ``env`` mapping with every value compiled to an EnvTemplate."""
+
+    __slots__ = ("templates", "variables")
+
+    def __init__(self, env: Mapping[str, str]):
+        self.templates: Dict[str, EnvTemplate] = {
+            key: compile_template(str(value)) for key, value in env.items()
+        }
+        seen: Dict[str, None] = {}
+        for template in self.templates.values():
+            for name in template.variables:
+                seen[name] = None
+        self.variables: Tuple[str, ...] = tuple(seen)
+
+    def missing(self, resolver: "EnvResolver") -> List[str]:
+        missing: Dict[str, None] = {}
+        for template in self.templates.values():
+            for name in template.missing(resolver):
+                missing[name] = None
+        return list(missing)
+
+    def resolve(self, resolver: "EnvResolver", strict: bool = False) -> Dict[str, str]:
+        return {key: template.resolve(resolver, strict) for key, template in self.templates.items()}
+
+
+def parse_dotenv(text: str) -> Dict[str, str]:
+    """Parse the common subset of the .env format (KEY=VALUE, export, quotes, comments)."""
+    values: Dict[str, str] = {}
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("export "):
+            line = line[len("export "):].lstrip()
+        key, sep, value = line.partition("=")
+        key = key.strip()
+        if not sep or not key:
+            continue
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in ("'", '"'):
+            quote, value = value[0], value[1:-1]
+            if quote == '"':
+                value = value.replace("\\n", "\n").replace('\\"', '"')
+        else:
+            # Strip trailing comments from unquoted values
+            value = value.split(" #", 1)[0].rstrip()
+        values[key] = value
+    return values
+
+
+class EnvResolver:
+    """Looks up variables in the process environment, then in optional .env files.
+
+    Reads ``os.environ`` directly instead of spawning a shell per variable.
+    Each .env file is parsed once and re-read only when it changes on disk.
+    Earlier files take precedence over later ones.
+    """
+
+    def __init__(self, env_files: Sequence[Union[str, Path]] = (),
+                 environ: Optional[Mapping[str, str]] = None):
+        self.env_files = [Path(p) for p in env_files]
+        self._environ = environ
+        self._file_cache: Dict[Path, Tuple[Optional[StatSignature], Dict[str, str]]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def environ(self) -> Mapping[str, str]:
+        return os.environ if self._environ is None else self._environ
+
+    def _file_values(self, path: Path) -> Dict[str, str]:
+        signature = stat_signature(path)
+        with self._lock:
+            cached = self._file_cache.get(path)
+            if cached is not None and cached[0] == signature:
+                return cached[1]
+        values: Dict[str, str] = {}
+        if signature is not None:
+            try:
+                values = parse_dotenv(path.read_text())
+            except OSError:
+                values = {}
+        with self._lock:
+            self._file_cache[path] = (signature, values)
+        return values
+
+    def get(self, name: str) -> Optional[str]:
+        """Return the value of ``name``, or None if it is not set anywhere."""
+        value = self.environ.get(name)
+        if value is not None:
+            return value
+        for path in self.env_files:
+            value = self._file_values(path).get(name)
+            if value is not None:
+                return value
+        return None
+
+
+_default_resolver = EnvResolver()
+
+
+def get_env_var(name: str, resolver: Optional[EnvResolver] = None) -> Optional[str]:
+    """Return a variable's value without spawning a shell; empty values count as unset."""
+    return (resolver or _default_resolver).get(name) or None
@@ -0,0 +1,181 @@
+"""Python environments shared between checkouts through hardlinks, keyed by lockfile."""
+import errno
+import hashlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+from typing import Callable, List, Optional, Union
+
+from .cache import default_cache_root
+from .locks import path_lock
+
+ENV_VERSION = 1
+SHARED_ENV_MODE = "shared-env"
+
+# Checked in order; the first one found decides how the environment is built
+LOCKFILES = ("uv.lock", "requirements.lock", "requirements.txt")
+
+# Requirement lines that depend on the checkout itself cannot be shared
+_LOCAL_REQUIREMENT_PREFIXES = ("-e", "--editable", ".", "/", "file:")
+
+Runner = Callable[[List[str], Optional[Path], Optional[dict]], object]
+
+
+def env_python() -> str:
+    """Return the interpreter shared environments are built with (MCPHUB_ENV_PYTHON or this one)."""
+    return os.getenv("MCPHUB_ENV_PYTHON") or sys.executable
+
+
+def find_lockfile(repo_dir: Path) -> Optional[Path]:
+    """Return the lockfile a shared environment can be built from, if any."""
+    for name in LOCKFILES:
+        path = repo_dir / name
+        if not path.is_file():
+            continue
+        if name == "uv.lock":
+            return path if (repo_dir / "pyproject.toml").is_file() else None
+        lines = [line.strip() for line in path.read_text().splitlines()]
+        if any(line.startswith(_LOCAL_REQUIREMENT_PREFIXES) for line in lines):
+            return None
+        return path
+    return None
+
+
+def _python_version(python: str) -> str:
+    if python == sys.executable:
+        return sys.version
+    result = subprocess.run([python, "-c", "import sys; print(sys.version)"],
+                            capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+
+def env_key(lockfile: Path, python: Optional[str] = None) -> str:
+    """Hash the lockfile together with the interpreter and platform it is installed for."""
+    python = python or env_python()
+    parts = [ENV_VERSION, lockfile.name, lockfile.read_text(), python, _python_version(python),
+             platform.system(), platform.machine()]
+    if lockfile.name == "uv.lock":
+        # Dependency groups and extras are declared in pyproject.toml
+        parts.append((lockfile.parent / "pyproject.toml").read_text())
+    return hashlib.sha256(json.dumps(parts).encode()).hexdigest()
+
+
+def compile_bytecode(python: str, path: Path) -> bool:
+    """Compile every module below ``path`` with ``python`` ahead of the first import.
+
+    Returns:
+        False if some modules could not be compiled; they are then simply
+        compiled (or fail) at import time as before
+    """
+    try:
+        result = subprocess.run(
+            [python, "-m", "compileall", "-q", "-j", "0", "-x", r"[/\\]\.git[/\\]", str(path)],
+            stdin=subprocess.DEVNULL, capture_output=True, text=True
+        )
+    except OSError:
+        return False
+    return result.returncode == 0
+
+
+def _link_or_copy(source: str, destination: str) -> None:
+    try:
+        os.link(source, destination)
+    except OSError as e:
+        if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK):
+            raise
+        shutil.copy2(source, destination)
+
+
+def _relocate(env_dir: Path, old_prefix: str) -> None:
+    """Rewrite files that embed the environment's path, such as script shebangs.
+
+    Rewritten files are replaced rather than edited, so the shared copies
+    they were hardlinked to stay untouched.
+    """
+    old = old_prefix.encode()
+    new = str(env_dir).encode()
+    candidates = [p for p in (env_dir / "bin").iterdir()] if (env_dir / "bin").is_dir() else []
+    candidates.append(env_dir / "pyvenv.cfg")
+    candidates.extend(env_dir.glob("lib/python*/site-packages/*.pth"))
+    for path in candidates:
+        if path.is_symlink() or not path.is_file():
+            continue
+        data = path.read_bytes()
+        if old not in data:
+            continue
+        mode = path.stat().st_mode
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(data.replace(old, new))
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+
+
+class SharedEnvStore:
+    """Built environments under ``<root>/<lockfile hash>``, hardlinked into checkouts.
+
+    Each environment is built once per lockfile, interpreter and platform,
+    with its bytecode compiled, and then linked into every checkout that
+    uses the same lockfile. Linking costs a directory walk instead of a
+    dependency install, and the files share disk blocks.
+    """
+
+    def __init__(self, root: Optional[Union[str, Path]] = None, python: Optional[str] = None):
+        self.root = Path(root) if root is not None else default_cache_root() / "envs"
+        self.python = python or env_python()
+
+    def env_dir(self, key: str) -> Path:
+        return self.root / key
+
+    def build_commands(self, lockfile: Path, env_dir: Path) -> List[List[str]]:
+        if lockfile.name == "uv.lock":
+            return [["uv", "sync", "--frozen", "--no-install-project", "--python", self.python]]
+        python = str(env_dir / "bin" / "python")
+        return [
+            [self.python, "-m", "venv", str(env_dir)],
+            [python, "-m", "pip", "install", "--disable-pip-version-check", "-r", str(lockfile)],
+        ]
+
+    def ensure(self, lockfile: Path, run: Runner) -> Path:
+        """Return the built environment for ``lockfile``, building it first if needed.
+
+        Args:
+            lockfile: uv.lock or requirements file inside the checkout
+            run: Called with (command, cwd, extra_env) for each build step;
+                must raise if the step fails
+        """
+        key = env_key(lockfile, self.python)
+        env_dir = self.env_dir(key)
+        with path_lock(env_dir):
+            if env_dir.exists():
+                return env_dir
+            staging = env_dir.with_name(f"{key}.{os.getpid()}.tmp")
+            shutil.rmtree(staging, ignore_errors=True)
+            self.root.mkdir(parents=True, exist_ok=True)
+            try:
+                extra_env = {"UV_PROJECT_ENVIRONMENT": str(staging)}
+                for command in self.build_commands(lockfile, staging):
+                    run(command, lockfile.parent, extra_env)
+                # Compile once here; the .pyc files are linked along with the sources
+                compile_bytecode(str(staging / "bin" / "python"), staging)
+                os.replace(staging, env_dir)
+                # Scripts were written for the staging path
+                _relocate(env_dir, str(staging))
+            finally:
+                shutil.rmtree(staging, ignore_errors=True)
+        return env_dir
+
+    def link(self, env_dir: Path, target: Path) -> None:
+        """Replace ``target`` with a hardlinked copy of ``env_dir``."""
+        staging = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        shutil.rmtree(staging, ignore_errors=True)
+        shutil.copytree(env_dir, staging, symlinks=True, copy_function=_link_or_copy)
+        if target.is_symlink() or target.is_file():
+            target.unlink()
+        elif target.exists():
+            shutil.rmtree(target)
+        os.replace(staging, target)
+        _relocate(target, str(env_dir))
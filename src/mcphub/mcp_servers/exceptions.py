@@ -4,4 +4,20 @@ class ServerConfigNotFoundError(Exception):
 
 class SetupError(Exception):
     """Raised when there's an error during server setup."""
-    pass 
\ No newline at end of file
+    pass 
+
+class EnvVarNotFoundError(Exception):
+    """Raised when a required environment variable is not set."""
+    pass
+
+class BundleError(Exception):
+    """Raised when a cache bundle cannot be created or fails verification."""
+    pass
+
+class LockTimeout(TimeoutError):
+    """Raised when an inter-process lock is not acquired in time."""
+    pass
+
+class DaemonError(Exception):
+    """Raised when the mcphub daemon cannot be reached or fails a request."""
+    pass
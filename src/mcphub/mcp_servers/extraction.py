@@ -0,0 +1,196 @@
+"""LLM extraction of server configurations from READMEs, cached on disk."""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+import openai
+
+from .cache import default_cache_root
+from .schemas import MCPServerConfigSchema
+
+# Bump whenever the prompt or schema changes so cached extractions are not reused
+PROMPT_VERSION = 1
+DEFAULT_MODEL = "gpt-4o-mini"
+DEFAULT_MAX_CONCURRENCY = 4
+
+SYSTEM_PROMPT = "You are a helpful assistant that extracts MCP server configuration from READMEs."
+
+
+def build_prompt(readme_content: str) -> str:
+    return f"""Please analyze this MCP server README and extract the configuration in JSON format.
+        The configuration should include:
+        - command: The command to run the server
+        - args: List of command line arguments
+        - env: Environment variables (if any)
+        - setup_script: Any setup script needed (if any)
+
+        README content:
+        {readme_content}
+
+        Return only the JSON configuration, nothing else."""
+
+
+class ExtractionCache:
+    """Extracted configurations keyed by (README hash, prompt version, model)."""
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+
+    @staticmethod
+    def key(readme_content: str, model: str) -> str:
+        readme_hash = hashlib.sha256(readme_content.encode()).hexdigest()
+        return hashlib.sha256(f"{PROMPT_VERSION}\0{model}\0{readme_hash}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.cache_dir / f"{key}.json", "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, config: Dict[str, Any]) -> None:
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self.cache_dir / f"{key}.json"
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(config, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+
+class ConfigExtractor:
+    """Turns READMEs into server configurations with the OpenAI Responses API.
+
+    Results are cached on disk, so a README that was already parsed with
+    the same prompt version and model costs no API call. Batches run on
+    the async client with at most ``max_concurrency`` requests in flight,
+    and identical READMEs in one batch share a single request.
+    """
+
+    def __init__(self, model: Optional[str] = None, base_url: Optional[str] = None,
+                 api_key: Optional[str] = None, cache_dir: Optional[Path] = None,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
+        """
+        Args:
+            model: Model to extract with (defaults to MCPHUB_OPENAI_MODEL or gpt-4o-mini)
+            base_url: API base URL (defaults to MCPHUB_OPENAI_BASE_URL, then the
+                OpenAI client's own default, which honours OPENAI_BASE_URL)
+            api_key: API key (defaults to OPENAI_API_KEY)
+            cache_dir: Directory of cached extractions (defaults to <user cache>/extractions)
+            max_concurrency: Maximum number of concurrent API requests in a batch
+        """
+        self.model = model or os.getenv("MCPHUB_OPENAI_MODEL") or DEFAULT_MODEL
+        self.base_url = base_url or os.getenv("MCPHUB_OPENAI_BASE_URL") or None
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY") or None
+        self.cache = ExtractionCache(cache_dir if cache_dir is not None else default_cache_root() / "extractions")
+        self.max_concurrency = max_concurrency
+        self._client: Optional[openai.OpenAI] = None
+        self._lock = threading.Lock()
+
+    def _check_api_key(self) -> None:
+        if not self.api_key:
+            raise ValueError("OpenAI API key not configured. Set OPENAI_API_KEY environment variable.")
+
+    @property
+    def client(self) -> openai.OpenAI:
+        with self._lock:
+            if self._client is None:
+                self._check_api_key()
+                self._client = openai.OpenAI(api_key=self.api_key, base_url=self.base_url)
+            return self._client
+
+    def _request(self, readme_content: str) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "input": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": build_prompt(readme_content)},
+            ],
+            "text_format": MCPServerConfigSchema,
+        }
+
+    @staticmethod
+    def _parsed_config(response: Any) -> Dict[str, Any]:
+        # Validate response structure
+        if not hasattr(response, "output_parsed") or not hasattr(response.output_parsed, "model_dump"):
+            raise ValueError("Unexpected OpenAI API response format")
+        return response.output_parsed.model_dump()
+
+    def extract(self, readme_content: str) -> Dict[str, Any]:
+        """Extract a configuration from one README."""
+        key = ExtractionCache.key(readme_content, self.model)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        try:
+            config = self._parsed_config(self.client.responses.parse(**self._request(readme_content)))
+        except openai.OpenAIError as e:
+            raise RuntimeError(f"OpenAI API error: {e}")
+        self.cache.put(key, config)
+        return config
+
+    async def extract_many(
+        self,
+        readmes: Sequence[str],
+        on_result: Optional[Callable[[int, Union[Dict[str, Any], Exception]], None]] = None,
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        """Extract configurations from many READMEs concurrently.
+
+        Args:
+            readmes: README contents
+            on_result: Called with (index, result) as each README's result
+                becomes available
+
+        Returns:
+            One configuration, or the exception that prevented it, per README
+            in input order
+        """
+        keys = [ExtractionCache.key(readme, self.model) for readme in readmes]
+        results: Dict[str, Union[Dict[str, Any], Exception]] = {}
+        pending: Dict[str, str] = {}
+        for key, readme in zip(keys, readmes):
+            if key in results or key in pending:
+                continue
+            cached = self.cache.get(key)
+            if cached is not None:
+                results[key] = cached
+            else:
+                pending[key] = readme
+
+        def report(key: str) -> None:
+            if on_result is not None:
+                for index, other in enumerate(keys):
+                    if other == key:
+                        on_result(index, results[key])
+
+        for key in results:
+            report(key)
+
+        if pending:
+            self._check_api_key()
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+
+            async def extract_one(client: openai.AsyncOpenAI, key: str, readme: str) -> None:
+                async with semaphore:
+                    try:
+                        response = await client.responses.parse(**self._request(readme))
+                        config = self._parsed_config(response)
+                    except openai.OpenAIError as e:
+                        results[key] = RuntimeError(f"OpenAI API error: {e}")
+                    except Exception as e:
+                        results[key] = e
+                    else:
+                        self.cache.put(key, config)
+                        results[key] = config
+                report(key)
+
+            async with openai.AsyncOpenAI(api_key=self.api_key, base_url=self.base_url) as client:
+                await asyncio.gather(*(extract_one(client, key, readme) for key, readme in pending.items()))
+
+        return [results[key] for key in keys]
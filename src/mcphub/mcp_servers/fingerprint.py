@@ -0,0 +1,135 @@
+"""Setup fingerprints used to skip setup scripts whose inputs have not changed."""
+import hashlib
+import json
+import os
+import re
+import shlex
+import shutil
+import subprocess
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote
+
+STAMP_VERSION = 1
+
+# Shell words that never name an installed tool
+_SHELL_BUILTINS = {
+    "cd", "export", "echo", "set", "source", ".", "true", "false", "exit",
+    "test", "[", "if", "then", "else", "fi", "for", "do", "done", "unset",
+}
+_COMMAND_SEPARATORS = re.compile(r"&&|\|\||[;|\n]")
+
+
+def git_head(repo_dir: Path) -> Optional[str]:
+    """Return the commit checked out in ``repo_dir`` without spawning git when possible."""
+    git_dir = repo_dir / ".git"
+    try:
+        head = (git_dir / "HEAD").read_text().strip()
+    except OSError:
+        return None
+    if not head.startswith("ref: "):
+        return head or None
+    ref = head[len("ref: "):]
+    try:
+        return (git_dir / ref).read_text().strip() or None
+    except OSError:
+        pass
+    try:
+        for line in (git_dir / "packed-refs").read_text().splitlines():
+            if line.endswith(" " + ref):
+                return line.split(" ", 1)[0]
+    except OSError:
+        pass
+    # Worktrees and other layouts: fall back to git itself
+    try:
+        result = subprocess.run(
+            ["git", "-C", str(repo_dir), "rev-parse", "HEAD"],
+            capture_output=True, text=True, timeout=30
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip() or None
+
+
+def setup_tools(setup_script: str) -> List[str]:
+    """Return the programs a setup script invokes, e.g. ["uv", "npm"]."""
+    tools: Dict[str, None] = {}
+    for command in _COMMAND_SEPARATORS.split(setup_script):
+        try:
+            words = shlex.split(command, comments=True)
+        except ValueError:
+            words = command.split()
+        # Skip leading VAR=value assignments
+        while words and re.match(r"^[A-Za-z_][A-Za-z0-9_]*=", words[0]):
+            words = words[1:]
+        if words and words[0] not in _SHELL_BUILTINS:
+            tools[os.path.basename(words[0])] = None
+    return list(tools)
+
+
+@lru_cache(maxsize=None)
+def tool_version(tool: str) -> Optional[str]:
+    """Return the first line of ``tool --version``, or None if the tool is not installed.
+
+    Results are memoised for the lifetime of the process.
+    """
+    path = shutil.which(tool)
+    if path is None:
+        return None
+    try:
+        result = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    output = (result.stdout or result.stderr).strip()
+    return output.splitlines()[0] if output else path
+
+
+def compute_fingerprint(repo_dir: Path, setup_script: str) -> Dict[str, Any]:
+    """Describe everything a setup run depends on."""
+    return {
+        "version": STAMP_VERSION,
+        "head": git_head(repo_dir),
+        "setup_script_sha256": hashlib.sha256(setup_script.encode()).hexdigest(),
+        "python": sys.version,
+        "tools": {tool: tool_version(tool) for tool in setup_tools(setup_script)},
+    }
+
+
+class StampStore:
+    """Per-server fingerprint stamps kept in ``<cache_dir>/.stamps``."""
+
+    def __init__(self, cache_dir: Path):
+        self.stamps_dir = cache_dir / ".stamps"
+
+    def _path(self, server_name: str) -> Path:
+        return self.stamps_dir / (quote(server_name, safe="") + ".json")
+
+    def read(self, server_name: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(server_name), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def matches(self, server_name: str, fingerprint: Dict[str, Any]) -> bool:
+        """True if the stored stamp records a completed setup with this fingerprint."""
+        # A repository without a resolvable HEAD can never be considered up to date
+        return fingerprint.get("head") is not None and self.read(server_name) == fingerprint
+
+    def write(self, server_name: str, fingerprint: Dict[str, Any]) -> None:
+        self.stamps_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(server_name)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(fingerprint, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def remove(self, server_name: str) -> None:
+        try:
+            self._path(server_name).unlink()
+        except FileNotFoundError:
+            pass
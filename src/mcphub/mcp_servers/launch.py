@@ -0,0 +1,278 @@
+"""Resolve npx/uvx launch commands to the entrypoints they end up running."""
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from .locks import path_lock
+
+# Installing a package on first resolution can take a while
+RESOLVE_TIMEOUT = 300
+
+# npx options that take a value; the package is the first other positional argument
+_NPX_VALUE_OPTIONS = {"-p", "--package", "--cache", "--registry", "--userconfig", "-c", "--call"}
+_NPX_FLAG_OPTIONS = {"-y", "--yes", "-q", "--quiet", "--no-install", "--ignore-existing", "--prefer-offline"}
+# uvx options that take a value
+_UVX_VALUE_OPTIONS = {
+    "--from", "--with", "--with-editable", "--with-requirements", "-p", "--python",
+    "--index", "--index-url", "--extra-index-url", "--default-index", "--cache-dir",
+}
+
+_PY_REQUIREMENT_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*")
+
+
+def resolve_on_launch() -> bool:
+    """Whether uncached launch commands are resolved, installing their package, when first spawned.
+
+    Off unless MCPHUB_RESOLVE_LAUNCH is 1/true/yes; ``mcphub refresh``
+    resolves explicitly, and its cached entrypoints are used either way.
+    """
+    return os.getenv("MCPHUB_RESOLVE_LAUNCH", "0").lower() in ("1", "true", "yes")
+
+
+def npm_package_name(spec: str) -> str:
+    """Strip the version from an npm package spec ("@scope/name@1.2" -> "@scope/name")."""
+    if spec.startswith("@"):
+        scope, _, rest = spec[1:].partition("/")
+        return "@" + scope + "/" + rest.split("@", 1)[0]
+    return spec.split("@", 1)[0]
+
+
+def _split_options(args: List[str], value_options: set, flag_options: Optional[set] = None
+                   ) -> Optional[Tuple[List[str], Dict[str, str], List[str]]]:
+    """Split shim arguments into (options, option values, remaining positionals)."""
+    options: List[str] = []
+    values: Dict[str, str] = {}
+    index = 0
+    while index < len(args):
+        arg = args[index]
+        if not arg.startswith("-"):
+            return options, values, args[index:]
+        name, eq, value = arg.partition("=")
+        if name in value_options:
+            if not eq:
+                index += 1
+                if index >= len(args):
+                    return None
+                value = args[index]
+            options += [name, value]
+            values[name] = value
+        elif flag_options is not None and arg not in flag_options:
+            # Unknown npx option: we cannot tell whether it takes a value
+            return None
+        else:
+            options.append(arg)
+        index += 1
+    return options, values, []
+
+
+class LaunchResolver:
+    """Caches the real entrypoints behind ``npx``/``uvx`` launch commands.
+
+    The first resolution runs the shim once to install the package and
+    locate its executable. The result is stored in a JSON file keyed by a
+    fingerprint of the command, arguments and working directory. Later
+    launches exec the entrypoint directly. Entries whose files have
+    disappeared, e.g. after the npm or uv cache was cleaned, are resolved
+    again, and ``refresh`` forces a new resolution, e.g. to pick up a new
+    ``@latest``.
+    """
+
+    def __init__(self, cache_path: Path):
+        self.cache_path = Path(cache_path)
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+
+    @staticmethod
+    def fingerprint(command: str, args: List[str], cwd: Optional[str] = None) -> str:
+        payload = json.dumps([command, shutil.which(command), list(args), cwd])
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @staticmethod
+    def supports(command: str) -> bool:
+        return os.path.basename(command) in ("npx", "uvx")
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._entries is None:
+            try:
+                with open(self.cache_path, "r") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Lock the cache file against other processes and re-read it, so their entries are kept."""
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with path_lock(self.cache_path):
+            self._entries = None
+            yield
+
+    def _save(self) -> None:
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_name(f"{self.cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self._entries, f, indent=2)
+        os.replace(tmp_path, self.cache_path)
+
+    def cached(self, command: str, args: List[str], cwd: Optional[str] = None) -> Optional[Tuple[str, List[str]]]:
+        """Return the cached entrypoint if its files still exist."""
+        with self._lock:
+            entry = self._load().get(self.fingerprint(command, args, cwd))
+        if entry is None or not all(os.path.exists(path) for path in entry.get("requires", [])):
+            return None
+        return entry["command"], list(entry["args"])
+
+    def resolve(self, command: str, args: List[str], cwd: Optional[str] = None,
+                env: Optional[Mapping[str, str]] = None, refresh: bool = False,
+                install: bool = True) -> Tuple[str, List[str]]:
+        """Return the command to exec for a launch command.
+
+        Commands that are not npx/uvx, or that cannot be resolved, are
+        returned unchanged. With ``install`` False only cached entrypoints
+        are used, and the shim is never run.
+        """
+        if not self.supports(command):
+            return command, list(args)
+        if not refresh:
+            cached = self.cached(command, args, cwd)
+            if cached is not None:
+                return cached
+        if not install:
+            return command, list(args)
+        try:
+            if os.path.basename(command) == "npx":
+                resolved = self._resolve_npx(command, args, cwd, env)
+            else:
+                resolved = self._resolve_uvx(command, args, cwd, env)
+        except (OSError, subprocess.SubprocessError, ValueError):
+            resolved = None
+        if resolved is None:
+            return command, list(args)
+        resolved_command, resolved_args, requires = resolved
+        with self._lock, self._file_lock():
+            self._load()[self.fingerprint(command, args, cwd)] = {
+                "source": [command, *args],
+                "command": resolved_command,
+                "args": resolved_args,
+                "requires": requires,
+                "resolved_at": time.time(),
+            }
+            self._save()
+        return resolved_command, list(resolved_args)
+
+    def forget(self, command: str, args: List[str], cwd: Optional[str] = None) -> None:
+        with self._lock, self._file_lock():
+            if self._load().pop(self.fingerprint(command, args, cwd), None) is not None:
+                self._save()
+
+    @staticmethod
+    def _run(command: List[str], cwd: Optional[str], env: Optional[Mapping[str, str]]) -> str:
+        run_env = dict(os.environ)
+        if env:
+            run_env.update(env)
+        result = subprocess.run(
+            command, cwd=cwd, env=run_env, stdin=subprocess.DEVNULL,
+            capture_output=True, text=True, timeout=RESOLVE_TIMEOUT, check=True
+        )
+        return result.stdout
+
+    def _resolve_npx(self, command: str, args: List[str], cwd: Optional[str],
+                     env: Optional[Mapping[str, str]]) -> Optional[Tuple[str, List[str], List[str]]]:
+        split = _split_options(args, _NPX_VALUE_OPTIONS, _NPX_FLAG_OPTIONS)
+        if split is None:
+            return None
+        options, values, positionals = split
+        if not positionals or "-c" in values or "--call" in values:
+            return None
+        package_spec = values.get("-p") or values.get("--package") or positionals[0]
+        package = npm_package_name(package_spec)
+        bin_hint = positionals[0] if ("-p" in values or "--package" in values) else None
+        server_args = positionals[1:]
+
+        # Let npx install the package, then read the PATH it prepares for the package's bins
+        probe = [command, *[o for o in options if o not in ("-p", "--package", package_spec)],
+                 "--yes", "--package", package_spec, "-c", 'echo "$PATH"']
+        path_value = self._run(probe, cwd, env).strip().splitlines()[-1]
+        for entry in path_value.split(os.pathsep):
+            bin_dir = Path(entry)
+            if bin_dir.name != ".bin" or bin_dir.parent.name != "node_modules":
+                continue
+            package_json = bin_dir.parent / package / "package.json"
+            try:
+                manifest = json.loads(package_json.read_text())
+            except (OSError, ValueError):
+                continue
+            bin_name = self._npm_bin_name(manifest, package, bin_hint)
+            if bin_name is None:
+                continue
+            bin_path = bin_dir / bin_name
+            if not bin_path.exists():
+                continue
+            return self._exec_target(bin_path, server_args)
+        return None
+
+    @staticmethod
+    def _npm_bin_name(manifest: Dict[str, Any], package: str, hint: Optional[str]) -> Optional[str]:
+        unscoped = package.rsplit("/", 1)[-1]
+        bins = manifest.get("bin")
+        if isinstance(bins, str):
+            return hint or unscoped
+        if not isinstance(bins, dict) or not bins:
+            return None
+        if hint is not None:
+            return hint if hint in bins else None
+        if len(bins) == 1:
+            return next(iter(bins))
+        return unscoped if unscoped in bins else None
+
+    @staticmethod
+    def _exec_target(bin_path: Path, server_args: List[str]) -> Tuple[str, List[str], List[str]]:
+        """Run a Node bin through node directly, anything else as is."""
+        target = os.path.realpath(bin_path)
+        try:
+            with open(target, "rb") as f:
+                shebang = f.readline().decode(errors="replace")
+        except OSError:
+            shebang = ""
+        node = shutil.which("node")
+        if shebang.startswith("#!") and "node" in shebang and node:
+            return node, [target, *server_args], [node, target]
+        return str(bin_path), list(server_args), [str(bin_path)]
+
+    def _resolve_uvx(self, command: str, args: List[str], cwd: Optional[str],
+                     env: Optional[Mapping[str, str]]) -> Optional[Tuple[str, List[str], List[str]]]:
+        split = _split_options(args, _UVX_VALUE_OPTIONS)
+        if split is None:
+            return None
+        options, values, positionals = split
+        if not positionals:
+            return None
+        tool_spec, server_args = positionals[0], positionals[1:]
+        if "--from" in values:
+            executable = tool_spec
+            probe_options = options
+        else:
+            # "uvx pkg@1.0" and "uvx pkg[extra]" run the "pkg" executable
+            match = _PY_REQUIREMENT_NAME.match(tool_spec)
+            if match is None:
+                return None
+            executable = match.group(0)
+            name, _, version = tool_spec.partition("@")
+            from_spec = f"{name}=={version}" if version and version != "latest" else name
+            probe_options = [*options, "--from", from_spec]
+
+        probe = [command, *probe_options, "python", "-c", "import sys; print(sys.prefix)"]
+        prefix = Path(self._run(probe, cwd, env).strip().splitlines()[-1])
+        script = prefix / "bin" / executable
+        if not script.exists():
+            return None
+        return str(script), list(server_args), [str(script)]
@@ -0,0 +1,213 @@
+"""Inter-process file locks that record their holder, for setup and cache directories."""
+import errno
+import json
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator, Optional, Union
+
+from .exceptions import LockTimeout
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to exclusively created lock files
+    fcntl = None
+
+PathLike = Union[str, Path]
+
+_POLL_INTERVAL = 0.1
+
+
+@dataclass
+class LockHolder:
+    """The process that last acquired a lock, as recorded in the lock file."""
+    pid: int
+    host: str
+    acquired: float
+
+    def is_alive(self) -> Optional[bool]:
+        """Whether the holder is still running; None if it runs on another host."""
+        if self.host != socket.gethostname():
+            return None
+        try:
+            os.kill(self.pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def __str__(self) -> str:
+        return f"pid {self.pid} on {self.host} (for {time.time() - self.acquired:.0f}s)"
+
+
+def read_holder(lock_path: PathLike) -> Optional[LockHolder]:
+    """Return the holder recorded in ``lock_path``, if any."""
+    try:
+        with open(lock_path) as f:
+            data = json.load(f)
+        return LockHolder(int(data["pid"]), str(data["host"]), float(data["acquired"]))
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+class FileLock:
+    """An exclusive lock on ``lock_path`` shared between processes and threads.
+
+    With ``fcntl`` the lock is an ``flock`` on the file, which the kernel
+    releases when the holder exits, so a crashed holder never leaves it
+    stuck. The holder's pid and host are written into the file so that
+    waiting processes can report who they are waiting for.
+
+    Without ``fcntl`` the lock is the file's exclusive creation. A file left
+    behind by a holder that is no longer running on this host is stale and
+    is removed, as is one older than ``stale_after`` seconds.
+    """
+
+    def __init__(self, lock_path: PathLike, stale_after: Optional[float] = None):
+        self.lock_path = str(lock_path)
+        self.stale_after = stale_after
+        self._fd: Optional[int] = None
+
+    def acquire(self, timeout: Optional[float] = None,
+                on_wait: Optional[Callable[[Optional[LockHolder]], None]] = None) -> None:
+        """Block until the lock is held.
+
+        Args:
+            timeout: Seconds to wait before raising LockTimeout (None waits forever)
+            on_wait: Called once with the current holder if the lock is busy
+
+        Raises:
+            LockTimeout: If the lock is still held by someone else after ``timeout``
+        """
+        if self._fd is not None:
+            raise RuntimeError(f"{self.lock_path} is already held by this FileLock")
+        Path(self.lock_path).parent.mkdir(parents=True, exist_ok=True)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        waited = False
+        while True:
+            fd = self._try_acquire()
+            if fd is not None:
+                break
+            if not waited:
+                waited = True
+                if on_wait is not None:
+                    on_wait(read_holder(self.lock_path))
+            if deadline is not None and time.monotonic() >= deadline:
+                raise LockTimeout(f"Timed out waiting for {self.lock_path} held by "
+                                  f"{read_holder(self.lock_path) or 'an unknown process'}")
+            if fcntl is not None and deadline is None:
+                # Nothing to poll for: sleep in the kernel until the holder lets go
+                fd = self._open()
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                if self._is_current(fd):
+                    break
+                os.close(fd)
+                continue
+            time.sleep(_POLL_INTERVAL)
+        self._fd = fd
+        self._record_holder()
+
+    def release(self) -> None:
+        fd, self._fd = self._fd, None
+        if fd is None:
+            return
+        if fcntl is not None:
+            os.ftruncate(fd, 0)
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+            return
+        os.close(fd)
+        try:
+            os.unlink(self.lock_path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+    def _open(self) -> int:
+        return os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+
+    def _is_current(self, fd: int) -> bool:
+        """Whether ``fd`` is still the file at ``lock_path``, i.e. it was not removed meanwhile."""
+        try:
+            current = os.stat(self.lock_path)
+        except FileNotFoundError:
+            return False
+        opened = os.fstat(fd)
+        return (opened.st_dev, opened.st_ino) == (current.st_dev, current.st_ino)
+
+    def _try_acquire(self) -> Optional[int]:
+        if fcntl is not None:
+            fd = self._open()
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                return None
+            if self._is_current(fd):
+                return fd
+            os.close(fd)
+            return None
+        try:
+            return os.open(self.lock_path, os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            self._break_if_stale()
+            return None
+
+    def _break_if_stale(self) -> None:
+        holder = read_holder(self.lock_path)
+        if holder is None:
+            # Being written by a holder that has just created it, or unreadable
+            try:
+                age = time.time() - os.stat(self.lock_path).st_mtime
+            except FileNotFoundError:
+                return
+            stale = self.stale_after is not None and age > self.stale_after
+        else:
+            stale = holder.is_alive() is False or (
+                self.stale_after is not None and time.time() - holder.acquired > self.stale_after
+            )
+        if stale:
+            try:
+                os.unlink(self.lock_path)
+            except OSError as e:
+                if e.errno != errno.ENOENT:
+                    raise
+
+    def _record_holder(self) -> None:
+        data = json.dumps({"pid": os.getpid(), "host": socket.gethostname(), "acquired": time.time(),
+                           "thread": threading.current_thread().name}).encode()
+        os.ftruncate(self._fd, 0)
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        os.write(self._fd, data)
+
+
+@contextmanager
+def path_lock(path: PathLike, timeout: Optional[float] = None,
+              on_wait: Optional[Callable[[Optional[LockHolder]], None]] = None) -> Iterator[None]:
+    """Hold an exclusive inter-process lock on ``<path>.lock``.
+
+    Used to serialise cloning and setting up checkouts, and creating,
+    fetching and removing shared mirrors and cache entries.
+
+    Args:
+        path: The file or directory the lock protects
+        timeout: Seconds to wait before raising LockTimeout (None waits forever)
+        on_wait: Called once with the current holder if ``path`` is locked
+    """
+    lock = FileLock(f"{path}.lock")
+    lock.acquire(timeout=timeout, on_wait=on_wait)
+    try:
+        yield
+    finally:
+        lock.release()
@@ -1,16 +1,18 @@
-import json
+import asyncio
 import os
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional
-import openai
-import requests
-from urllib.parse import urlparse
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
 from mcp import StdioServerParameters
 
+from .config import ConfigDiff, ConfigStore, diff_servers, load_config_file
+from .env import CompiledEnv, EnvResolver
 from .exceptions import ServerConfigNotFoundError
-from .schemas import MCPServerConfigSchema
+from .extraction import ConfigExtractor
+from .launch import LaunchResolver, resolve_on_launch
+from .readme import ReadmeFetcher
 
 @dataclass
 class MCPServerConfig:
@@ -22,26 +24,74 @@ class MCPServerConfig:
     description: Optional[str] = None
     tags: Optional[List[str]] = None
     repo_url: Optional[str] = None
+    # Commit, tag or branch to check out instead of the default branch
+    repo_ref: Optional[str] = None
     setup_script: Optional[str] = None
+    # "shared-env": link a prebuilt environment keyed by the checkout's lockfile into .venv
+    setup_mode: Optional[str] = None
     cwd: Optional[str] = None
+    compiled_env: Optional[CompiledEnv] = field(default=None, repr=False, compare=False)
+
+    def needs_setup(self) -> bool:
+        """True if the server is cloned and prepared before it can run."""
+        return bool(self.repo_url and (self.setup_script or self.setup_mode))
+
+    def resolved_env(self, resolver: EnvResolver, strict: bool = False) -> Dict[str, str]:
+        """Return ``env`` with ${VAR} templates substituted from ``resolver``."""
+        if self.compiled_env is None or self.compiled_env.templates.keys() != self.env.keys():
+            self.compiled_env = CompiledEnv(self.env)
+        return self.compiled_env.resolve(resolver, strict)
     
 class MCPServersParams:
-    def __init__(self, config_path: Optional[str]):
+    def __init__(self, config_path: Optional[str], lazy: bool = False,
+                 env_files: Optional[Sequence[str]] = None):
+        """
+        Args:
+            config_path: Path to the .mcphub.json file
+            lazy: Validate each server entry only when it is first accessed
+                instead of validating the whole file up front. Useful for
+                registries with thousands of entries.
+            env_files: .env files consulted for ${VAR} templates after the
+                process environment (defaults to .env next to config_path)
+        """
         self.config_path = config_path
+        self.lazy = lazy
+        if env_files is None:
+            env_files = [str(Path(config_path).parent / ".env")] if config_path else []
+        self.env_resolver = EnvResolver(env_files)
+        # npx/uvx launch commands resolved by 'mcphub refresh' (or on first spawn with
+        # MCPHUB_RESOLVE_LAUNCH=1) are spawned through their cached entrypoints
+        self.launch_resolver: Optional[LaunchResolver] = None
+        if config_path:
+            self.launch_resolver = LaunchResolver(Path(config_path).parent / ".mcphub_cache" / "launch.json")
+        self._raw_servers: Dict[str, Dict] = {}
+        # Secondary indexes, built from the raw entries on first use
+        self._tag_index: Optional[Dict[str, List[str]]] = None
+        self._package_index: Optional[Dict[str, List[str]]] = None
+        self._servers_view: Optional[Tuple[MCPServerConfig, ...]] = None
         self._servers_params = self._load_servers_params()
-        # Initialize OpenAI client if API key is available
-        self.openai_client = None
-        if os.getenv("OPENAI_API_KEY"):
-            self.openai_client = openai.OpenAI()
+        self._readme_fetcher: Optional[ReadmeFetcher] = None
+        # Created on first use; cache hits need no OpenAI API key
+        self._extractor: Optional[ConfigExtractor] = None
 
     @property
-    def servers_params(self) -> List[MCPServerConfig]:
-        """Return the list of server parameters."""
-        server_configs = []
-        for server_name, server_params in self._servers_params.items():
-            server_params.server_name = server_name
-            server_configs.append(server_params)
-        return server_configs
+    def servers_params(self) -> Tuple[MCPServerConfig, ...]:
+        """Return all server parameters as an immutable, cached sequence."""
+        if self._servers_view is None:
+            self._servers_view = tuple(
+                self.retrieve_server_params(server_name) for server_name in self._raw_servers
+            )
+        return self._servers_view
+
+    def __len__(self) -> int:
+        return len(self._raw_servers)
+
+    def __contains__(self, server_name: object) -> bool:
+        return server_name in self._raw_servers
+
+    def server_names(self) -> List[str]:
+        """Return the configured server names without validating any entry."""
+        return list(self._raw_servers)
 
     def _load_user_config(self) -> Dict:
         """Load user configuration from JSON file."""
@@ -49,82 +99,42 @@ class MCPServersParams:
         if not self.config_path:
             raise ServerConfigNotFoundError("No configuration file path provided")
             
-        try:
-            with open(self.config_path, "r") as f:
-                config = json.load(f)
-                return config.get("mcpServers", {})
-        except FileNotFoundError:
-            # For test compatibility: raise FileNotFoundError when path is specified but file doesn't exist
-            # Only return empty dict when path is None
-            raise FileNotFoundError(f"Configuration file not found: {self.config_path}")
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Invalid JSON in configuration file: {e}")
+        # Parsed files are cached by inode and mtime; raises FileNotFoundError or ValueError.
+        # The cached object is shared, so raw entries must never be mutated in place.
+        config = load_config_file(self.config_path, copy=False)
+        return config.get("mcpServers", {})
+
+    @property
+    def readme_fetcher(self) -> ReadmeFetcher:
+        """Pooled README fetcher shared by every add_server_from_repo call."""
+        if self._readme_fetcher is None:
+            self._readme_fetcher = ReadmeFetcher()
+        return self._readme_fetcher
 
     def _get_github_readme(self, repo_url: str) -> str:
-        """Fetch README content from GitHub repository."""
-        parsed_url = urlparse(repo_url)
-        if parsed_url.netloc != "github.com":
-            raise ValueError("Only GitHub repositories are supported")
-        
-        # Convert github.com URL to raw content URL
-        path_parts = parsed_url.path.strip("/").split("/")
-        if len(path_parts) != 2:
-            raise ValueError("Invalid GitHub repository URL")
-        
-        owner, repo = path_parts
-        raw_url = f"https://raw.githubusercontent.com/{owner}/{repo}/main/README.md"
-        
-        response = requests.get(raw_url)
-        if response.status_code == 200:
-            return response.text
-        else:
-            # Try master branch if main doesn't exist
-            raw_url = f"https://raw.githubusercontent.com/{owner}/{repo}/master/README.md"
-            response = requests.get(raw_url)
-            if response.status_code == 200:
-                return response.text
-            raise ValueError(f"Could not fetch README from {repo_url}")
+        """Fetch README content from GitHub repository (main, then master)."""
+        return self.readme_fetcher.fetch(repo_url)
+
+    @property
+    def extractor(self) -> ConfigExtractor:
+        """README-to-config extractor with an on-disk result cache."""
+        if self._extractor is None:
+            self._extractor = ConfigExtractor()
+        return self._extractor
 
     def _parse_readme_with_openai(self, readme_content: str) -> Dict:
         """Use OpenAI to parse README and extract MCP server configuration."""
-        if not self.openai_client:
-            raise ValueError("OpenAI API key not configured. Set OPENAI_API_KEY environment variable.")
-
-        prompt = f"""Please analyze this MCP server README and extract the configuration in JSON format.
-        The configuration should include:
-        - command: The command to run the server
-        - args: List of command line arguments
-        - env: Environment variables (if any)
-        - setup_script: Any setup script needed (if any)
-        
-        README content:
-        {readme_content}
-        
-        Return only the JSON configuration, nothing else."""
+        return self.extractor.extract(readme_content)
 
-        try:
-            response = self.openai_client.responses.parse(
-                model="gpt-4o-mini",
-                input=[
-                    {"role": "system", "content": "You are a helpful assistant that extracts MCP server configuration from READMEs."},
-                    {"role": "user", "content": prompt}
-                ],
-                text_format=MCPServerConfigSchema
-            )
-            # Validate response structure
-            if not hasattr(response, "output_parsed") or not hasattr(response.output_parsed, "model_dump"):
-                raise ValueError("Unexpected OpenAI API response format")
-            config = response.output_parsed.model_dump()
-            return config
-        except json.JSONDecodeError as e:
-            # Log the problematic response content for debugging
-            raise ValueError(f"Failed to parse OpenAI response as JSON: {e}")
-        except openai.error.OpenAIError as e:
-            # Log OpenAI-specific errors
-            raise RuntimeError(f"OpenAI API error: {e}")
-        except Exception as e:
-            # Catch-all for any other unexpected exceptions
-            raise RuntimeError(f"Unexpected error while parsing OpenAI response: {e}")
+    def _config_from_readme(self, server_name: str, repo_url: str, config: Dict) -> MCPServerConfig:
+        return MCPServerConfig(
+            package_name=server_name,
+            command=config["command"],
+            args=config["args"],
+            env=config.get("env") or {},
+            repo_url=repo_url,
+            setup_script=config.get("setup_script")
+        )
 
     def add_server_from_repo(self, server_name: str, repo_url: str) -> None:
         """Add a new server configuration by analyzing its GitHub repository README."""
@@ -136,101 +146,309 @@ class MCPServersParams:
             config = self._parse_readme_with_openai(readme_content)
             
             # Create server configuration
-            server_config = MCPServerConfig(
-                package_name=server_name,
-                command=config["command"],
-                args=config["args"],
-                env=config.get("env", {}),
-                repo_url=repo_url,
-                setup_script=config.get("setup_script")
-            )
+            server_config = self._config_from_readme(server_name, repo_url, config)
             
             # Add to existing configuration
-            self._servers_params[server_name] = server_config
+            self._set_server(server_name, server_config)
             
             # Save to .mcphub.json
-            self._save_config()
+            self._save_server(server_name)
             
         except Exception as e:
             raise ValueError(f"Failed to add server from repository: {str(e)}")
 
-    def _save_config(self) -> None:
-        """Save current configuration to .mcphub.json."""
+    def add_servers_from_repos(
+        self,
+        repos: Dict[str, str],
+        on_progress: Optional[Callable[[str, str, Optional[Exception]], None]] = None,
+    ) -> Dict[str, Optional[Exception]]:
+        """Add several servers from their repositories' READMEs at once.
+
+        READMEs are fetched concurrently and extracted in one concurrent
+        batch. Every server that succeeded is saved in a single write.
+        Must not be called from a running event loop.
+
+        Args:
+            repos: Mapping of server name to GitHub repository URL
+            on_progress: Called with (server name, stage, error) as each
+                server is "fetched", "parsed" or has "failed"
+
+        Returns:
+            Mapping of server name to None on success, or the error that
+            prevented adding it
+        """
+        errors: Dict[str, Optional[Exception]] = {}
+
+        def report(name: str, stage: str, error: Optional[Exception] = None) -> None:
+            if on_progress is not None:
+                on_progress(name, stage, error)
+
+        def fail(name: str, error: Exception) -> None:
+            errors[name] = ValueError(f"Failed to add server from repository: {error}")
+            report(name, "failed", errors[name])
+
+        readmes: Dict[str, str] = {}
+        with ThreadPoolExecutor(max_workers=min(8, max(1, len(repos))),
+                                thread_name_prefix="mcphub-add") as executor:
+            futures = {executor.submit(self._get_github_readme, url): name for name, url in repos.items()}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    readmes[name] = future.result()
+                except Exception as e:
+                    fail(name, e)
+                else:
+                    report(name, "fetched")
+
+        names = list(readmes)
+        configs: Dict[str, MCPServerConfig] = {}
+
+        def on_result(index: int, config) -> None:
+            name = names[index]
+            try:
+                if isinstance(config, Exception):
+                    raise config
+                configs[name] = self._config_from_readme(name, repos[name], config)
+            except Exception as e:
+                fail(name, e)
+            else:
+                report(name, "parsed")
+
+        if names:
+            try:
+                asyncio.run(self.extractor.extract_many([readmes[name] for name in names], on_result))
+            except Exception as e:
+                for name in names:
+                    if name not in configs and name not in errors:
+                        fail(name, e)
+
+        for name, server_config in configs.items():
+            self._set_server(name, server_config)
+            errors[name] = None
+        if configs:
+            self._save_servers(list(configs))
+        return {name: errors[name] for name in repos}
+
+    def _save_server(self, server_name: str) -> None:
+        """Write one server entry to .mcphub.json, leaving all other entries untouched."""
         if not self.config_path:
             raise ValueError("No configuration path specified")
-            
-        config = {"mcpServers": {}}
-        for server_name, server_params in self._servers_params.items():
-            config["mcpServers"][server_name] = {
-                "package_name": server_params.package_name,
-                "command": server_params.command,
-                "args": server_params.args,
-                "env": server_params.env,
-                "repo_url": server_params.repo_url,
-                "setup_script": server_params.setup_script
-            }
-            
-        with open(self.config_path, "w") as f:
-            json.dump(config, f, indent=4)
+        ConfigStore(self.config_path).patch_server(server_name, self._raw_servers[server_name])
+
+    def _save_servers(self, server_names: Sequence[str]) -> None:
+        """Write several server entries to .mcphub.json in one atomic update."""
+        if not self.config_path:
+            raise ValueError("No configuration path specified")
+        ConfigStore(self.config_path).patch_servers(
+            {name: self._raw_servers[name] for name in server_names}
+        )
 
     def _load_servers_params(self) -> Dict[str, MCPServerConfig]:
         config = self._load_user_config()
         servers = {}
         
-        for mcp_name, server_config in config.items():
+        if not self.lazy:
+            for mcp_name, server_config in config.items():
+                servers[mcp_name] = self._build_server_config(mcp_name, server_config)
+        
+        self._raw_servers = config
+        self._invalidate_views()
+        return servers
+
+    def _invalidate_views(self) -> None:
+        """Drop the cached list view and secondary indexes after the entries changed."""
+        self._tag_index = None
+        self._package_index = None
+        self._servers_view = None
+
+    def _build_indexes(self) -> None:
+        """Build the tag and package indexes from the raw entries."""
+        tag_index: Dict[str, List[str]] = {}
+        package_index: Dict[str, List[str]] = {}
+        for mcp_name, server_config in self._raw_servers.items():
+            for tag in server_config.get("tags") or ():
+                tag_index.setdefault(tag, []).append(mcp_name)
             package_name = server_config.get("package_name")
-            
-            if not package_name:
-                raise ValueError(
-                    f"Configuration for server '{mcp_name}' is missing the required 'package_name' field. "
-                    "As of the latest update, all server configurations must explicitly include a 'package_name'. "
-                    "Please update your configuration file to include this field."
-                )
-            
-            # Get command and args with defaults
-            command = server_config.get("command", None)
-            args = server_config.get("args", None)
-            
-            # Skip if command or args is None
-            if command is None or args is None:
-                raise ValueError(
-                    f"Invalid server '{mcp_name}' configuration: command or args is None. "
-                    f"Command: {command}, Args: {args}"
-                )
-                
-            servers[mcp_name] = MCPServerConfig(
-                package_name=package_name,
-                command=command,
-                args=args,
-                env=server_config.get("env", {}),
-                description=server_config.get("description"),
-                tags=server_config.get("tags"),
-                repo_url=server_config.get("repo_url"),
-                setup_script=server_config.get("setup_script")
+            if package_name:
+                package_index.setdefault(package_name, []).append(mcp_name)
+        self._tag_index = tag_index
+        self._package_index = package_index
+
+    def _set_server(self, server_name: str, server_config: MCPServerConfig) -> None:
+        """Add or replace a server entry, keeping the raw entries and indexes in sync."""
+        server_config.server_name = server_name
+        self._servers_params[server_name] = server_config
+        raw = {
+            "package_name": server_config.package_name,
+            "command": server_config.command,
+            "args": server_config.args,
+            "env": server_config.env,
+        }
+        for key in ("description", "tags", "repo_url", "repo_ref", "setup_script", "setup_mode", "cwd"):
+            value = getattr(server_config, key)
+            if value is not None:
+                raw[key] = value
+        self._raw_servers = {**self._raw_servers, server_name: raw}
+        self._invalidate_views()
+
+    @staticmethod
+    def _build_server_config(mcp_name: str, server_config: Dict) -> MCPServerConfig:
+        package_name = server_config.get("package_name")
+        
+        if not package_name:
+            raise ValueError(
+                f"Configuration for server '{mcp_name}' is missing the required 'package_name' field. "
+                "As of the latest update, all server configurations must explicitly include a 'package_name'. "
+                "Please update your configuration file to include this field."
             )
         
-        return servers
+        # Get command and args with defaults
+        command = server_config.get("command", None)
+        args = server_config.get("args", None)
+        
+        # Skip if command or args is None
+        if command is None or args is None:
+            raise ValueError(
+                f"Invalid server '{mcp_name}' configuration: command or args is None. "
+                f"Command: {command}, Args: {args}"
+            )
+            
+        tags = server_config.get("tags")
+        env = dict(server_config.get("env") or {})
+        return MCPServerConfig(
+            package_name=package_name,
+            command=command,
+            args=list(args),
+            env=env,
+            compiled_env=CompiledEnv(env),
+            server_name=mcp_name,
+            description=server_config.get("description"),
+            tags=list(tags) if tags is not None else None,
+            repo_url=server_config.get("repo_url"),
+            repo_ref=server_config.get("repo_ref"),
+            setup_script=server_config.get("setup_script"),
+            setup_mode=server_config.get("setup_mode"),
+            cwd=server_config.get("cwd")
+        )
+
+    def reload(self) -> ConfigDiff:
+        """Re-read the configuration file and apply only the entries that changed.
+
+        Servers whose configuration is unchanged keep their existing
+        MCPServerConfig object, including a working directory set by setup.
+
+        Returns:
+            ConfigDiff describing the added, removed and changed servers
+        """
+        config = self._load_user_config()
+        diff = diff_servers(self._raw_servers, config)
+        if not diff:
+            return diff
+
+        modified = diff.added + diff.changed + diff.resetup + diff.updated
+        if self.lazy:
+            # Entries that were never accessed are simply validated on first use
+            modified = [name for name in modified if name in self._servers_params]
+        # Validate every new or modified entry before touching the current state
+        rebuilt = {name: self._build_server_config(name, config[name]) for name in modified}
+        for name in diff.removed + diff.changed + diff.resetup + diff.updated:
+            if name not in rebuilt:
+                self._servers_params.pop(name, None)
+        for name, server_config in rebuilt.items():
+            previous = self._servers_params.get(name)
+            # Keep the path prepared by setup unless the entry now needs a new setup
+            if previous is not None and server_config.cwd is None and name not in diff.resetup:
+                server_config.cwd = previous.cwd
+            self._servers_params[name] = server_config
+        self._raw_servers = config
+        self._invalidate_views()
+        return diff
     
-    def list_servers(self) -> List[MCPServerConfig]:
+    def list_servers(self) -> Tuple[MCPServerConfig, ...]:
         return self.servers_params
     
     def retrieve_server_params(self, server_name: str) -> MCPServerConfig:
         # First check in the loaded servers
-        if server_name in self._servers_params:
-            return self._servers_params[server_name]
+        server_params = self._servers_params.get(server_name)
+        if server_params is not None:
+            return server_params
+        # Validate lazily loaded entries on first access
+        raw = self._raw_servers.get(server_name)
+        if raw is not None:
+            server_params = self._build_server_config(server_name, raw)
+            self._servers_params[server_name] = server_params
+            return server_params
         raise ServerConfigNotFoundError(f"Server '{server_name}' not found")
+
+    def find_by_tag(self, tag: str) -> List[MCPServerConfig]:
+        """Return the servers carrying ``tag``, in configuration order."""
+        if self._tag_index is None:
+            self._build_indexes()
+        return [self.retrieve_server_params(name) for name in self._tag_index.get(tag, ())]
+
+    def find_by_package(self, package_name: str) -> List[MCPServerConfig]:
+        """Return the servers configured for ``package_name``, in configuration order."""
+        if self._package_index is None:
+            self._build_indexes()
+        return [self.retrieve_server_params(name) for name in self._package_index.get(package_name, ())]
     
+    def resolve_env(self, server_config: MCPServerConfig) -> Dict[str, str]:
+        """Resolve a server's ${VAR} templates against the environment and .env files.
+
+        Unset variables are passed through unchanged.
+        """
+        return server_config.resolved_env(self.env_resolver)
+
+    def missing_env_vars(self, server_name: str) -> List[str]:
+        """Return the variables referenced by a server's env that are not set."""
+        server_config = self.retrieve_server_params(server_name)
+        server_config.resolved_env(self.env_resolver)
+        return server_config.compiled_env.missing(self.env_resolver)
+    
+    def launch_command(self, server_config: MCPServerConfig,
+                       env: Optional[Dict[str, str]] = None) -> Tuple[str, List[str]]:
+        """Return the command and arguments to spawn a server with.
+
+        ``npx``/``uvx`` commands are replaced by the entrypoint they resolve
+        to, so repeat spawns skip the shim's package resolution. Uncached
+        commands are only resolved when MCPHUB_RESOLVE_LAUNCH is set, since
+        that installs the package.
+        """
+        if self.launch_resolver is None:
+            return server_config.command, list(server_config.args)
+        install = resolve_on_launch()
+        return self.launch_resolver.resolve(
+            server_config.command, server_config.args, server_config.cwd,
+            (env if env is not None else self.resolve_env(server_config)) if install else None,
+            install=install
+        )
+
+    def refresh_launch_commands(self, server_names: Optional[List[str]] = None) -> Dict[str, Tuple[str, List[str]]]:
+        """Re-resolve the launch commands of the given servers, or of all servers."""
+        resolved = {}
+        for server_name in server_names if server_names is not None else self.server_names():
+            server_config = self.retrieve_server_params(server_name)
+            if self.launch_resolver is None:
+                resolved[server_name] = (server_config.command, list(server_config.args))
+                continue
+            resolved[server_name] = self.launch_resolver.resolve(
+                server_config.command, server_config.args, server_config.cwd,
+                self.resolve_env(server_config), refresh=True
+            )
+        return resolved
+
     def convert_to_stdio_params(self, server_name: str) -> StdioServerParameters:
         server_params = self.retrieve_server_params(server_name)
         if not server_params:
             raise ServerConfigNotFoundError(f"Server '{server_name}' not found")
+        env = self.resolve_env(server_params)
+        command, args = self.launch_command(server_params, env)
         return StdioServerParameters(
-            command=server_params.command,
-            args=server_params.args,
-            env=server_params.env,
+            command=command,
+            args=args,
+            env=env,
+            cwd=server_params.cwd,
         )
     
     def update_server_path(self, server_name: str, server_path: str) -> None:
-        if server_name not in self._servers_params:
-            raise ServerConfigNotFoundError(f"Server '{server_name}' not found")
-        self._servers_params[server_name].cwd = server_path
+        self.retrieve_server_params(server_name).cwd = server_path
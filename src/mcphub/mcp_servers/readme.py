@@ -0,0 +1,157 @@
+"""Pooled, cached fetching of GitHub README files."""
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+
+from .cache import default_cache_root
+
+DEFAULT_RAW_HOST = "https://raw.githubusercontent.com"
+DEFAULT_BRANCHES = ("main", "master")
+
+
+def default_raw_host() -> str:
+    """Return MCPHUB_GITHUB_RAW_URL, or raw.githubusercontent.com."""
+    return os.getenv("MCPHUB_GITHUB_RAW_URL", DEFAULT_RAW_HOST).rstrip("/")
+
+
+def parse_github_url(repo_url: str) -> Tuple[str, str]:
+    """Return (owner, repo) for a github.com repository URL."""
+    parsed_url = urlparse(repo_url)
+    if parsed_url.netloc != "github.com":
+        raise ValueError("Only GitHub repositories are supported")
+    path_parts = parsed_url.path.strip("/").split("/")
+    if len(path_parts) != 2:
+        raise ValueError("Invalid GitHub repository URL")
+    owner, repo = path_parts
+    if repo.endswith(".git"):
+        repo = repo[:-len(".git")]
+    return owner, repo
+
+
+class ReadmeFetcher:
+    """Fetches README.md files over one pooled HTTP client.
+
+    The candidate branches are probed concurrently, and the first branch in
+    ``branches`` order that has a README wins. Responses are cached on disk
+    with their ETag and Last-Modified headers and revalidated with
+    conditional requests, so unchanged READMEs are not downloaded again.
+    """
+
+    def __init__(self, raw_host: Optional[str] = None, cache_dir: Optional[Path] = None,
+                 timeout: float = 10.0, branches: Tuple[str, ...] = DEFAULT_BRANCHES,
+                 client: Optional[httpx.Client] = None):
+        """
+        Args:
+            raw_host: Base URL serving raw files as /<owner>/<repo>/<branch>/README.md
+                (defaults to MCPHUB_GITHUB_RAW_URL or raw.githubusercontent.com)
+            cache_dir: Directory of cached responses (defaults to <user cache>/readmes)
+            timeout: Connect and read timeout in seconds
+            branches: Branches to look for the README on, in order of preference
+            client: HTTP client to use instead of a pooled client owned by the fetcher
+        """
+        self.raw_host = (raw_host or default_raw_host()).rstrip("/")
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_root() / "readmes"
+        self.timeout = timeout
+        self.branches = branches
+        self._client = client
+        self._owns_client = client is None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> httpx.Client:
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(
+                    timeout=self.timeout,
+                    follow_redirects=True,
+                    limits=httpx.Limits(max_connections=16, max_keepalive_connections=8),
+                )
+            return self._client
+
+    def close(self) -> None:
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None and self._owns_client:
+            client.close()
+
+    def __enter__(self) -> "ReadmeFetcher":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _cache_path(self, url: str) -> Path:
+        return self.cache_dir / (hashlib.sha256(url.encode()).hexdigest() + ".json")
+
+    def _read_cache(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._cache_path(url), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_cache(self, url: str, entry: Dict[str, Any]) -> None:
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self._cache_path(url)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            # The cache is an optimisation; a read-only home must not break fetching
+            pass
+
+    def _fetch_url(self, url: str) -> Optional[str]:
+        """Fetch one URL, revalidating a cached copy; None if it does not exist."""
+        cached = self._read_cache(url)
+        headers = {}
+        if cached is not None:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+        response = self.client.get(url, headers=headers)
+        if response.status_code == 304 and cached is not None:
+            return cached["body"]
+        if response.status_code != 200:
+            return None
+        self._write_cache(url, {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "body": response.text,
+        })
+        return response.text
+
+    def readme_urls(self, repo_url: str) -> List[str]:
+        owner, repo = parse_github_url(repo_url)
+        return [f"{self.raw_host}/{owner}/{repo}/{branch}/README.md" for branch in self.branches]
+
+    def fetch(self, repo_url: str) -> str:
+        """Return the README of a GitHub repository.
+
+        Raises:
+            ValueError: If the URL is not a GitHub repository or no README was found
+        """
+        urls = self.readme_urls(repo_url)
+        errors = []
+        with ThreadPoolExecutor(max_workers=len(urls), thread_name_prefix="mcphub-readme") as executor:
+            futures = [executor.submit(self._fetch_url, url) for url in urls]
+            for future in futures:
+                try:
+                    body = future.result()
+                except httpx.HTTPError as e:
+                    errors.append(str(e))
+                    continue
+                if body is not None:
+                    return body
+        detail = f": {'; '.join(errors)}" if errors else ""
+        raise ValueError(f"Could not fetch README from {repo_url}{detail}")
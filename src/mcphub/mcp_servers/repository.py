@@ -0,0 +1,122 @@
+"""Git commands for cloning server repositories into the cache."""
+import hashlib
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+_FULL_SHA_RE = re.compile(r"^[0-9a-f]{40}([0-9a-f]{24})?$")
+
+
+def default_mirror_root() -> Optional[Path]:
+    """Return the shared mirror directory from MCPHUB_GIT_MIRROR_DIR, if set."""
+    value = os.getenv("MCPHUB_GIT_MIRROR_DIR")
+    return Path(value).expanduser() if value else None
+
+
+def mirror_path(mirror_root: Path, repo_url: str) -> Path:
+    """Return the bare mirror that backs clones of ``repo_url``."""
+    name = repo_url.rstrip("/").split("/")[-1]
+    if name.endswith(".git"):
+        name = name[:-len(".git")]
+    digest = hashlib.sha256(repo_url.encode()).hexdigest()[:16]
+    return mirror_root / f"{name}-{digest}.git"
+
+
+def mirror_commands(repo_url: str, mirror: Path) -> List[List[str]]:
+    """Commands that create ``mirror`` or bring it up to date."""
+    if mirror.exists():
+        # No --prune: clones that borrow objects from the mirror must keep finding them
+        return [["git", "--git-dir", str(mirror), "fetch", "--quiet", "origin"]]
+    return [
+        ["git", "clone", "--mirror", "--quiet", repo_url, str(mirror)],
+        ["git", "--git-dir", str(mirror), "config", "gc.pruneExpire", "never"],
+    ]
+
+
+def clone_command(repo_url: str, repo_dir: Path, depth: Optional[int] = 1,
+                  filter_spec: Optional[str] = None, reference: Optional[Path] = None) -> List[str]:
+    """Build the ``git clone`` command for a cache checkout.
+
+    Args:
+        repo_url: Repository to clone
+        repo_dir: Directory to clone into
+        depth: History depth to fetch (None or 0 for full history)
+        filter_spec: Partial clone filter, e.g. "blob:none"
+        reference: Local mirror to borrow objects from
+
+    Returns:
+        The command as a list of arguments
+    """
+    command = ["git", "clone"]
+    if reference is not None:
+        # Objects come from the mirror, so the full history costs nothing extra
+        command += ["--reference", str(reference)]
+    else:
+        if depth:
+            command += ["--depth", str(depth)]
+        if filter_spec:
+            command += [f"--filter={filter_spec}"]
+    return command + [repo_url, str(repo_dir)]
+
+
+def is_commit_id(ref: str) -> bool:
+    return bool(_FULL_SHA_RE.match(ref))
+
+
+def local_commit_candidates(ref: str) -> List[str]:
+    """Refs that pin ``ref`` without contacting the remote: a commit id or a tag."""
+    if is_commit_id(ref):
+        return [ref]
+    return [f"refs/tags/{ref}"]
+
+
+def fetch_ref_command(repo_dir: Path, ref: str, depth: Optional[int] = 1) -> List[str]:
+    """Build the command that fetches ``ref`` into FETCH_HEAD."""
+    command = ["git", "-C", str(repo_dir), "fetch", "--quiet"]
+    if depth:
+        command += ["--depth", str(depth)]
+    return command + ["origin", ref]
+
+
+def fast_forward_command(repo_dir: Path) -> List[str]:
+    """Build the command that moves the checked-out branch to FETCH_HEAD.
+
+    Shallow clones do not have the history to prove a fast-forward, so
+    they are reset instead; ``--keep`` still refuses to discard local
+    changes to files that differ between the two commits.
+    """
+    if (repo_dir / ".git" / "shallow").exists():
+        return ["git", "-C", str(repo_dir), "reset", "--keep", "--quiet", "FETCH_HEAD"]
+    return ["git", "-C", str(repo_dir), "merge", "--ff-only", "--quiet", "FETCH_HEAD"]
+
+
+def fetched_tag(repo_dir: Path) -> bool:
+    """True if the last ``git fetch`` in ``repo_dir`` fetched a tag."""
+    try:
+        first_line = (repo_dir / ".git" / "FETCH_HEAD").read_text().split("\n", 1)[0]
+    except OSError:
+        return False
+    return "\ttag '" in first_line
+
+
+def ls_remote_command(repo_url: str, ref: Optional[str]) -> List[str]:
+    return ["git", "ls-remote", repo_url, ref or "HEAD"]
+
+
+def parse_ls_remote(output: str, ref: Optional[str]) -> Optional[str]:
+    """Pick the commit ``ref`` points to from ``git ls-remote`` output.
+
+    Peeled tags (``refs/tags/v1^{}``) win over the tag object itself, and
+    exact matches over branches and tags of the same short name.
+    """
+    refs: Dict[str, str] = {}
+    for line in output.splitlines():
+        commit, _, name = line.partition("\t")
+        if commit and name:
+            refs[name] = commit
+    ref = ref or "HEAD"
+    for name in (f"{ref}^{{}}", ref, f"refs/tags/{ref}^{{}}", f"refs/tags/{ref}", f"refs/heads/{ref}"):
+        if name in refs:
+            return refs[name]
+    return None
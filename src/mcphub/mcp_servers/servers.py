@@ -1,20 +1,153 @@
+import asyncio
+import hashlib
+import os
+import re
+import shutil
 import subprocess
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import Callable, ContextManager, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+from urllib.parse import quote
 
-from mcp import ClientSession, StdioServerParameters, Tool
+from mcp import ClientSession, Tool
 from mcp.client.stdio import stdio_client
 
+from .cache import RepositoryCache, global_cache_from_env
+from .catalog import ToolCatalog, catalog_fingerprint
+from .config import ConfigDiff
+from .envs import SHARED_ENV_MODE, SharedEnvStore, compile_bytecode, env_key, find_lockfile
 from .exceptions import SetupError
+from .fingerprint import StampStore, compute_fingerprint, git_head
+from .locks import LockHolder, path_lock
+from .repository import (
+    clone_command,
+    default_mirror_root,
+    fast_forward_command,
+    fetch_ref_command,
+    fetched_tag,
+    is_commit_id,
+    local_commit_candidates,
+    ls_remote_command,
+    mirror_commands,
+    mirror_path,
+    parse_ls_remote,
+)
 from .params import MCPServerConfig, MCPServersParams
+from .streaming import OutputTail, run_streaming
+
+
+@dataclass
+class SetupResult:
+    """Outcome of setting up a single server."""
+    server_name: str
+    status: str  # "succeeded", "cached", "skipped" or "failed"
+    duration: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class UpdateResult:
+    """Outcome of updating a single server's checkout."""
+    server_name: str
+    status: str  # "updated", "unchanged", "skipped" or "failed"
+    old_head: Optional[str] = None
+    new_head: Optional[str] = None
+    duration: float = 0.0
+    error: Optional[str] = None
 
 
 class MCPServers:
-    def __init__(self, servers_params: MCPServersParams):
+    def __init__(self, servers_params: MCPServersParams, max_workers: Optional[int] = None,
+                 force_setup: bool = False, auto_setup: bool = True,
+                 clone_depth: Optional[int] = None, clone_filter: Optional[str] = None,
+                 git_mirror_dir: Optional[Path] = None, background_setup: Optional[bool] = None,
+                 global_cache: Optional[RepositoryCache] = None,
+                 on_output: Optional[Callable[[Optional[str], str], None]] = None,
+                 cache_tools: Optional[bool] = None,
+                 shared_envs: Optional[SharedEnvStore] = None,
+                 precompile: Optional[bool] = None):
+        """
+        Args:
+            servers_params: Server configurations to manage
+            max_workers: Maximum number of servers set up concurrently
+                (defaults to MCPHUB_SETUP_WORKERS or min(8, cpu_count))
+            force_setup: Re-run setup scripts even when their stamps are current
+            auto_setup: Set up all servers during initialization
+            clone_depth: History depth of new clones, 0 for full history
+                (defaults to MCPHUB_CLONE_DEPTH or 1)
+            clone_filter: Partial clone filter such as "blob:none"
+                (defaults to MCPHUB_CLONE_FILTER)
+            git_mirror_dir: Directory of shared bare mirrors that clones borrow
+                objects from (defaults to MCPHUB_GIT_MIRROR_DIR; unset disables mirrors)
+            background_setup: Return from initialization before setup finishes
+                (defaults to True when constructed inside a running event loop)
+            global_cache: User-level cache that checkouts are shared through
+                (defaults to MCPHUB_GLOBAL_CACHE; unset keeps clones per project)
+            on_output: Called with (server_name, line) for every line that a
+                clone or setup script writes, as soon as it is written
+            cache_tools: Keep each server's tool list in .mcphub_cache/tools and
+                serve list_tools from it while the server is unchanged
+                (defaults to True unless MCPHUB_TOOL_CATALOG=0)
+            shared_envs: Store of prebuilt environments for servers with
+                ``setup_mode: "shared-env"`` (defaults to <user cache>/envs)
+            precompile: Compile a checkout's Python bytecode with its .venv
+                interpreter after setup (defaults to True unless MCPHUB_PRECOMPILE=0)
+        """
         self.servers_params = servers_params
+        self.max_workers = max_workers or int(os.getenv("MCPHUB_SETUP_WORKERS", 0)) or min(8, os.cpu_count() or 1)
+        self.clone_depth = clone_depth if clone_depth is not None else int(os.getenv("MCPHUB_CLONE_DEPTH", 1))
+        self.clone_filter = clone_filter or os.getenv("MCPHUB_CLONE_FILTER") or None
+        self.git_mirror_dir = Path(git_mirror_dir) if git_mirror_dir is not None else default_mirror_root()
+        self.background_setup = background_setup
+        self.global_cache = global_cache if global_cache is not None else global_cache_from_env()
+        self.on_output = on_output
+        self.setup_results: Dict[str, SetupResult] = {}
+        self._ready: Dict[str, Future] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._log_context = threading.local()
+        self._print_lock = threading.Lock()
         self.cache_dir = self._get_cache_dir()
-        # Run setup for all servers during initialization
-        self._setup_all_servers()
+        self.stamps = StampStore(self.cache_dir)
+        if cache_tools is None:
+            cache_tools = os.getenv("MCPHUB_TOOL_CATALOG", "1").lower() not in ("0", "false", "no")
+        self.tool_catalog: Optional[ToolCatalog] = ToolCatalog(self.cache_dir) if cache_tools else None
+        self.shared_envs = shared_envs if shared_envs is not None else SharedEnvStore()
+        if precompile is None:
+            precompile = os.getenv("MCPHUB_PRECOMPILE", "1").lower() not in ("0", "false", "no")
+        self.precompile = precompile
+        self.force_setup = force_setup
+        if auto_setup:
+            # Run setup for all servers during initialization
+            self._setup_all_servers()
+
+    def _log(self, message: str) -> None:
+        """Print a message prefixed with the server currently being set up on this thread."""
+        server_name = getattr(self._log_context, "server_name", None)
+        prefix = f"[{server_name}] " if server_name else ""
+        with self._print_lock:
+            for line in message.splitlines() or [""]:
+                print(f"{prefix}{line}")
+
+    def log_path(self, server_name: Optional[str]) -> Path:
+        """Get the file that a server's clone and setup output is appended to."""
+        return self.cache_dir / "logs" / (quote(server_name or "setup", safe="") + ".log")
+
+    def _stream(self, command: List[str], cwd: Optional[Path] = None,
+                env: Optional[Mapping[str, str]] = None) -> OutputTail:
+        """Run a setup step, streaming its output to the console, log file and callback."""
+        server_name = getattr(self._log_context, "server_name", None)
+
+        def on_line(line: str) -> None:
+            self._log(line)
+            if self.on_output is not None:
+                self.on_output(server_name, line)
+
+        return run_streaming(command, cwd=cwd, on_line=on_line, log_path=self.log_path(server_name), env=env)
 
     def _get_cache_dir(self) -> Path:
         """Get the cache directory path, creating it if it doesn't exist."""
@@ -31,37 +164,112 @@ class MCPServers:
         cache_dir.mkdir(exist_ok=True)
         return cache_dir
 
+    def _repo_dir(self, repo_name: str) -> Path:
+        """Get the cache directory a repository is cloned into.
+
+        Directories are named after the full package name, so "a/server"
+        and "b/server" never share a checkout.
+        """
+        return self.cache_dir / re.sub(r"[^A-Za-z0-9._@-]", "--", repo_name)
+
+    def _checkout_dir(self, server_config: MCPServerConfig) -> Path:
+        """Get the directory a server's setup runs in."""
+        if self.global_cache is None:
+            return self._repo_dir(server_config.package_name)
+        # Links into the global cache also carry the ref, since each commit is its own entry
+        return self._repo_dir(server_config.package_name + (f"@{server_config.repo_ref}" if server_config.repo_ref else ""))
+
+    def _checkout_lock(self, path: Path) -> ContextManager[None]:
+        """Lock ``path`` against other processes, logging who holds it while waiting."""
+        def on_wait(holder: Optional[LockHolder]) -> None:
+            self._log(f"Waiting for {holder or 'another process'} to finish with {path}")
+        return path_lock(path, on_wait=on_wait)
+
+    def _run_git(self, command: List[str]) -> subprocess.CompletedProcess:
+        return subprocess.run(command, check=True, capture_output=True, text=True)
+
+    def _update_mirror(self, repo_url: str) -> Path:
+        """Create or fetch the shared bare mirror of ``repo_url``."""
+        mirror = mirror_path(self.git_mirror_dir, repo_url)
+        with self._checkout_lock(mirror):
+            for command in mirror_commands(repo_url, mirror):
+                self._run_git(command)
+        return mirror
+
     def _clone_repository(self, repo_url: str, repo_name: str) -> Path:
-        """Clone a repository into the cache directory."""
+        """Clone a repository into the cache directory.
+
+        Clones are shallow (``clone_depth``) or partial (``clone_filter``)
+        unless a shared mirror is configured, in which case objects are
+        borrowed from the mirror through ``--reference``.
+        """
         if not repo_url:
             raise SetupError(
                 "Repository URL is required but was not provided. "
                 "Please configure the repo_url field in .mcphub.json for this server."
             )
             
-        repo_dir = self.cache_dir / repo_name.split('/')[-1]
+        repo_dir = self._repo_dir(repo_name)
         
         if repo_dir.exists():
-            print(f"Repository already exists at {repo_dir}")
+            self._log(f"Repository already exists at {repo_dir}")
             return repo_dir
 
+        # Clone next to the final directory and move it into place, so a
+        # clone interrupted by a crash is never mistaken for a complete one
+        tmp_dir = repo_dir.with_name(f"{repo_dir.name}.{os.getpid()}.tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
         try:
-            subprocess.run(
-                ["git", "clone", repo_url, str(repo_dir)],
-                check=True,
-                capture_output=True,
-                text=True
-            )
-            print(f"Successfully cloned repository to {repo_dir}")
-            return repo_dir
+            self._clone_into(repo_url, tmp_dir)
+            os.replace(tmp_dir, repo_dir)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        self._log(f"Successfully cloned repository to {repo_dir}")
+        return repo_dir
+
+    def _clone_into(self, repo_url: str, repo_dir: Path) -> None:
+        try:
+            reference = None
+            if self.git_mirror_dir is not None:
+                reference = self._update_mirror(repo_url)
+            self._stream(clone_command(repo_url, repo_dir, self.clone_depth, self.clone_filter, reference))
         except subprocess.CalledProcessError as e:
             raise SetupError(f"Failed to clone repository {repo_url}: {e.stderr}")
 
+    def _checkout_ref(self, repo_dir: Path, ref: str) -> None:
+        """Check out the commit, tag or branch a server is pinned to.
+
+        Commits and tags that are already present locally are checked out
+        without contacting the remote; branches are always fetched.
+        """
+        head = git_head(repo_dir)
+        try:
+            for candidate in local_commit_candidates(ref):
+                result = subprocess.run(
+                    ["git", "-C", str(repo_dir), "rev-parse", "--verify", "--quiet", f"{candidate}^{{commit}}"],
+                    capture_output=True, text=True
+                )
+                commit = result.stdout.strip() if result.returncode == 0 else None
+                if commit:
+                    break
+            else:
+                self._run_git(fetch_ref_command(repo_dir, ref, self.clone_depth))
+                if fetched_tag(repo_dir):
+                    # Keep the tag so the next setup can skip the fetch
+                    self._run_git(["git", "-C", str(repo_dir), "update-ref", f"refs/tags/{ref}", "FETCH_HEAD"])
+                commit = self._run_git(["git", "-C", str(repo_dir), "rev-parse", "FETCH_HEAD^{commit}"]).stdout.strip()
+            if commit != head:
+                self._run_git(["git", "-C", str(repo_dir), "checkout", "--quiet", "--detach", commit])
+                self._log(f"Checked out {ref} ({commit[:12]})")
+        except subprocess.CalledProcessError as e:
+            raise SetupError(f"Failed to check out {ref} in {repo_dir}: {e.stderr}")
+
     def _run_setup_script(self, script_path: Path, setup_script: str) -> None:
         """Run the setup script in the repository directory."""
+        # Named after this process and thread, so concurrent setups never share a script
+        script_file = script_path / f".mcphub-setup-{os.getpid()}-{threading.get_ident()}.sh"
         try:
             # Create a temporary shell script
-            script_file = script_path / "setup_temp.sh"
             with open(script_file, "w") as f:
                 f.write("#!/bin/bash\n")
                 f.write(setup_script + "\n")
@@ -70,76 +278,452 @@ class MCPServers:
             script_file.chmod(0o755)
             
             # Run the script
-            subprocess.run(
-                [str(script_file)],
-                check=True,
-                capture_output=True,
-                text=True,
-                cwd=script_path
-            )
-            
-            # Clean up
-            script_file.unlink()
+            try:
+                self._stream([str(script_file)], cwd=script_path)
+            finally:
+                script_file.unlink(missing_ok=True)
             
-            print(f"Successfully executed setup script: {setup_script} in {script_path}")
+            self._log(f"Successfully executed setup script: {setup_script} in {script_path}")
         except subprocess.CalledProcessError as e:
-            raise SetupError(f"Failed to run setup script '{setup_script}' in {script_path}: {e.stderr}")
+            log_path = self.log_path(getattr(self._log_context, "server_name", None))
+            raise SetupError(
+                f"Failed to run setup script '{setup_script}' in {script_path}: {e.stderr}\n"
+                f"Full output: {log_path}"
+            )
         except Exception as e:
             raise SetupError(f"Error during setup script execution: {str(e)}")
 
     def _update_server_path(self, server_config: MCPServerConfig, repo_dir: Path) -> None:
         """Update the server_path in the server configuration."""
         self.servers_params.update_server_path(server_config.server_name, str(repo_dir))
-        print(f"Updated server path for {server_config.server_name}: {repo_dir}")
+        self._log(f"Updated server path for {server_config.server_name}: {repo_dir}")
 
-    def setup_server(self, server_config: MCPServerConfig) -> None:
-        """Set up a single server if it has repo_url and setup_script."""
-        if not (server_config.repo_url and server_config.setup_script):
-            print(f"Skipping setup for {server_config.package_name}: No repo_url or setup_script specified")
-            return
+    def setup_server(self, server_config: MCPServerConfig, force: bool = False) -> bool:
+        """Set up a single server if it has repo_url and a setup_script or setup_mode.
+
+        The setup script is skipped when the server's stamp shows it already
+        ran against the same commit, script and tool versions, unless
+        ``force`` is True.
+
+        Returns:
+            True if the setup script ran, False if it was skipped
+        """
+        if not server_config.needs_setup():
+            self._log(f"Skipping setup for {server_config.package_name}: No repo_url or setup_script specified")
+            return False
 
         try:
-            # Clone the repository
-            repo_dir = self._clone_repository(server_config.repo_url, server_config.package_name)
-            
-            # Run setup script
-            if repo_dir.exists():
-                self._run_setup_script(repo_dir, server_config.setup_script)
-                # Update server_path after successful setup
-                self._update_server_path(server_config, repo_dir)
-            else:
-                raise SetupError(f"Setup script not found: {repo_dir}")
+            if self.global_cache is not None:
+                with self._global_checkout(server_config) as (repo_dir, stamps, stamp_name):
+                    return self._setup_checkout(server_config, repo_dir, stamps, stamp_name, force)
+
+            # Other processes sharing this cache wait here and then find the
+            # checkout and its stamp current
+            with self._checkout_lock(self._repo_dir(server_config.package_name)):
+                # Clone the repository
+                repo_dir = self._clone_repository(server_config.repo_url, server_config.package_name)
+
+                # Run setup script
+                if repo_dir.exists():
+                    if server_config.repo_ref:
+                        self._checkout_ref(repo_dir, server_config.repo_ref)
+                    stamp_name = server_config.server_name or server_config.package_name
+                    return self._setup_checkout(server_config, repo_dir, self.stamps, stamp_name, force)
+                else:
+                    raise SetupError(f"Setup script not found: {repo_dir}")
 
         except (SetupError, FileNotFoundError) as e:
-            print(f"Error setting up server {server_config.package_name}: {str(e)}")
+            self._log(f"Error setting up server {server_config.package_name}: {str(e)}")
             raise
 
-    def _setup_all_servers(self) -> None:
-        """Set up all servers that have repo_url and setup_script configured."""
-        print("Starting setup of all MCP servers...")
-        
-        for server_config in self.servers_params.servers_params:
+    def _setup_checkout(self, server_config: MCPServerConfig, repo_dir: Path,
+                        stamps: StampStore, stamp_name: str, force: bool) -> bool:
+        """Run the setup script in a checkout unless its stamp is current."""
+        fingerprint = compute_fingerprint(repo_dir, server_config.setup_script or "")
+        lockfile = None
+        if server_config.setup_mode == SHARED_ENV_MODE:
+            lockfile = find_lockfile(repo_dir)
+            if lockfile is None:
+                raise SetupError(
+                    f"setup_mode '{SHARED_ENV_MODE}' needs a uv.lock, or a requirements file "
+                    f"without local paths, in {repo_dir}"
+                )
+            fingerprint["shared_env"] = env_key(lockfile, self.shared_envs.python)
+        elif server_config.setup_mode is not None:
+            raise SetupError(f"Unknown setup_mode '{server_config.setup_mode}'")
+        if not force and stamps.matches(stamp_name, fingerprint):
+            self._log(f"Setup for {server_config.package_name} is up to date, skipping setup script")
+            self._update_server_path(server_config, repo_dir)
+            return False
+        # Drop the old stamp first so an interrupted run is never considered complete
+        stamps.remove(stamp_name)
+        if lockfile is not None:
+            self._link_shared_env(repo_dir, lockfile)
+        if server_config.setup_script:
+            self._run_setup_script(repo_dir, server_config.setup_script)
+        if self.precompile:
+            self._precompile(repo_dir)
+        stamps.write(stamp_name, fingerprint)
+        # Update server_path after successful setup
+        self._update_server_path(server_config, repo_dir)
+        return True
+
+    def _link_shared_env(self, repo_dir: Path, lockfile: Path) -> None:
+        """Hardlink the prebuilt environment for the checkout's lockfile into its .venv."""
+        def run(command: List[str], cwd: Optional[Path], env: Optional[Mapping[str, str]]) -> None:
+            self._stream(command, cwd=cwd, env=env)
+
+        try:
+            env_dir = self.shared_envs.ensure(lockfile, run)
+            self.shared_envs.link(env_dir, repo_dir / ".venv")
+        except subprocess.CalledProcessError as e:
+            raise SetupError(f"Failed to build shared environment from {lockfile}: {e.stderr}")
+        except OSError as e:
+            raise SetupError(f"Failed to link shared environment into {repo_dir}: {e}")
+        self._log(f"Linked shared environment {env_dir.name[:12]} ({lockfile.name}) into {repo_dir / '.venv'}")
+
+    def _precompile(self, repo_dir: Path) -> None:
+        """Compile the checkout's bytecode so the first spawn does not have to."""
+        python = repo_dir / ".venv" / "bin" / "python"
+        if not python.exists():
+            return
+        start = time.monotonic()
+        if compile_bytecode(str(python), repo_dir):
+            self._log(f"Precompiled bytecode in {repo_dir} in {time.monotonic() - start:.1f}s")
+        else:
+            self._log(f"Some modules in {repo_dir} could not be precompiled; they compile on first import")
+
+    def _resolve_commit(self, server_config: MCPServerConfig) -> str:
+        """Resolve the server's pinned ref, or the default branch, to a commit id."""
+        ref = server_config.repo_ref
+        if ref and is_commit_id(ref):
+            return ref
+        link_path = self._checkout_dir(server_config)
+        try:
+            result = self._run_git(ls_remote_command(server_config.repo_url, ref))
+            commit = parse_ls_remote(result.stdout, ref)
+        except subprocess.CalledProcessError as e:
+            # Offline: keep using the checkout this project already links to
+            if link_path.is_symlink() and link_path.exists():
+                self._log(f"Could not reach {server_config.repo_url}, using cached checkout {link_path.resolve().name}")
+                return link_path.resolve().name
+            raise SetupError(f"Failed to resolve {ref or 'HEAD'} in {server_config.repo_url}: {e.stderr}")
+        if commit is None:
+            raise SetupError(f"Reference {ref} not found in {server_config.repo_url}")
+        return commit
+
+    @contextmanager
+    def _global_checkout(self, server_config: MCPServerConfig) -> Iterator[Tuple[Path, StampStore, str]]:
+        """Link the project cache to the shared checkout of the server's commit.
+
+        The checkout is cloned into the global cache if needed, and stays
+        locked while the caller runs its setup script.
+        """
+        commit = self._resolve_commit(server_config)
+        self.global_cache.prepare(server_config.repo_url)
+        entry = self.global_cache.entry_dir(server_config.repo_url, commit)
+        with self._checkout_lock(entry):
+            if not entry.exists():
+                tmp_dir = entry.with_name(f"{entry.name}.{os.getpid()}.tmp")
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                try:
+                    self._clone_into(server_config.repo_url, tmp_dir)
+                    self._checkout_ref(tmp_dir, commit)
+                    os.replace(tmp_dir, entry)
+                finally:
+                    shutil.rmtree(tmp_dir, ignore_errors=True)
+                self._log(f"Cached {server_config.repo_url} at {commit[:12]} in {entry}")
+            link_path = self._checkout_dir(server_config)
+            self.global_cache.link(entry, link_path)
+            self.global_cache.record_access(entry, self.cache_dir)
+            # Servers with different setup scripts can share an entry, so each script gets its own stamp
+            setup = f"{server_config.setup_mode or ''}\0{server_config.setup_script or ''}"
+            stamp_name = f"{entry.name}-{hashlib.sha256(setup.encode()).hexdigest()[:12]}"
+            yield link_path, StampStore(entry.parent), stamp_name
+
+    def _setup_group(self, server_configs: List[MCPServerConfig], force: bool = False,
+                     futures: Optional[Dict[str, Future]] = None) -> List[SetupResult]:
+        """Set up servers that share a repository directory, one after another.
+
+        Each server's readiness future in ``futures`` is resolved as soon as
+        that server is done, before the rest of the group is set up.
+        """
+        results = []
+        for server_config in server_configs:
+            self._log_context.server_name = server_config.server_name
+            start = time.monotonic()
             try:
-                self.setup_server(server_config)
+                status = "succeeded" if self.setup_server(server_config, force=force) else "cached"
+                result = SetupResult(server_config.server_name, status, time.monotonic() - start)
             except Exception as e:
-                print(f"Failed to set up server {server_config.package_name}: {str(e)}")
+                self._log(f"Failed to set up server {server_config.package_name}: {str(e)}")
                 # Continue with other servers even if one fails
+                result = SetupResult(server_config.server_name, "failed", time.monotonic() - start, str(e))
+            finally:
+                self._log_context.server_name = None
+            self._finish(result, futures)
+            results.append(result)
+        return results
+
+    def _finish(self, result: SetupResult, futures: Optional[Dict[str, Future]]) -> None:
+        self.setup_results[result.server_name] = result
+        if futures is not None and result.server_name in futures:
+            futures[result.server_name].set_result(result)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix="mcphub-setup")
+            return self._executor
+
+    def _schedule_setup(self, server_configs: Sequence[MCPServerConfig], force: bool) -> Dict[str, Future]:
+        futures: Dict[str, Future] = {}
+        groups: Dict[Path, List[MCPServerConfig]] = {}
+        for server_config in server_configs:
+            future: Future = Future()
+            futures[server_config.server_name] = self._ready[server_config.server_name] = future
+            if not server_config.needs_setup():
+                self._finish(SetupResult(server_config.server_name, "skipped"), futures)
                 continue
+            groups.setdefault(self._checkout_dir(server_config), []).append(server_config)
+
+        for group in groups.values():
+            self._get_executor().submit(self._setup_group, group, force, futures)
+        return futures
+
+    def start_setup(self, server_names: Optional[List[str]] = None, force: bool = False) -> Dict[str, Future]:
+        """Schedule setup of the given servers, or all servers, without waiting for it.
+
+        Servers are set up concurrently on up to ``max_workers`` threads.
+        Servers that share a repository directory are set up on the same
+        thread, so they never clone into the same directory at once.
+
+        Args:
+            server_names: Names of the servers to set up
+            force: Re-run setup scripts even when their stamps are current
 
+        Returns:
+            A future per server, resolved with its SetupResult when it is ready
+        """
+        if server_names is None:
+            server_configs = self.servers_params.servers_params
+        else:
+            server_configs = [self.servers_params.retrieve_server_params(name) for name in server_names]
+        return self._schedule_setup(server_configs, force)
+
+    def _background_setup(self) -> bool:
+        if self.background_setup is not None:
+            return self.background_setup
+        # Never block a running event loop with clones and setup scripts
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        return True
+
+    def _setup_all_servers(self) -> None:
+        """Set up all servers that have repo_url and a setup_script or setup_mode configured.
+
+        In background mode this returns immediately; use ``wait_ready`` to
+        wait for an individual server.
+        """
+        if not self._background_setup():
+            self.setup_servers(force=self.force_setup)
+            return
+        print("Starting background setup of all MCP servers...")
+        start = time.monotonic()
+        self.setup_results = {}
+        futures = self.start_setup(force=self.force_setup)
+        threading.Thread(
+            target=self._report_when_done, args=(list(futures.values()), start),
+            name="mcphub-setup-report", daemon=True
+        ).start()
+
+    def _report_when_done(self, futures: List[Future], start: float) -> None:
+        wait(futures)
+        self._print_setup_summary(time.monotonic() - start)
+        print("Completed server setup process")
+
+    def setup_servers(self, server_names: Optional[List[str]] = None, force: bool = False) -> Dict[str, SetupResult]:
+        """Set up the given servers, or all servers when ``server_names`` is None, and wait.
+
+        Args:
+            server_names: Names of the servers to set up
+            force: Re-run setup scripts even when their stamps are current
+
+        Returns:
+            The result for each server, keyed by server name
+        """
+        print("Starting setup of all MCP servers..." if server_names is None else "Starting setup of MCP servers...")
+        start = time.monotonic()
+        self.setup_results = {}
+        futures = self.start_setup(server_names, force)
+        wait(futures.values())
+        self._print_setup_summary(time.monotonic() - start)
         print("Completed server setup process")
+        return {name: future.result() for name, future in futures.items()}
+
+    def update_server(self, server_config: MCPServerConfig) -> UpdateResult:
+        """Fetch a server's checkout and fast-forward it to its branch or pinned ref.
 
-    async def list_tools(self, server_name: str) -> List[Tool]:
-        """List all tools available in the server."""
-        server_params = self.servers_params.retrieve_server_params(server_name)
-        server_params = StdioServerParameters(
-            command=server_params.command,
-            args=server_params.args,
-            env=server_params.env,
-            cwd=server_params.cwd
+        Setup runs again only if the checked-out commit moved, and the
+        server's tool catalog entry is then dropped. Servers that have not
+        been set up yet are skipped.
+        """
+        name = server_config.server_name
+        if not server_config.repo_url:
+            return UpdateResult(name, "skipped", error="No repo_url specified")
+        checkout = self._checkout_dir(server_config)
+        if not checkout.exists():
+            return UpdateResult(name, "skipped", error="Not set up yet; run 'mcphub setup' first")
+
+        if self.global_cache is not None:
+            # Checkouts in the global cache never change; moving means linking another commit
+            old_head = checkout.resolve().name
+            self.setup_server(server_config)
+            new_head = checkout.resolve().name
+        else:
+            stamp_name = name or server_config.package_name
+            with self._checkout_lock(checkout):
+                stamp = self.stamps.read(stamp_name)
+                old_head = (stamp or {}).get("head") or git_head(checkout)
+                if server_config.repo_ref:
+                    self._checkout_ref(checkout, server_config.repo_ref)
+                else:
+                    self._fast_forward(checkout)
+                new_head = git_head(checkout)
+                if new_head != old_head and server_config.needs_setup():
+                    self._setup_checkout(server_config, checkout, self.stamps, stamp_name, False)
+
+        if new_head == old_head:
+            return UpdateResult(name, "unchanged", old_head, new_head)
+        if self.tool_catalog is not None:
+            self.tool_catalog.forget(name)
+        self._log(f"Updated {server_config.package_name} from {(old_head or '?')[:12]} to {(new_head or '?')[:12]}")
+        return UpdateResult(name, "updated", old_head, new_head)
+
+    def _fast_forward(self, repo_dir: Path) -> None:
+        """Fetch the remote's default branch and move the checkout to it."""
+        depth = self.clone_depth if (repo_dir / ".git" / "shallow").exists() else None
+        try:
+            self._run_git(fetch_ref_command(repo_dir, "HEAD", depth))
+            self._run_git(fast_forward_command(repo_dir))
+        except subprocess.CalledProcessError as e:
+            raise SetupError(f"Failed to update {repo_dir}: {e.stderr}")
+
+    def _update_group(self, server_configs: List[MCPServerConfig]) -> List[UpdateResult]:
+        """Update servers that share a repository directory, one after another."""
+        results = []
+        for server_config in server_configs:
+            self._log_context.server_name = server_config.server_name
+            start = time.monotonic()
+            try:
+                result = self.update_server(server_config)
+            except Exception as e:
+                self._log(f"Failed to update server {server_config.package_name}: {str(e)}")
+                result = UpdateResult(server_config.server_name, "failed", error=str(e))
+            finally:
+                self._log_context.server_name = None
+            result.duration = time.monotonic() - start
+            results.append(result)
+        return results
+
+    def update_servers(self, server_names: Optional[List[str]] = None) -> Dict[str, UpdateResult]:
+        """Fetch and fast-forward the given servers' checkouts, or all of them, concurrently.
+
+        Repositories are fetched on up to ``max_workers`` threads. Servers
+        sharing a repository directory are updated on the same thread.
+
+        Args:
+            server_names: Names of the servers to update
+
+        Returns:
+            The result for each server, keyed by server name
+        """
+        if server_names is None:
+            server_configs = self.servers_params.servers_params
+        else:
+            server_configs = [self.servers_params.retrieve_server_params(name) for name in server_names]
+        groups: Dict[Path, List[MCPServerConfig]] = {}
+        for server_config in server_configs:
+            groups.setdefault(self._checkout_dir(server_config), []).append(server_config)
+        futures = [self._get_executor().submit(self._update_group, group) for group in groups.values()]
+        results: Dict[str, UpdateResult] = {}
+        for future in futures:
+            for result in future.result():
+                results[result.server_name] = result
+        return results
+
+    def _print_setup_summary(self, elapsed: float) -> None:
+        counts = {"succeeded": 0, "cached": 0, "failed": 0, "skipped": 0}
+        for result in self.setup_results.values():
+            counts[result.status] = counts.get(result.status, 0) + 1
+        print(
+            f"Setup summary: {counts['succeeded']} succeeded, {counts['cached']} up to date, "
+            f"{counts['failed']} failed, {counts['skipped']} skipped in {elapsed:.1f}s"
         )
+        for result in self.setup_results.values():
+            if result.status == "failed":
+                print(f"  {result.server_name}: {result.error}")
+
+    def ready_future(self, server_name: str) -> Optional[Future]:
+        """Return the future resolved when the server's latest setup finishes, if any was scheduled."""
+        return self._ready.get(server_name)
+
+    async def wait_ready(self, server_name: str) -> Optional[SetupResult]:
+        """Wait for the server's setup without blocking the event loop.
+
+        Returns:
+            The server's SetupResult, or None if no setup was scheduled for it
+        """
+        future = self._ready.get(server_name)
+        if future is None:
+            return None
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the setup worker threads."""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def apply_config_diff(self, diff: ConfigDiff) -> None:
+        """Set up the servers that a configuration reload added or re-pointed.
+
+        Servers that are not part of ``diff.resetup`` are left untouched.
+        """
+        server_configs = []
+        for server_name in diff.resetup:
+            try:
+                server_configs.append(self.servers_params.retrieve_server_params(server_name))
+            except Exception as e:
+                print(f"Failed to set up server {server_name}: {str(e)}")
+        futures = self._schedule_setup(server_configs, force=False)
+        if not self._background_setup():
+            wait(futures.values())
+
+    async def list_tools(self, server_name: str, refresh: bool = False) -> List[Tool]:
+        """List all tools available in the server, once its setup has finished.
+
+        The list is served from the tool catalog while the server's launch
+        command, environment and commit are unchanged, unless ``refresh``.
+        """
+        await self.wait_ready(server_name)
+        # Resolving an npx/uvx command for the first time may install the package
+        server_params = await asyncio.to_thread(self.servers_params.convert_to_stdio_params, server_name)
+        fingerprint = None
+        if self.tool_catalog is not None:
+            fingerprint = await asyncio.to_thread(catalog_fingerprint, server_params)
+            if not refresh:
+                cached = self.tool_catalog.get(server_name, fingerprint)
+                if cached is not None:
+                    return cached
         async with stdio_client(server_params) as (read, write):
             async with ClientSession(read, write) as session:
                 await session.initialize()
                 tools = await session.list_tools()
-                return tools.tools
-    
+        if fingerprint is not None:
+            self.tool_catalog.put(server_name, fingerprint, tools.tools)
+        return tools.tools
@@ -0,0 +1,89 @@
+"""Line-by-line streaming of child process output."""
+import os
+import subprocess
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Deque, List, Mapping, Optional, Union
+
+# Lines kept in memory for error messages; the full output goes to the log file
+DEFAULT_TAIL_LINES = 50
+
+LineCallback = Callable[[str], None]
+
+
+class OutputTail:
+    """The last ``max_lines`` lines of a command's output."""
+
+    def __init__(self, max_lines: int = DEFAULT_TAIL_LINES):
+        self.lines: Deque[str] = deque(maxlen=max_lines)
+        self.total_lines = 0
+
+    def append(self, line: str) -> None:
+        self.lines.append(line)
+        self.total_lines += 1
+
+    def __str__(self) -> str:
+        omitted = self.total_lines - len(self.lines)
+        header = [f"... {omitted} earlier lines omitted"] if omitted > 0 else []
+        return "\n".join(header + list(self.lines))
+
+
+def run_streaming(
+    command: List[str],
+    cwd: Optional[Union[str, Path]] = None,
+    on_line: Optional[LineCallback] = None,
+    log_path: Optional[Path] = None,
+    tail_lines: int = DEFAULT_TAIL_LINES,
+    env: Optional[Mapping[str, str]] = None,
+) -> OutputTail:
+    """Run ``command``, handing each output line to ``on_line`` as soon as it is written.
+
+    stdout and stderr are merged so lines keep their order. The full output
+    is appended to ``log_path``; only the last ``tail_lines`` lines are kept
+    in memory. ``env`` adds to, rather than replaces, the process environment.
+
+    Returns:
+        The tail of the output
+
+    Raises:
+        subprocess.CalledProcessError: If the command exits with a non-zero
+            status; ``stderr`` and ``output`` hold the tail of the output
+    """
+    tail = OutputTail(tail_lines)
+    log_file = None
+    if log_path is not None:
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        log_file = open(log_path, "a", buffering=1)
+        log_file.write(f"=== {time.strftime('%Y-%m-%d %H:%M:%S')} {' '.join(command)}\n")
+    try:
+        process = subprocess.Popen(
+            command,
+            cwd=cwd,
+            env={**os.environ, **env} if env else None,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors="replace",
+        )
+        try:
+            for raw_line in process.stdout:
+                line = raw_line.rstrip("\r\n")
+                tail.append(line)
+                if log_file is not None:
+                    log_file.write(line + "\n")
+                if on_line is not None:
+                    on_line(line)
+        except BaseException:
+            process.kill()
+            raise
+        finally:
+            process.stdout.close()
+            returncode = process.wait()
+    finally:
+        if log_file is not None:
+            log_file.close()
+
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, command, output=str(tail), stderr=str(tail))
+    return tail
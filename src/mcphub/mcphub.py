@@ -1,26 +1,39 @@
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, List, Optional
+from typing import Any, Callable, List, Optional, Tuple
 
 from mcp import Tool
 
 from .adapters.autogen import MCPAutogenAdapter
 from .adapters.langchain import MCPLangChainAdapter
 from .adapters.openai import MCPOpenAIAgentsAdapter
-from .mcp_servers import MCPServers, MCPServersParams, MCPServerConfig
+from .mcp_servers import MCPServers, MCPServersParams, MCPServerConfig, SetupResult
+from .mcp_servers.config import ConfigDiff, ConfigWatcher
 
 
 @dataclass
 class MCPHub:
+    # Maximum number of servers set up concurrently (None uses MCPServers' default)
+    setup_workers: Optional[int] = None
+    # Re-run setup scripts even when their fingerprint stamps are current
+    force_setup: bool = False
+    # Set up servers in the background (None: only when constructed inside a running event loop)
+    background_setup: Optional[bool] = None
+    # Called with (server_name, line) for each line of clone and setup output
+    on_setup_output: Optional[Callable[[Optional[str], str], None]] = None
     servers_params: MCPServersParams = field(init=False)
     _openai_adapter: Optional[MCPOpenAIAgentsAdapter] = field(init=False, default=None)
     _langchain_adapter: Optional[MCPLangChainAdapter] = field(init=False, default=None)
     _autogen_adapter: Optional[MCPAutogenAdapter] = field(init=False, default=None)
+    _config_watcher: Optional[ConfigWatcher] = field(init=False, default=None)
     
     def __post_init__(self):
         config_path = self._find_config_path()
         self.servers_params = MCPServersParams(config_path)
-        self.servers = MCPServers(self.servers_params)
+        self.servers = MCPServers(self.servers_params, max_workers=self.setup_workers,
+                                  force_setup=self.force_setup,
+                                  background_setup=self.background_setup,
+                                  on_output=self.on_setup_output)
 
     def _find_config_path(self) -> Optional[str]:
         current_dir = Path.cwd()
@@ -49,18 +62,70 @@ class MCPHub:
         return self._autogen_adapter
 
     def fetch_openai_mcp_server(self, mcp_name: str, cache_tools_list: bool = True) -> Any:
+        """Create the OpenAI Agents server once the server's setup has finished.
+
+        This blocks until setup is done; inside an event loop, ``await
+        hub.wait_ready(mcp_name)`` first so the loop is not blocked.
+        """
+        future = self.servers.ready_future(mcp_name)
+        if future is not None:
+            future.result()
         return self.openai_adapter.create_server(mcp_name, cache_tools_list=cache_tools_list)
     
     async def fetch_langchain_mcp_tools(self, mcp_name: str) -> List[Any]:
+        await self.servers.wait_ready(mcp_name)
         return await self.langchain_adapter.create_tools(mcp_name)
     
     async def fetch_autogen_mcp_adapters(self, mcp_name: str) -> List[Any]:
+        await self.servers.wait_ready(mcp_name)
         return await self.autogen_adapter.create_adapters(mcp_name)
+
+    async def wait_ready(self, server_name: str) -> Optional[SetupResult]:
+        """Wait until the server's setup has finished, without blocking the event loop."""
+        return await self.servers.wait_ready(server_name)
     
     async def list_tools(self, server_name: str) -> List[Tool]:
         return await self.servers.list_tools(server_name)
     
-    def list_servers(self) -> List[MCPServerConfig]:
+    def list_servers(self) -> Tuple[MCPServerConfig, ...]:
         return self.servers_params.list_servers()
 
-    
\ No newline at end of file
+    def reload_config(self) -> ConfigDiff:
+        """Re-read .mcphub.json and set up only the servers whose entries changed."""
+        diff = self.servers_params.reload()
+        if diff:
+            self.servers.apply_config_diff(diff)
+        return diff
+
+    def watch_config(
+        self,
+        on_change: Optional[Callable[[ConfigDiff], None]] = None,
+        poll_interval: float = 1.0,
+    ) -> ConfigWatcher:
+        """Reload the configuration automatically whenever .mcphub.json changes.
+
+        Args:
+            on_change: Called with the ConfigDiff after each reload, e.g. to
+                restart sessions for the servers listed in ``diff.changed``
+            poll_interval: Polling interval when inotify is not available
+
+        Returns:
+            The running ConfigWatcher; call ``stop_watching`` to stop it
+        """
+        if self._config_watcher is not None:
+            return self._config_watcher
+
+        def reload() -> None:
+            diff = self.reload_config()
+            if diff and on_change is not None:
+                on_change(diff)
+
+        self._config_watcher = ConfigWatcher(
+            self.servers_params.config_path, reload, poll_interval=poll_interval
+        ).start()
+        return self._config_watcher
+
+    def stop_watching(self) -> None:
+        if self._config_watcher is not None:
+            self._config_watcher.stop()
+            self._config_watcher = None
@@ -0,0 +1,229 @@
+import io
+import json
+import os
+import shutil
+import subprocess
+import tarfile
+
+import pytest
+
+from mcphub.mcp_servers.bundle import MANIFEST_NAME, export_bundle, import_bundle
+from mcphub.mcp_servers.cache import RepositoryCache
+from mcphub.mcp_servers.exceptions import BundleError
+
+
+@pytest.fixture
+def project_cache(tmp_path):
+    cache_dir = tmp_path / "project" / ".mcphub_cache"
+    repo = cache_dir / "server"
+    (repo / ".venv" / "bin").mkdir(parents=True)
+    (repo / "main.py").write_text("print('hi')\n")
+    (repo / ".venv" / "bin" / "python").symlink_to("/usr/bin/python3")
+    (cache_dir / ".stamps").mkdir()
+    (cache_dir / ".stamps" / "server.json").write_text('{"head": "abc"}')
+    (cache_dir / "tools").mkdir()
+    (cache_dir / "tools" / "server.json").write_text('{"tools": []}')
+    (cache_dir / "logs").mkdir()
+    (cache_dir / "logs" / "server.log").write_text("noise\n")
+    (cache_dir / "server.lock").write_text("")
+    return cache_dir
+
+
+def _rebuild(archive, output, transform):
+    """Copy a bundle, letting ``transform`` rewrite (name, data) of each member."""
+    with tarfile.open(archive, "r:*") as source, tarfile.open(output, "w:gz") as target:
+        for member in source:
+            data = source.extractfile(member).read() if member.isfile() else None
+            member, data = transform(member, data)
+            if data is not None:
+                member.size = len(data)
+                target.addfile(member, io.BytesIO(data))
+            else:
+                target.addfile(member)
+
+
+def test_round_trip_restores_cache(tmp_path, project_cache):
+    archive = tmp_path / "bundle.tar.gz"
+    summary = export_bundle(project_cache, archive)
+    assert summary.files == 3
+
+    with tarfile.open(archive) as tar:
+        names = tar.getnames()
+    assert "cache/logs/server.log" not in names
+    assert "cache/server.lock" not in names
+
+    target = tmp_path / "node" / ".mcphub_cache"
+    summary = import_bundle(archive, target)
+    assert (target / "server" / "main.py").read_text() == "print('hi')\n"
+    assert os.readlink(target / "server" / ".venv" / "bin" / "python") == "/usr/bin/python3"
+    assert json.loads((target / ".stamps" / "server.json").read_text()) == {"head": "abc"}
+    assert (target / "tools" / "server.json").exists()
+    # Restored somewhere else than it was exported from
+    assert summary.warnings
+
+
+def test_corrupted_file_is_rejected_before_install(tmp_path, project_cache):
+    archive = tmp_path / "bundle.tar.gz"
+    export_bundle(project_cache, archive)
+    tampered = tmp_path / "tampered.tar.gz"
+
+    def corrupt(member, data):
+        if member.name == "cache/server/main.py":
+            data = b"print('evil')\n"
+        return member, data
+
+    _rebuild(archive, tampered, corrupt)
+    target = tmp_path / "node" / ".mcphub_cache"
+    target.mkdir(parents=True)
+    (target / "existing").write_text("keep")
+
+    with pytest.raises(BundleError, match="Checksum mismatch"):
+        import_bundle(tampered, target)
+    assert sorted(p.name for p in target.iterdir()) == ["existing"]
+    assert not any("import-" in p.name for p in target.parent.iterdir())
+
+
+def test_unlisted_and_unsafe_members_are_rejected(tmp_path, project_cache):
+    archive = tmp_path / "bundle.tar.gz"
+    export_bundle(project_cache, archive)
+
+    def escape(member, data):
+        if member.name == MANIFEST_NAME:
+            manifest = json.loads(data)
+            manifest["entries"]["../escape"] = manifest["entries"].pop("cache/server/main.py")
+            data = json.dumps(manifest).encode()
+        elif member.name == "cache/server/main.py":
+            member.name = "../escape"
+        return member, data
+
+    unsafe = tmp_path / "unsafe.tar.gz"
+    _rebuild(archive, unsafe, escape)
+    with pytest.raises(BundleError, match="unsafe path"):
+        import_bundle(unsafe, tmp_path / "node" / ".mcphub_cache")
+    assert not (tmp_path / "node" / "escape").exists()
+
+    def extra(member, data):
+        if member.name == "cache/server/main.py":
+            member.name = "cache/server/other.py"
+        return member, data
+
+    unlisted = tmp_path / "unlisted.tar.gz"
+    _rebuild(archive, unlisted, extra)
+    with pytest.raises(BundleError, match="not listed"):
+        import_bundle(unlisted, tmp_path / "node" / ".mcphub_cache")
+
+
+def test_global_cache_links_are_restored(tmp_path):
+    source_cache = RepositoryCache(tmp_path / "global-a")
+    repo_url = "https://github.com/owner/server"
+    source_cache.prepare(repo_url)
+    entry = source_cache.entry_dir(repo_url, "a" * 40)
+    entry.mkdir()
+    (entry / "main.py").write_text("x")
+    (entry.parent / ".stamps").mkdir()
+    (entry.parent / ".stamps" / f"{entry.name}.json").write_text("{}")
+    cache_dir = tmp_path / "project" / ".mcphub_cache"
+    cache_dir.mkdir(parents=True)
+    source_cache.link(entry, cache_dir / "owner--server")
+
+    archive = tmp_path / "bundle.tar.gz"
+    assert export_bundle(cache_dir, archive, source_cache).links == ["owner--server"]
+
+    target_cache = RepositoryCache(tmp_path / "global-b")
+    target = tmp_path / "node" / ".mcphub_cache"
+    import_bundle(archive, target, target_cache)
+
+    restored = target_cache.entry_dir(repo_url, "a" * 40)
+    assert (target / "owner--server").resolve() == restored.resolve()
+    assert (restored / "main.py").read_text() == "x"
+    assert (restored.parent / ".stamps" / f"{entry.name}.json").exists()
+    assert [e.repo_url for e in target_cache.entries()] == [repo_url]
+
+
+@pytest.mark.parametrize("name, relative", [
+    ("../../victim", "server-0123/" + "a" * 40),
+    ("/tmp/victim", "server-0123/" + "a" * 40),
+    ("nested/link", "server-0123/" + "a" * 40),
+    ("owner--server", "../../victim"),
+])
+def test_unsafe_links_are_rejected_before_install(tmp_path, name, relative):
+    source_cache = RepositoryCache(tmp_path / "global-a")
+    entry = source_cache.prepare("https://github.com/owner/server") / ("a" * 40)
+    entry.mkdir()
+    (entry / "main.py").write_text("x")
+    cache_dir = tmp_path / "project" / ".mcphub_cache"
+    cache_dir.mkdir(parents=True)
+    source_cache.link(entry, cache_dir / "owner--server")
+    archive = tmp_path / "bundle.tar.gz"
+    export_bundle(cache_dir, archive, source_cache)
+
+    def relink(member, data):
+        if member.name == MANIFEST_NAME:
+            manifest = json.loads(data)
+            manifest["links"] = {name: relative}
+            data = json.dumps(manifest).encode()
+        return member, data
+
+    crafted = tmp_path / "crafted.tar.gz"
+    _rebuild(archive, crafted, relink)
+    victim = tmp_path / "victim"
+    victim.mkdir()
+    (victim / "data").write_text("keep")
+    target_cache = RepositoryCache(tmp_path / "global-b")
+    target = tmp_path / "node" / ".mcphub_cache"
+
+    with pytest.raises(BundleError):
+        import_bundle(crafted, target, target_cache)
+    assert (victim / "data").read_text() == "keep"
+    assert not target_cache.repos_dir.exists()
+    assert list(target.iterdir()) == []
+
+
+def test_links_without_global_entries_are_rejected(tmp_path, project_cache):
+    archive = tmp_path / "bundle.tar.gz"
+    export_bundle(project_cache, archive)
+
+    def add_link(member, data):
+        if member.name == MANIFEST_NAME:
+            manifest = json.loads(data)
+            manifest["links"] = {"owner--server": "server-0123/" + "a" * 40}
+            data = json.dumps(manifest).encode()
+        return member, data
+
+    crafted = tmp_path / "crafted.tar.gz"
+    _rebuild(archive, crafted, add_link)
+    with pytest.raises(BundleError, match="no repository cache entries"):
+        import_bundle(crafted, tmp_path / "node" / ".mcphub_cache", RepositoryCache(tmp_path / "global"))
+
+
+def test_export_leaves_borrowing_clone_untouched(tmp_path):
+    def git(*args, cwd):
+        subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+    mirror = tmp_path / "origin"
+    mirror.mkdir()
+    git("init", "-q", cwd=mirror)
+    (mirror / "main.py").write_text("x")
+    git("add", "main.py", cwd=mirror)
+    git("-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "-m", "init", cwd=mirror)
+    cache_dir = tmp_path / "project" / ".mcphub_cache"
+    cache_dir.mkdir(parents=True)
+    git("clone", "-q", "--shared", str(mirror), "server", cwd=cache_dir)
+    alternates = cache_dir / "server" / ".git" / "objects" / "info" / "alternates"
+    assert alternates.exists()
+
+    archive = tmp_path / "bundle.tar.gz"
+    summary = export_bundle(cache_dir, archive)
+    assert alternates.exists()
+    assert summary.warnings
+    assert not any(p.name.endswith(".staging") for p in tmp_path.iterdir())
+
+    with tarfile.open(archive) as tar:
+        names = tar.getnames()
+    assert "cache/server/.git/objects/info/alternates" not in names
+
+    target = tmp_path / "node" / ".mcphub_cache"
+    import_bundle(archive, target)
+    # The restored clone no longer needs the mirror
+    shutil.rmtree(mirror)
+    git("fsck", "--no-progress", cwd=target / "server")
@@ -0,0 +1,121 @@
+import os
+import threading
+
+import pytest
+
+from mcphub.mcp_servers.cache import RepositoryCache, parse_size
+from mcphub.mcp_servers.locks import path_lock
+from mcphub.mcp_servers.repository import parse_ls_remote
+
+
+def _add_entry(cache, repo_url, commit, size):
+    cache.prepare(repo_url)
+    entry = cache.entry_dir(repo_url, commit)
+    entry.mkdir()
+    (entry / "data").write_bytes(b"x" * size)
+    return entry
+
+
+def test_parse_size():
+    assert parse_size("1024") == 1024
+    assert parse_size("2K") == 2048
+    assert parse_size("1.5G") == int(1.5 * 1024 ** 3)
+    assert parse_size("500 MiB") == 500 * 1024 ** 2
+    with pytest.raises(ValueError):
+        parse_size("lots")
+
+
+def test_entries_are_keyed_by_url_and_commit(tmp_path):
+    cache = RepositoryCache(tmp_path)
+
+    first = cache.entry_dir("https://github.com/a/server", "c" * 40)
+    second = cache.entry_dir("https://github.com/b/server", "c" * 40)
+
+    assert first != second
+    assert first.name == second.name == "c" * 40
+
+
+def test_gc_removes_least_recently_used(tmp_path):
+    cache = RepositoryCache(tmp_path)
+    old = _add_entry(cache, "https://github.com/a/old", "a" * 40, 1000)
+    recent = _add_entry(cache, "https://github.com/a/recent", "b" * 40, 1000)
+    unused = _add_entry(cache, "https://github.com/a/unused", "c" * 40, 1000)
+    os.utime(unused, (0, 0))
+    cache.record_access(old)
+    cache.record_access(recent)
+
+    assert [e.path for e in cache.gc(2000, dry_run=True)] == [unused]
+    assert unused.exists()
+
+    assert [e.path for e in cache.gc(1500)] == [unused, old]
+    assert not unused.exists() and not old.exists()
+    assert recent.exists()
+    # The access log only keeps entries that still exist
+    assert [line.split("\t")[1] for line in cache.access_log.read_text().splitlines()] == [
+        recent.relative_to(cache.repos_dir).as_posix()
+    ]
+
+
+def test_gc_keeps_linked_entries(tmp_path):
+    cache = RepositoryCache(tmp_path / "cache")
+    linked = _add_entry(cache, "https://github.com/a/linked", "a" * 40, 1000)
+    stale = _add_entry(cache, "https://github.com/a/stale", "b" * 40, 1000)
+    project = tmp_path / "project" / ".mcphub_cache"
+    project.mkdir(parents=True)
+    cache.link(linked, project / "a--linked")
+    cache.link(stale, project / "a--stale")
+    cache.record_access(linked, project)
+    cache.record_access(stale, project)
+    # The project moved on to another checkout
+    (project / "a--stale").unlink()
+
+    assert [e.path for e in cache.gc(0)] == [stale]
+    assert linked.exists() and (project / "a--linked").resolve() == linked.resolve()
+    # Compaction keeps the project, so the link still protects the entry
+    assert cache.gc(0) == []
+
+    assert [e.path for e in cache.gc(0, force=True)] == [linked]
+
+
+def test_record_access_waits_for_compaction(tmp_path):
+    cache = RepositoryCache(tmp_path)
+    entry = _add_entry(cache, "https://github.com/a/server", "a" * 40, 1)
+    recorded = threading.Event()
+
+    def record():
+        cache.record_access(entry)
+        recorded.set()
+
+    with path_lock(cache.access_log):
+        thread = threading.Thread(target=record)
+        thread.start()
+        assert not recorded.wait(0.2)
+    thread.join(5)
+    assert recorded.is_set()
+    assert len(cache.access_log.read_text().splitlines()) == 1
+
+
+def test_link_replaces_older_link(tmp_path):
+    cache = RepositoryCache(tmp_path / "cache")
+    first = _add_entry(cache, "https://github.com/a/server", "a" * 40, 1)
+    second = _add_entry(cache, "https://github.com/a/server", "b" * 40, 1)
+    link = tmp_path / "project" / "server"
+    link.parent.mkdir()
+
+    cache.link(first, link)
+    cache.link(second, link)
+
+    assert link.resolve() == second.resolve()
+
+
+def test_parse_ls_remote():
+    output = "\n".join([
+        "1" * 40 + "\tHEAD",
+        "2" * 40 + "\trefs/heads/main",
+        "3" * 40 + "\trefs/tags/v1",
+        "4" * 40 + "\trefs/tags/v1^{}",
+    ])
+    assert parse_ls_remote(output, None) == "1" * 40
+    assert parse_ls_remote(output, "main") == "2" * 40
+    assert parse_ls_remote(output, "v1") == "4" * 40
+    assert parse_ls_remote(output, "missing") is None
@@ -0,0 +1,54 @@
+import asyncio
+import json
+from unittest import mock
+
+from mcp import StdioServerParameters, Tool
+
+from mcphub.mcp_servers.catalog import ToolCatalog, catalog_fingerprint
+from mcphub.mcp_servers.params import MCPServersParams
+from mcphub.mcp_servers.servers import MCPServers
+
+
+def _tool(name):
+    return Tool(name=name, description=f"{name} tool", inputSchema={"type": "object", "properties": {}})
+
+
+def test_catalog_entries_are_tied_to_fingerprint(tmp_path):
+    catalog = ToolCatalog(tmp_path)
+    params = StdioServerParameters(command="node", args=["server.js"], env={"API_KEY": "secret"})
+    fingerprint = catalog_fingerprint(params)
+
+    catalog.put("srv", fingerprint, [_tool("search")])
+
+    assert [tool.name for tool in catalog.get("srv", fingerprint)] == ["search"]
+    changed = StdioServerParameters(command="node", args=["server.js"], env={"API_KEY": "other"})
+    assert catalog.get("srv", catalog_fingerprint(changed)) is None
+    assert "secret" not in (tmp_path / "tools" / "srv.json").read_text()
+    assert catalog.server_names() == ["srv"]
+
+    catalog.forget("srv")
+    assert catalog.get("srv", fingerprint) is None
+
+
+def test_list_tools_is_served_from_catalog(tmp_path, mock_current_dir):
+    config_file = tmp_path / ".mcphub.json"
+    config_file.write_text(json.dumps({"mcpServers": {"srv": {
+        "package_name": "srv", "command": "python", "args": ["-m", "srv"], "env": {}
+    }}}))
+    params = MCPServersParams(str(config_file))
+    servers = MCPServers(params, auto_setup=False)
+    session = mock.AsyncMock()
+    session.list_tools.return_value = mock.Mock(tools=[_tool("search")])
+
+    with mock.patch("mcphub.mcp_servers.servers.stdio_client") as mock_client, \
+         mock.patch("mcphub.mcp_servers.servers.ClientSession") as mock_session:
+        mock_client.return_value.__aenter__.return_value = (mock.Mock(), mock.Mock())
+        mock_session.return_value.__aenter__.return_value = session
+
+        first = asyncio.run(servers.list_tools("srv"))
+        second = asyncio.run(servers.list_tools("srv"))
+        assert [tool.name for tool in first] == [tool.name for tool in second] == ["search"]
+        assert mock_client.call_count == 1
+
+        asyncio.run(servers.list_tools("srv", refresh=True))
+        assert mock_client.call_count == 2
@@ -122,6 +122,44 @@ class TestCliAdd:
         assert "Only GitHub repositories are supported" in out
 
 
+    def test_add_from_manifest(self, cli_env, tmp_path, capfd, monkeypatch):
+        """Test adding every repository listed in a manifest in one batch."""
+        manifest = tmp_path / "servers.txt"
+        manifest.write_text(
+            "# team servers\n"
+            "https://github.com/test/one\n"
+            "https://github.com/test/two custom-two\n"
+            "\n"
+            "https://invalid.com/repo\n"
+        )
+        mock_servers_params = mock.Mock()
+        mock_servers_params.add_servers_from_repos.return_value = {"test/one": None, "custom-two": None}
+        mock_servers_params.retrieve_server_params.return_value = mock.Mock(env=None)
+        monkeypatch.setattr("mcphub.mcp_servers.params.MCPServersParams",
+                            mock.Mock(return_value=mock_servers_params))
+        exit_codes = []
+        monkeypatch.setattr(sys, "exit", exit_codes.append)
+
+        args = commands.parse_args(["add", "--from", str(manifest)])
+        commands.add_command(args)
+
+        repos = mock_servers_params.add_servers_from_repos.call_args[0][0]
+        assert repos == {"test/one": "https://github.com/test/one",
+                         "custom-two": "https://github.com/test/two"}
+        out, _ = capfd.readouterr()
+        # The invalid URL is reported as a failure without being fetched
+        assert "Added 2 of 3 servers; 1 failed" in out
+        assert exit_codes == [1]
+
+    def test_load_json_manifest(self, tmp_path):
+        """Test the JSON manifest forms."""
+        manifest = tmp_path / "servers.json"
+        manifest.write_text(json.dumps(["https://github.com/a/b", {"repo_url": "https://github.com/c/d", "name": "d"}]))
+        assert utils.load_add_manifest(manifest) == [("https://github.com/a/b", None), ("https://github.com/c/d", "d")]
+        manifest.write_text(json.dumps({"x": "https://github.com/e/f"}))
+        assert utils.load_add_manifest(manifest) == [("https://github.com/e/f", "x")]
+
+
 class TestCliRemove:
     def test_remove_existing_server(self, cli_env, capfd):
         """Test removing a server that exists in the config."""
@@ -191,14 +229,34 @@ class TestCliStatus:
         args = mock.Mock()
         args.mcp_name = "test-server"
         
-        # Execute status command
-        commands.status_command(args)
+        # Execute status command without a daemon
+        with mock.patch.object(commands.DaemonClient, "connect", return_value=None):
+            commands.status_command(args)
         
         # Verify output
         out, _ = capfd.readouterr()
         assert "test-server" in out
         assert "test-mcp-server" in out  # Package name from config
         assert "python" in out  # Command from config
+        assert "running" in out and "1234" in out and "8000" in out
+
+    def test_status_command_uses_daemon(self, cli_env, mock_process_manager, capfd):
+        """Test that status asks the daemon when one is running."""
+        args = mock.Mock()
+        args.mcp_name = "test-server"
+        client = mock.Mock()
+        client.call.return_value = [
+            {"name": "test-server", "status": "stopped", "pid": 1, "ports": []},
+            {"name": "test-server", "status": "running", "pid": 4321, "ports": [9000]},
+        ]
+        
+        with mock.patch.object(commands.DaemonClient, "connect", return_value=client):
+            commands.status_command(args)
+        
+        client.call.assert_called_once_with("list")
+        mock_process_manager.return_value.list_processes.assert_not_called()
+        out, _ = capfd.readouterr()
+        assert "running" in out and "4321" in out and "9000" in out
 
 
 class TestCliRun:
@@ -232,17 +290,35 @@ class TestCliRun:
         args = mock.Mock()
         args.mcp_name = "test-server"
         args.detach = True
-        args.sse = False
+        args.sse = True
+        args.port = 3000
+        args.base_url = "http://localhost:3000"
+        args.sse_path = "/sse"
+        args.message_path = "/message"
+        
+        # Execute run command; the daemon starts the server
+        with mock.patch("mcphub.cli.commands.ensure_daemon") as mock_daemon:
+            mock_daemon.return_value.call.return_value = {"pid": 1234, "warnings": []}
+            commands.run_command(args)
+        
+        mock_process_manager.return_value.start_process.assert_not_called()
+        method, = mock_daemon.return_value.call.call_args[0]
+        params = mock_daemon.return_value.call.call_args[1]
+        assert method == "start"
+        assert params["name"] == "test-server"
+        assert isinstance(params["command"], list)
+        assert isinstance(params["env"], dict)
+
+    def test_run_detached_stdio_is_rejected(self, cli_env, mock_process_manager, capfd):
+        """Test that stdio servers cannot be detached."""
+        args = commands.parse_args(["run", "--detach", "test-server"])
         
-        # Execute run command
-        commands.run_command(args)
+        with mock.patch("mcphub.cli.commands.ensure_daemon") as mock_daemon, pytest.raises(SystemExit):
+            commands.run_command(args)
         
-        # Verify process manager was called
-        mock_process_manager.return_value.start_process.assert_called_once()
-        call_args = mock_process_manager.return_value.start_process.call_args[0]
-        assert call_args[0] == "test-server"  # name
-        assert isinstance(call_args[1], list)  # command
-        assert isinstance(call_args[2], dict)  # env
+        mock_daemon.assert_not_called()
+        mock_process_manager.return_value.start_process.assert_not_called()
+        assert "--detach needs --sse" in capfd.readouterr().out
 
 
 class TestCliParsing:
@@ -327,4 +403,25 @@ class TestCliParsing:
         
         args = commands.parse_args(["status", "test-server"])
         commands.status_command(args)
-        mock_status.assert_called_once()
\ No newline at end of file
+        mock_status.assert_called_once()
+
+    def test_update_command(self, cli_env, capfd, monkeypatch):
+        """Test that update reports each server and fails when one fails."""
+        from mcphub.mcp_servers.servers import UpdateResult
+        results = {
+            "srv": UpdateResult("srv", "updated", "a" * 40, "b" * 40),
+            "other": UpdateResult("other", "failed", error="Failed to update"),
+        }
+        monkeypatch.chdir(cli_env["config_path"].parent)
+        monkeypatch.setattr(commands, "get_config_path", lambda: cli_env["config_path"])
+        monkeypatch.setattr(commands.MCPServers, "update_servers", lambda self, names: results)
+
+        args = commands.parse_args(["update", "--workers", "2"])
+        assert args.mcp_names == [] and args.workers == 2
+        with pytest.raises(SystemExit) as exc_info:
+            commands.update_command(args)
+
+        out, _ = capfd.readouterr()
+        assert exc_info.value.code == 1
+        assert "aaaaaaaaaaaa -> bbbbbbbbbbbb" in out
+        assert "1 updated, 0 unchanged, 0 skipped, 1 failed" in out
@@ -0,0 +1,239 @@
+import json
+import multiprocessing
+import os
+import threading
+
+import pytest
+
+from mcphub.mcp_servers.config import ConfigCache, ConfigStore, ConfigWatcher, diff_servers
+from mcphub.mcp_servers.params import MCPServersParams
+
+
+def _write_config(path, servers):
+    path.write_text(json.dumps({"mcpServers": servers}))
+
+
+def _server(command="python", **extra):
+    return {"package_name": "pkg", "command": command, "args": ["-m", "srv"], **extra}
+
+
+class TestConfigCache:
+    def test_unchanged_file_is_parsed_once(self, tmp_path, monkeypatch):
+        config_file = tmp_path / ".mcphub.json"
+        _write_config(config_file, {"a": _server()})
+        # Age the file so it falls outside the racy window
+        os.utime(config_file, ns=(0, 0))
+
+        cache = ConfigCache()
+        first = cache.load(config_file)
+
+        loads = []
+        monkeypatch.setattr(json, "load", lambda f: loads.append(f))
+        second = cache.load(config_file)
+
+        assert second == first
+        assert loads == []
+
+    def test_returns_private_copies(self, tmp_path):
+        config_file = tmp_path / ".mcphub.json"
+        _write_config(config_file, {"a": _server()})
+        os.utime(config_file, ns=(0, 0))
+
+        cache = ConfigCache()
+        cache.load(config_file)["mcpServers"]["a"]["args"].append("--mutated")
+
+        assert cache.load(config_file)["mcpServers"]["a"]["args"] == ["-m", "srv"]
+
+    def test_replaced_file_is_reloaded(self, tmp_path):
+        config_file = tmp_path / ".mcphub.json"
+        _write_config(config_file, {"a": _server()})
+        os.utime(config_file, ns=(0, 0))
+
+        cache = ConfigCache()
+        cache.load(config_file)
+
+        replacement = tmp_path / "new.json"
+        _write_config(replacement, {"b": _server()})
+        os.utime(replacement, ns=(0, 0))
+        os.replace(replacement, config_file)
+
+        assert list(cache.load(config_file)["mcpServers"]) == ["b"]
+
+    def test_missing_and_invalid_files(self, tmp_path):
+        cache = ConfigCache()
+        with pytest.raises(FileNotFoundError):
+            cache.load(tmp_path / "missing.json")
+
+        invalid = tmp_path / ".mcphub.json"
+        invalid.write_text("{ invalid")
+        with pytest.raises(ValueError):
+            cache.load(invalid)
+
+
+def _add_servers(path, worker, count):
+    store = ConfigStore(path)
+    for i in range(count):
+        store.patch_server(f"server-{worker}-{i}", _server())
+
+
+class TestConfigStore:
+    def test_patch_preserves_unknown_fields(self, tmp_path):
+        config_file = tmp_path / ".mcphub.json"
+        config_file.write_text(json.dumps({
+            "custom": {"keep": True},
+            "mcpServers": {"a": _server(description="desc", tags=["x"], cwd="/srv", last_run="t")},
+        }))
+
+        assert ConfigStore(config_file).patch_server("a", {"command": "node", "description": None})
+
+        config = json.loads(config_file.read_text())
+        assert config["custom"] == {"keep": True}
+        assert config["mcpServers"]["a"] == {
+            "package_name": "pkg", "command": "node", "args": ["-m", "srv"],
+            "tags": ["x"], "cwd": "/srv", "last_run": "t",
+        }
+
+    def test_unchanged_update_skips_write(self, tmp_path):
+        config_file = tmp_path / ".mcphub.json"
+        _write_config(config_file, {"a": _server()})
+        before = os.stat(config_file)
+
+        assert not ConfigStore(config_file).patch_server("a", {"command": "python"})
+
+        after = os.stat(config_file)
+        assert (after.st_ino, after.st_mtime_ns) == (before.st_ino, before.st_mtime_ns)
+
+    def test_remove_and_create(self, tmp_path):
+        config_file = tmp_path / ".mcphub.json"
+        store = ConfigStore(config_file)
+
+        assert store.patch_server("a", _server())
+        assert store.remove_server("a")
+        assert not store.remove_server("a")
+        assert json.loads(config_file.read_text()) == {"mcpServers": {}}
+        assert [p.name for p in tmp_path.iterdir() if p.suffix == ".tmp"] == []
+
+    def test_concurrent_writers_lose_nothing(self, tmp_path):
+        config_file = tmp_path / ".mcphub.json"
+        _write_config(config_file, {})
+
+        ctx = multiprocessing.get_context("fork")
+        workers = [ctx.Process(target=_add_servers, args=(config_file, w, 10)) for w in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        assert len(json.loads(config_file.read_text())["mcpServers"]) == 40
+
+    def test_add_server_keeps_other_entries(self, tmp_path, monkeypatch):
+        config_file = tmp_path / ".mcphub.json"
+        _write_config(config_file, {"a": _server(description="desc", tags=["x"], cwd="/srv")})
+        params = MCPServersParams(str(config_file))
+        monkeypatch.setattr(params, "_get_github_readme", lambda url: "readme")
+        monkeypatch.setattr(params, "_parse_readme_with_openai",
+                            lambda readme: {"command": "npx", "args": ["-y", "b"], "env": {}})
+
+        params.add_server_from_repo("b", "https://github.com/owner/b")
+
+        servers = json.loads(config_file.read_text())["mcpServers"]
+        assert servers["a"] == _server(description="desc", tags=["x"], cwd="/srv")
+        assert servers["b"]["repo_url"] == "https://github.com/owner/b"
+
+    def test_add_servers_from_repos_writes_once(self, tmp_path, monkeypatch):
+        config_file = tmp_path / ".mcphub.json"
+        _write_config(config_file, {"a": _server()})
+        params = MCPServersParams(str(config_file))
+        monkeypatch.setattr(params, "_get_github_readme", lambda url: url.rsplit("/", 1)[-1])
+
+        async def extract_many(readmes, on_result):
+            results = [ValueError("no command") if r == "bad" else {"command": "npx", "args": [r], "env": None}
+                       for r in readmes]
+            for index, result in enumerate(results):
+                on_result(index, result)
+            return results
+        monkeypatch.setattr(params.extractor, "extract_many", extract_many)
+        writes = []
+        real_patch = ConfigStore.patch_servers
+        monkeypatch.setattr(ConfigStore, "patch_servers",
+                            lambda self, patches: writes.append(set(patches)) or real_patch(self, patches))
+
+        errors = params.add_servers_from_repos({
+            "b": "https://github.com/owner/b",
+            "bad": "https://github.com/owner/bad",
+            "c": "https://github.com/owner/c",
+        })
+
+        assert errors["b"] is None and errors["c"] is None
+        assert "no command" in str(errors["bad"])
+        assert writes == [{"b", "c"}]
+        servers = json.loads(config_file.read_text())["mcpServers"]
+        assert sorted(servers) == ["a", "b", "c"]
+        assert servers["c"]["args"] == ["c"]
+
+
+class TestDiffServers:
+    def test_classifies_changes(self):
+        old = {
+            "same": _server(),
+            "launch": _server(),
+            "setup": _server(repo_url="https://github.com/a/b", setup_script="make"),
+            "meta": _server(description="old"),
+            "gone": _server(),
+        }
+        new = {
+            "same": _server(),
+            "launch": _server(env={"A": "1"}),
+            "setup": _server(repo_url="https://github.com/a/b", setup_script="make install"),
+            "meta": _server(description="new"),
+            "fresh": _server(repo_url="https://github.com/c/d", setup_script="make"),
+        }
+
+        diff = diff_servers(old, new)
+
+        assert diff.added == ["fresh"]
+        assert diff.removed == ["gone"]
+        assert diff.changed == ["launch"]
+        assert diff.resetup == ["setup", "fresh"]
+        assert diff.updated == ["meta"]
+
+    def test_identical_configs(self):
+        assert not diff_servers({"a": _server()}, {"a": _server()})
+
+
+class TestReload:
+    def test_reload_keeps_untouched_servers(self, tmp_path):
+        config_file = tmp_path / ".mcphub.json"
+        _write_config(config_file, {"keep": _server(), "edit": _server()})
+        params = MCPServersParams(str(config_file))
+        kept = params.retrieve_server_params("keep")
+        params.update_server_path("keep", "/prepared/path")
+
+        _write_config(config_file, {"keep": _server(), "edit": _server(command="node")})
+        diff = params.reload()
+
+        assert diff.changed == ["edit"]
+        assert params.retrieve_server_params("keep") is kept
+        assert kept.cwd == "/prepared/path"
+        assert params.retrieve_server_params("edit").command == "node"
+
+    def test_reload_rejects_invalid_entry(self, tmp_path):
+        config_file = tmp_path / ".mcphub.json"
+        _write_config(config_file, {"a": _server()})
+        params = MCPServersParams(str(config_file))
+
+        _write_config(config_file, {"a": _server(), "b": {"command": "x", "args": []}})
+        with pytest.raises(ValueError):
+            params.reload()
+        assert [s.server_name for s in params.list_servers()] == ["a"]
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_watcher_reports_changes(tmp_path, use_inotify):
+    config_file = tmp_path / ".mcphub.json"
+    _write_config(config_file, {"a": _server()})
+    changed = threading.Event()
+
+    with ConfigWatcher(config_file, changed.set, poll_interval=0.05, use_inotify=use_inotify):
+        _write_config(config_file, {"a": _server(), "b": _server()})
+        assert changed.wait(5)
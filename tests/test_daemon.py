@@ -0,0 +1,109 @@
+"""Tests for the mcphub daemon."""
+import os
+import sys
+import threading
+import time
+
+import psutil
+import pytest
+
+from mcphub.cli.daemon import Daemon, DaemonClient, start_daemon
+from mcphub.mcp_servers.exceptions import DaemonError
+
+SERVER = """
+import socket, sys, time
+s = socket.socket()
+s.bind(("127.0.0.1", int(sys.argv[sys.argv.index("--port") + 1])))
+s.listen()
+print("listening", flush=True)
+time.sleep(60)
+"""
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    supervisor = Daemon(tmp_path, interval=0.1)
+    thread = threading.Thread(target=supervisor.serve, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while DaemonClient.connect(tmp_path) is None:
+        assert time.monotonic() < deadline and thread.is_alive()
+        time.sleep(0.01)
+    yield supervisor
+    supervisor.shutdown()
+    thread.join(timeout=10)
+
+
+def test_daemon_owns_servers(daemon, tmp_path):
+    client = DaemonClient.connect(tmp_path)
+    info = client.call("start", name="listener", command=[sys.executable, "-c", SERVER], env={}, readiness="port")
+    pid = info["pid"]
+    assert info["status"] == "running"
+    assert info["ports"] and not info["warnings"]
+    assert "ready_after" in info
+
+    start = time.perf_counter()
+    listed = client.call("list")
+    assert time.perf_counter() - start < 1
+    assert [r["pid"] for r in listed if r["status"] == "running"] == [pid]
+    assert client.call("output", pid=pid) == ["listening"]
+    assert client.call("ping")["servers"] == 1
+    assert [server["pid"] for server in client.call("resources")["servers"]] == [pid]
+
+    # A second daemon for the same directory is refused
+    with pytest.raises(DaemonError):
+        Daemon(tmp_path).serve()
+
+    # Servers that exit on their own are reaped and marked stopped
+    psutil.Process(pid).kill()
+    deadline = time.monotonic() + 10
+    while client.call("get", pid=pid)["status"] != "stopped":
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    assert not psutil.pid_exists(pid) or psutil.Process(pid).status() != psutil.STATUS_ZOMBIE
+
+    with pytest.raises(DaemonError, match="Unknown method"):
+        client.call("restart")
+
+
+def test_concurrent_starts(daemon, tmp_path):
+    client = DaemonClient.connect(tmp_path)
+    pids = []
+
+    def start(i):
+        pids.append(client.call("start", name=f"listener-{i}", command=[sys.executable, "-c", SERVER], env={})["pid"])
+
+    threads = [threading.Thread(target=start, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    daemon.refresh()
+    running = [r["pid"] for r in client.call("list") if r["status"] == "running"]
+    assert sorted(running) == sorted(pids) and len(pids) == 4
+    assert sorted(daemon.manager.started_pids()) == sorted(pids)
+
+
+def test_shutdown_stops_started_servers(daemon, tmp_path):
+    client = DaemonClient.connect(tmp_path)
+    pid = client.call("start", name="listener", command=[sys.executable, "-c", SERVER], env={})["pid"]
+    assert client.call("shutdown")
+
+    deadline = time.monotonic() + 10
+    while daemon.socket_path.exists():
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    assert DaemonClient.connect(tmp_path) is None
+    assert not psutil.pid_exists(pid)
+
+
+def test_start_daemon_detaches(tmp_path):
+    client = start_daemon(tmp_path, timeout=30)
+    status = client.call("ping")
+    daemon_process = psutil.Process(status["pid"])
+    # Runs in its own session, away from the terminal that started it
+    assert os.getsid(daemon_process.pid) != os.getsid(0)
+
+    client.call("shutdown")
+    daemon_process.wait(timeout=10)
@@ -0,0 +1,105 @@
+import json
+import subprocess
+from unittest import mock
+
+import pytest
+
+from mcphub.cli import utils
+from mcphub.mcp_servers.env import EnvResolver, compile_template, parse_dotenv
+from mcphub.mcp_servers.exceptions import EnvVarNotFoundError
+from mcphub.mcp_servers.params import MCPServersParams
+
+
+class TestEnvTemplate:
+    def test_resolves_embedded_references_and_defaults(self):
+        resolver = EnvResolver(environ={"HOST": "db", "EMPTY": ""})
+
+        assert compile_template("postgres://${HOST}:${PORT:-5432}/app").resolve(resolver) == "postgres://db:5432/app"
+        assert compile_template("${EMPTY:-fallback}").resolve(resolver) == "fallback"
+        assert compile_template("${EMPTY-fallback}").resolve(resolver) == ""
+        assert compile_template("plain value").is_literal
+
+    def test_unset_variables(self):
+        resolver = EnvResolver(environ={})
+        template = compile_template("${TOKEN}")
+
+        assert template.resolve(resolver) == "${TOKEN}"
+        assert template.missing(resolver) == ["TOKEN"]
+        with pytest.raises(EnvVarNotFoundError):
+            template.resolve(resolver, strict=True)
+
+    def test_empty_variables_are_missing(self):
+        resolver = EnvResolver(environ={"FOO": ""})
+        template = compile_template("${FOO}")
+
+        assert template.missing(resolver) == ["FOO"]
+        assert compile_template("${FOO-default}").missing(resolver) == []
+        with pytest.raises(EnvVarNotFoundError):
+            template.resolve(resolver, strict=True)
+
+    def test_templates_are_compiled_once(self):
+        assert compile_template("${A}") is compile_template("${A}")
+
+
+class TestEnvResolver:
+    def test_environ_takes_precedence_over_dotenv(self, tmp_path):
+        env_file = tmp_path / ".env"
+        env_file.write_text("A=from-file\nB=from-file\n")
+        resolver = EnvResolver([env_file], environ={"A": "from-env"})
+
+        assert resolver.get("A") == "from-env"
+        assert resolver.get("B") == "from-file"
+        assert resolver.get("C") is None
+
+    def test_dotenv_is_reread_after_change(self, tmp_path):
+        env_file = tmp_path / ".env"
+        env_file.write_text("A=1\n")
+        resolver = EnvResolver([env_file], environ={})
+        assert resolver.get("A") == "1"
+
+        env_file.write_text("A=22\n")
+        assert resolver.get("A") == "22"
+
+    def test_parse_dotenv(self):
+        values = parse_dotenv('# comment\nexport A=1\nB="two words"\nC=3 # trailing\nD=\'x#y\'\ninvalid\n')
+        assert values == {"A": "1", "B": "two words", "C": "3", "D": "x#y"}
+
+
+def test_params_resolve_env_at_spawn_time(tmp_path, monkeypatch):
+    config_file = tmp_path / ".mcphub.json"
+    config_file.write_text(json.dumps({"mcpServers": {"srv": {
+        "package_name": "pkg", "command": "node", "args": [],
+        "env": {"TOKEN": "${MCPHUB_TEST_TOKEN}", "URL": "https://${MCPHUB_TEST_HOST}/api"},
+    }}}))
+    (tmp_path / ".env").write_text("MCPHUB_TEST_HOST=example.com\n")
+    monkeypatch.delenv("MCPHUB_TEST_TOKEN", raising=False)
+    params = MCPServersParams(str(config_file))
+
+    assert params.missing_env_vars("srv") == ["MCPHUB_TEST_TOKEN"]
+
+    monkeypatch.setenv("MCPHUB_TEST_TOKEN", "secret")
+    stdio_params = params.convert_to_stdio_params("srv")
+    assert stdio_params.env == {"TOKEN": "secret", "URL": "https://example.com/api"}
+    assert params.retrieve_server_params("srv").env["TOKEN"] == "${MCPHUB_TEST_TOKEN}"
+
+
+def test_cli_env_checks_do_not_spawn_shells(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "get_config_path", lambda: tmp_path / ".mcphub.json")
+    monkeypatch.setenv("MCPHUB_TEST_VAR", "value")
+
+    with mock.patch.object(subprocess, "run") as mock_run:
+        assert utils.check_env_var("MCPHUB_TEST_VAR") == "value"
+        config = utils.process_env_vars({"env": {"A": "${MCPHUB_TEST_VAR}", "B": "literal"}})
+
+    mock_run.assert_not_called()
+    assert config["env"] == {"A": "value", "B": "literal"}
+    assert utils.detect_env_vars({"env": {"A": "x-${ONE}-${TWO:-2}"}}) == ["ONE", "TWO"]
+
+
+def test_cli_rejects_empty_env_vars(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "get_config_path", lambda: tmp_path / ".mcphub.json")
+    monkeypatch.setenv("FOO", "")
+
+    assert utils.check_env_var("FOO") is None
+    with pytest.raises(SystemExit):
+        utils.process_env_vars({"env": {"A": "${FOO}"}})
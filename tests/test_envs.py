@@ -0,0 +1,110 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from mcphub.mcp_servers.envs import SharedEnvStore, compile_bytecode, env_key, find_lockfile
+from mcphub.mcp_servers.exceptions import SetupError
+from mcphub.mcp_servers.params import MCPServerConfig, MCPServersParams
+from mcphub.mcp_servers.servers import MCPServers
+
+
+def _checkout(path, requirements="# no dependencies\n"):
+    path.mkdir(parents=True)
+    (path / "requirements.txt").write_text(requirements)
+    (path / "server.py").write_text("import json\nprint('ready')\n")
+    return path
+
+
+def _run(calls):
+    def run(command, cwd, env):
+        calls.append(command)
+        subprocess.run(command, cwd=cwd, env={**os.environ, **(env or {})}, check=True, capture_output=True)
+    return run
+
+
+def test_find_lockfile(tmp_path):
+    assert find_lockfile(tmp_path) is None
+    (tmp_path / "requirements.txt").write_text("httpx==0.28.1\n")
+    assert find_lockfile(tmp_path).name == "requirements.txt"
+    (tmp_path / "uv.lock").write_text("version = 1\n")
+    # uv.lock without a pyproject.toml cannot be synced
+    assert find_lockfile(tmp_path) is None
+    (tmp_path / "pyproject.toml").write_text("[project]\nname = 'srv'\n")
+    assert find_lockfile(tmp_path).name == "uv.lock"
+
+    local = tmp_path / "local"
+    local.mkdir()
+    (local / "requirements.txt").write_text("-e .\n")
+    assert find_lockfile(local) is None
+
+
+def test_env_key_follows_lockfile_content(tmp_path):
+    a = _checkout(tmp_path / "a", "httpx==0.28.1\n")
+    b = _checkout(tmp_path / "b", "httpx==0.28.1\n")
+    c = _checkout(tmp_path / "c", "httpx==0.27.0\n")
+    key = env_key(a / "requirements.txt")
+    assert env_key(b / "requirements.txt") == key
+    assert env_key(c / "requirements.txt") != key
+
+
+def test_environment_is_built_once_and_hardlinked(tmp_path):
+    store = SharedEnvStore(tmp_path / "envs")
+    calls = []
+    first = _checkout(tmp_path / "first")
+    second = _checkout(tmp_path / "second")
+
+    env_dir = store.ensure(first / "requirements.txt", _run(calls))
+    assert store.ensure(second / "requirements.txt", _run(calls)) == env_dir
+    assert len(calls) == 2  # venv + pip install, for the first checkout only
+
+    for checkout in (first, second):
+        store.link(env_dir, checkout / ".venv")
+    shared_file = next(env_dir.glob("lib/python*/site-packages/pip/__init__.py"))
+    linked_file = second / ".venv" / shared_file.relative_to(env_dir)
+    assert os.path.samefile(shared_file, linked_file)
+    assert next(env_dir.glob("lib/python*/site-packages/pip/__pycache__/__init__.*.pyc"))
+
+    # Scripts are relocated to the checkout, the shared copy keeps its own path
+    linked_pip = (second / ".venv" / "bin" / "pip").read_text()
+    assert str(second / ".venv") in linked_pip and str(env_dir) not in linked_pip
+    assert str(env_dir) in (env_dir / "bin" / "pip").read_text()
+    prefix = subprocess.run([str(second / ".venv" / "bin" / "python"), "-c", "import sys; print(sys.prefix)"],
+                            capture_output=True, text=True, check=True).stdout.strip()
+    assert Path(prefix) == second / ".venv"
+
+
+def test_compile_bytecode(tmp_path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "mod.py").write_text("VALUE = 1\n")
+    (tmp_path / "pkg" / "broken.py").write_text("def broken(:\n")
+
+    assert compile_bytecode(sys.executable, tmp_path) is False
+    assert list((tmp_path / "pkg" / "__pycache__").glob("mod.*.pyc"))
+
+
+def test_shared_env_setup_mode(tmp_path, mock_current_dir):
+    config_file = tmp_path / ".mcphub.json"
+    config_file.write_text(json.dumps({"mcpServers": {}}))
+    store = SharedEnvStore(tmp_path / "envs")
+    servers = MCPServers(MCPServersParams(str(config_file)), auto_setup=False, shared_envs=store)
+    repo_dir = _checkout(tmp_path / "repo")
+    server_config = MCPServerConfig(package_name="srv", command="python", args=["server.py"], env={},
+                                    server_name="srv", repo_url="https://github.com/org/srv",
+                                    setup_mode="shared-env")
+    servers.servers_params._servers_params["srv"] = server_config
+
+    with mock.patch.object(MCPServers, "_run_setup_script") as mock_run_setup:
+        assert servers._setup_checkout(server_config, repo_dir, servers.stamps, "srv", False) is True
+    mock_run_setup.assert_not_called()
+    assert (repo_dir / ".venv" / "bin" / "python").exists()
+    assert list((repo_dir / "__pycache__").glob("server.*.pyc"))
+    assert servers.stamps.read("srv")["shared_env"] == env_key(repo_dir / "requirements.txt")
+
+    server_config.setup_mode = "unknown"
+    with pytest.raises(SetupError, match="Unknown setup_mode"):
+        servers._setup_checkout(server_config, repo_dir, servers.stamps, "srv", False)
@@ -0,0 +1,130 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from mcphub.mcp_servers.extraction import ConfigExtractor, ExtractionCache
+
+
+class _ResponsesHandler(BaseHTTPRequestHandler):
+    """Minimal stand-in for the Responses API that echoes the README as a command."""
+    requests = []
+    barrier = None
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.requests.append(body)
+        if self.barrier is not None:
+            self.barrier.wait()
+        prompt = body["input"][-1]["content"]
+        if "FAIL" in prompt:
+            self._send(400, {"error": {"message": "boom", "type": "invalid_request_error"}})
+            return
+        readme = prompt.split("README content:")[1].split("Return only")[0].strip()
+        config = {"command": "npx", "args": [readme], "env": {}, "setup_script": None}
+        self._send(200, {
+            "id": "resp_1",
+            "object": "response",
+            "created_at": 0,
+            "model": body["model"],
+            "status": "completed",
+            "parallel_tool_calls": False,
+            "tool_choice": "auto",
+            "tools": [],
+            "output": [{
+                "type": "message",
+                "id": "msg_1",
+                "role": "assistant",
+                "status": "completed",
+                "content": [{"type": "output_text", "text": json.dumps(config), "annotations": []}],
+            }],
+        })
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def api_base():
+    _ResponsesHandler.requests = []
+    _ResponsesHandler.barrier = None
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ResponsesHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/v1"
+    server.shutdown()
+    server.server_close()
+
+
+def _extractor(api_base, cache_dir, **kwargs):
+    kwargs.setdefault("api_key", "test-key")
+    return ConfigExtractor(base_url=api_base, cache_dir=cache_dir, **kwargs)
+
+
+def test_extract_is_cached_by_readme(tmp_path, api_base):
+    assert _extractor(api_base, tmp_path).extract("alpha")["args"] == ["alpha"]
+    # A fresh extractor without an API key is served from the disk cache
+    assert _extractor(api_base, tmp_path, api_key=None).extract("alpha")["args"] == ["alpha"]
+    assert len(_ResponsesHandler.requests) == 1
+
+    _extractor(api_base, tmp_path).extract("beta")
+    assert len(_ResponsesHandler.requests) == 2
+
+
+def test_cache_key_includes_model_and_prompt_version(tmp_path, api_base, monkeypatch):
+    _extractor(api_base, tmp_path, model="model-a").extract("alpha")
+    _extractor(api_base, tmp_path, model="model-b").extract("alpha")
+    assert [r["model"] for r in _ResponsesHandler.requests] == ["model-a", "model-b"]
+
+    key = ExtractionCache.key("alpha", "model-a")
+    monkeypatch.setattr("mcphub.mcp_servers.extraction.PROMPT_VERSION", 99)
+    assert ExtractionCache.key("alpha", "model-a") != key
+
+
+def test_extract_many_runs_concurrently_and_dedups(tmp_path, api_base):
+    _ResponsesHandler.barrier = threading.Barrier(3, timeout=5)
+    extractor = _extractor(api_base, tmp_path, max_concurrency=3)
+
+    results = asyncio.run(extractor.extract_many(["a", "b", "c", "a"]))
+
+    assert [r["args"] for r in results] == [["a"], ["b"], ["c"], ["a"]]
+    assert len(_ResponsesHandler.requests) == 3
+
+
+def test_extract_many_reports_errors_per_readme(tmp_path, api_base):
+    extractor = _extractor(api_base, tmp_path, max_concurrency=2)
+    extractor.extract("cached")
+    _ResponsesHandler.requests = []
+
+    results = asyncio.run(extractor.extract_many(["cached", "FAIL"]))
+
+    assert results[0]["args"] == ["cached"]
+    assert isinstance(results[1], RuntimeError)
+    assert len(_ResponsesHandler.requests) == 1
+
+
+def test_missing_api_key_only_matters_on_cache_miss(tmp_path, monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    extractor = ConfigExtractor(cache_dir=tmp_path)
+    with pytest.raises(ValueError, match="OPENAI_API_KEY"):
+        extractor.extract("alpha")
+    with pytest.raises(ValueError, match="OPENAI_API_KEY"):
+        asyncio.run(extractor.extract_many(["alpha"]))
+
+
+def test_base_url_and_model_from_environment(monkeypatch, tmp_path):
+    monkeypatch.setenv("MCPHUB_OPENAI_BASE_URL", "http://127.0.0.1:1/v1")
+    monkeypatch.setenv("MCPHUB_OPENAI_MODEL", "local-model")
+    extractor = ConfigExtractor(cache_dir=tmp_path)
+    assert extractor.base_url == "http://127.0.0.1:1/v1"
+    assert extractor.model == "local-model"
@@ -0,0 +1,153 @@
+import json
+import os
+import stat
+
+import pytest
+
+from mcphub.mcp_servers.launch import LaunchResolver, npm_package_name
+from mcphub.mcp_servers.params import MCPServersParams
+
+
+def _write_executable(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+    path.chmod(path.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return path
+
+
+@pytest.fixture
+def shims(tmp_path):
+    """Fake npx/uvx shims that record every call and point at pre-installed packages."""
+    calls = tmp_path / "calls.log"
+
+    install = tmp_path / "npx-cache" / "node_modules"
+    (install / ".bin").mkdir(parents=True)
+    (install / "@acme" / "server").mkdir(parents=True)
+    (install / "@acme" / "server" / "package.json").write_text(json.dumps({"bin": {"acme-server": "cli.sh"}}))
+    _write_executable(install / "@acme" / "server" / "cli.sh", "#!/bin/sh\necho acme \"$@\"\n")
+    os.symlink("../@acme/server/cli.sh", install / ".bin" / "acme-server")
+
+    venv = tmp_path / "uv-env"
+    _write_executable(venv / "bin" / "py-server", "#!/bin/sh\necho py \"$@\"\n")
+
+    bin_dir = tmp_path / "bin"
+    _write_executable(bin_dir / "npx", f"""#!/bin/sh
+echo "npx $*" >> {calls}
+while [ $# -gt 0 ]; do
+  if [ "$1" = "-c" ]; then PATH="{install / '.bin'}:$PATH" sh -c "$2"; exit $?; fi
+  shift
+done
+exit 1
+""")
+    _write_executable(bin_dir / "uvx", f"""#!/bin/sh
+echo "uvx $*" >> {calls}
+echo "{venv}"
+""")
+    return bin_dir, calls
+
+
+def test_npm_package_name():
+    assert npm_package_name("@acme/server@latest") == "@acme/server"
+    assert npm_package_name("server@1.2.3") == "server"
+    assert npm_package_name("server") == "server"
+
+
+def test_npx_is_resolved_once(tmp_path, shims):
+    bin_dir, calls = shims
+    resolver = LaunchResolver(tmp_path / "launch.json")
+    npx = str(bin_dir / "npx")
+
+    first = resolver.resolve(npx, ["-y", "@acme/server@latest", "--port", "1"])
+    second = LaunchResolver(tmp_path / "launch.json").resolve(npx, ["-y", "@acme/server@latest", "--port", "1"])
+
+    assert first == second
+    assert os.path.basename(first[0]) == "acme-server"
+    assert first[1] == ["--port", "1"]
+    assert len(calls.read_text().splitlines()) == 1
+
+    # refresh always asks the shim again
+    resolver.resolve(npx, ["-y", "@acme/server@latest", "--port", "1"], refresh=True)
+    assert len(calls.read_text().splitlines()) == 2
+
+
+def test_uvx_is_resolved_to_venv_script(tmp_path, shims):
+    bin_dir, calls = shims
+    resolver = LaunchResolver(tmp_path / "launch.json")
+
+    command, args = resolver.resolve(str(bin_dir / "uvx"), ["py-server@1.0", "--stdio"])
+
+    assert command == str(tmp_path / "uv-env" / "bin" / "py-server")
+    assert args == ["--stdio"]
+    assert calls.read_text().split() == [
+        "uvx", "--from", "py-server==1.0", "python", "-c", "import", "sys;", "print(sys.prefix)"
+    ]
+
+
+def test_missing_entrypoint_is_resolved_again(tmp_path, shims):
+    bin_dir, calls = shims
+    resolver = LaunchResolver(tmp_path / "launch.json")
+    uvx = str(bin_dir / "uvx")
+
+    command, _ = resolver.resolve(uvx, ["py-server"])
+    os.rename(command, command + ".moved")
+    assert resolver.resolve(uvx, ["py-server"]) == (uvx, ["py-server"])
+    assert len(calls.read_text().splitlines()) == 2
+
+
+def test_other_commands_are_unchanged(tmp_path):
+    resolver = LaunchResolver(tmp_path / "launch.json")
+
+    assert resolver.resolve("python", ["-m", "server"]) == ("python", ["-m", "server"])
+    assert not (tmp_path / "launch.json").exists()
+
+
+def test_stdio_params_use_resolved_entrypoint(tmp_path, shims, monkeypatch):
+    bin_dir, calls = shims
+    config_file = tmp_path / ".mcphub.json"
+    config_file.write_text(json.dumps({"mcpServers": {"srv": {
+        "package_name": "py-server", "command": str(bin_dir / "uvx"), "args": ["py-server"],
+    }}}))
+
+    # Resolving installs the package, so it is never done implicitly by default
+    monkeypatch.delenv("MCPHUB_RESOLVE_LAUNCH", raising=False)
+    stdio_params = MCPServersParams(str(config_file)).convert_to_stdio_params("srv")
+    assert stdio_params.command == str(bin_dir / "uvx")
+    assert not calls.exists()
+    assert not (tmp_path / ".mcphub_cache" / "launch.json").exists()
+
+    # Entrypoints resolved explicitly, as by 'mcphub refresh', are used
+    MCPServersParams(str(config_file)).refresh_launch_commands(["srv"])
+    stdio_params = MCPServersParams(str(config_file)).convert_to_stdio_params("srv")
+    assert stdio_params.command == str(tmp_path / "uv-env" / "bin" / "py-server")
+    assert len(calls.read_text().splitlines()) == 1
+
+
+def test_resolve_on_launch_when_enabled(tmp_path, shims, monkeypatch):
+    bin_dir, _ = shims
+    config_file = tmp_path / ".mcphub.json"
+    config_file.write_text(json.dumps({"mcpServers": {"srv": {
+        "package_name": "py-server", "command": str(bin_dir / "uvx"), "args": ["py-server"],
+    }}}))
+    monkeypatch.setenv("MCPHUB_RESOLVE_LAUNCH", "1")
+
+    stdio_params = MCPServersParams(str(config_file)).convert_to_stdio_params("srv")
+
+    assert stdio_params.command == str(tmp_path / "uv-env" / "bin" / "py-server")
+    assert (tmp_path / ".mcphub_cache" / "launch.json").exists()
+
+
+def test_concurrent_resolvers_keep_each_others_entries(tmp_path, shims):
+    bin_dir, _ = shims
+    uvx = str(bin_dir / "uvx")
+    # Separate instances stand in for separate processes sharing launch.json
+    first, second = LaunchResolver(tmp_path / "launch.json"), LaunchResolver(tmp_path / "launch.json")
+    first.cached(uvx, ["py-server", "--one"])
+    second.cached(uvx, ["py-server", "--two"])
+
+    first.resolve(uvx, ["py-server", "--one"])
+    second.resolve(uvx, ["py-server", "--two"])
+
+    entries = json.loads((tmp_path / "launch.json").read_text())
+    assert len(entries) == 2
+    second.forget(uvx, ["py-server", "--two"])
+    assert LaunchResolver(tmp_path / "launch.json").cached(uvx, ["py-server", "--one"]) is not None
@@ -0,0 +1,122 @@
+import json
+import multiprocessing
+import os
+import subprocess
+import threading
+import time
+
+import pytest
+
+from mcphub.mcp_servers import locks
+from mcphub.mcp_servers.exceptions import LockTimeout
+from mcphub.mcp_servers.locks import FileLock, path_lock, read_holder
+from mcphub.mcp_servers.params import MCPServersParams
+from mcphub.mcp_servers.servers import MCPServers
+
+
+def test_holder_is_recorded_and_waiters_are_told(tmp_path):
+    target = tmp_path / "repo"
+    seen = []
+    with path_lock(target):
+        holder = read_holder(f"{target}.lock")
+        assert holder.pid == os.getpid() and holder.is_alive()
+        with pytest.raises(LockTimeout, match=f"pid {os.getpid()}"):
+            with path_lock(target, timeout=0.2, on_wait=seen.append):
+                pass
+    assert [h.pid for h in seen] == [os.getpid()]
+    assert read_holder(f"{target}.lock") is None
+
+
+def test_lock_serialises_threads(tmp_path):
+    inside = []
+    overlaps = []
+
+    def work():
+        with path_lock(tmp_path / "repo"):
+            inside.append(1)
+            overlaps.append(len(inside))
+            time.sleep(0.01)
+            inside.pop()
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert overlaps == [1] * 8
+
+
+def test_lock_file_removed_while_waiting(tmp_path):
+    lock_path = tmp_path / "repo.lock"
+    first = FileLock(lock_path)
+    first.acquire()
+    acquired = threading.Event()
+
+    def wait():
+        with FileLock(lock_path):
+            acquired.set()
+
+    waiter = threading.Thread(target=wait)
+    waiter.start()
+    time.sleep(0.1)
+    # Like RepositoryCache.remove: the holder deletes the lock file on its way out
+    os.unlink(lock_path)
+    first.release()
+    waiter.join(timeout=5)
+    assert acquired.is_set()
+
+
+def test_stale_lock_file_without_fcntl(tmp_path, monkeypatch):
+    monkeypatch.setattr(locks, "fcntl", None)
+    lock_path = tmp_path / "repo.lock"
+    dead = subprocess.Popen(["true"])
+    dead.wait()
+    lock_path.write_text(json.dumps({"pid": dead.pid, "host": locks.socket.gethostname(), "acquired": time.time()}))
+
+    with FileLock(lock_path):
+        assert read_holder(lock_path).pid == os.getpid()
+    assert not lock_path.exists()
+
+    lock_path.write_text(json.dumps({"pid": 1, "host": "elsewhere", "acquired": time.time() - 60}))
+    with pytest.raises(LockTimeout):
+        FileLock(lock_path).acquire(timeout=0.2)
+    with FileLock(lock_path, stale_after=30):
+        pass
+
+
+def _setup_in_process(project, config_file, barrier):
+    os.chdir(project)
+    servers = MCPServers(MCPServersParams(str(config_file)), auto_setup=False, precompile=False)
+    barrier.wait()
+    servers.setup_server(servers.servers_params.retrieve_server_params("srv"))
+
+
+def test_concurrent_processes_set_up_once(tmp_path):
+    upstream = tmp_path / "upstream"
+    upstream.mkdir()
+    (upstream / "server.py").write_text("print('ready')\n")
+    git = ["git", "-C", str(upstream), "-c", "user.name=t", "-c", "user.email=t@t"]
+    subprocess.run(["git", "init", "-q", str(upstream)], check=True)
+    subprocess.run(git + ["add", "."], check=True)
+    subprocess.run(git + ["commit", "-q", "-m", "init"], check=True)
+
+    project = tmp_path / "project"
+    project.mkdir()
+    counter = tmp_path / "runs"
+    config_file = project / ".mcphub.json"
+    config_file.write_text(json.dumps({"mcpServers": {"srv": {
+        "package_name": "org/srv", "command": "python", "args": ["server.py"],
+        "repo_url": f"file://{upstream}", "setup_script": f"sleep 0.2; echo run >> {counter}",
+    }}}))
+
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(4)
+    workers = [context.Process(target=_setup_in_process, args=(project, config_file, barrier)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+    assert [worker.exitcode for worker in workers] == [0] * 4
+    assert counter.read_text() == "run\n"
+    assert (project / ".mcphub_cache" / "org--srv" / "server.py").exists()
+    assert not list((project / ".mcphub_cache").glob("*.tmp"))
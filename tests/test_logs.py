@@ -0,0 +1,73 @@
+"""Tests for server log files."""
+import subprocess
+import sys
+import threading
+
+from mcphub.cli import commands
+from mcphub.cli.logs import RotatingLog, follow, log_path, tail
+from mcphub.cli.readiness import OutputWatcher
+
+
+def test_rotation_and_tail(tmp_path):
+    log = RotatingLog(tmp_path / "server.log", max_bytes=100, backups=2)
+    for i in range(30):
+        log.write(f"line {i:02d}")
+    log.close()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["server.log", "server.log.1", "server.log.2"]
+    assert all(p.stat().st_size <= 100 for p in tmp_path.iterdir())
+    assert tail(tmp_path / "server.log", 3) == ["line 27", "line 28", "line 29"]
+    assert tail(tmp_path / "server.log", 1000)[-1] == "line 29"
+    assert tail(tmp_path / "server.log.2", 1) != []
+
+
+def test_follow_survives_rotation(tmp_path):
+    log = RotatingLog(tmp_path / "server.log", max_bytes=40, backups=1)
+    log.write("before")
+    seen = []
+    done = threading.Event()
+
+    def reader():
+        for line in follow(tmp_path / "server.log", interval=0.01, stopped=done.is_set):
+            seen.append(line)
+            if len(seen) == 6:
+                done.set()
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    # follow starts at the end of the file, once the reader is running
+    threading.Event().wait(0.2)
+    for i in range(6):
+        log.write(f"after {i}")
+    thread.join(timeout=10)
+    log.close()
+
+    assert seen == [f"after {i}" for i in range(6)]
+
+
+def test_chatty_server_is_drained_into_its_log(tmp_path):
+    script = "import sys\nfor i in range(100000): print('x' * 40, i)\nprint('done', file=sys.stderr)"
+    process = subprocess.Popen([sys.executable, "-c", script],
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    path = log_path(tmp_path, "owner/server")
+    watcher = OutputWatcher({"stdout": process.stdout, "stderr": process.stderr},
+                            log=RotatingLog(path, max_bytes=1024 * 1024, backups=3))
+    finished = watcher.expect(lambda line: line == "done", streams=("stderr",))
+    # Would block forever on a full pipe if nothing read it
+    assert process.wait(timeout=60) == 0
+    assert finished.wait(10)
+
+    assert path.name == "owner__server.log"
+    assert path.with_name("owner__server.log.1").exists()
+    assert len(watcher.tail) == 200
+
+
+def test_logs_command(tmp_path, capfd, monkeypatch):
+    log = RotatingLog(log_path(tmp_path, "test-server"))
+    for i in range(5):
+        log.write(f"line {i}")
+    log.close()
+    monkeypatch.setattr(commands.ProcessManager, "__init__", lambda self: setattr(self, "log_dir", tmp_path))
+
+    commands.logs_command(commands.parse_args(["logs", "test-server", "-n", "2"]))
+    assert capfd.readouterr().out == "line 3\nline 4\n"
@@ -73,4 +73,49 @@ class TestMCPServersParams:
             f.write("{ invalid json")
         
         with pytest.raises(ValueError):
-            MCPServersParams(str(invalid_json_file))
\ No newline at end of file
+            MCPServersParams(str(invalid_json_file))
+
+class TestMCPServersParamsRegistry:
+    @pytest.fixture
+    def registry_file(self, tmp_path):
+        config = {
+            "mcpServers": {
+                "alpha": {"package_name": "pkg-a", "command": "a", "args": [], "tags": ["search", "web"]},
+                "beta": {"package_name": "pkg-b", "command": "b", "args": [], "tags": ["web"]},
+                "gamma": {"package_name": "pkg-a", "command": "c", "args": []},
+                "broken": {"command": "d", "args": []},
+            }
+        }
+        config_file = tmp_path / ".mcphub.json"
+        config_file.write_text(json.dumps(config))
+        return config_file
+
+    def test_lazy_validation(self, registry_file):
+        """Invalid entries only fail when they are accessed."""
+        with pytest.raises(ValueError):
+            MCPServersParams(str(registry_file))
+
+        params = MCPServersParams(str(registry_file), lazy=True)
+        assert len(params) == 4
+        assert "broken" in params
+        assert params.retrieve_server_params("alpha").server_name == "alpha"
+        with pytest.raises(ValueError):
+            params.retrieve_server_params("broken")
+
+    def test_secondary_indexes(self, registry_file):
+        params = MCPServersParams(str(registry_file), lazy=True)
+
+        assert [s.server_name for s in params.find_by_tag("web")] == ["alpha", "beta"]
+        assert [s.server_name for s in params.find_by_package("pkg-a")] == ["alpha", "gamma"]
+        assert params.find_by_tag("missing") == []
+
+    def test_list_view_is_cached_and_immutable(self, temp_config_file):
+        params = MCPServersParams(str(temp_config_file))
+
+        view = params.servers_params
+        assert isinstance(view, tuple)
+        assert params.list_servers() is view
+
+        params.update_server_path("test-server", "/new/path")
+        assert params.servers_params is view
+        assert view[0].cwd == "/new/path"
@@ -0,0 +1,69 @@
+"""Tests for port reservations."""
+import multiprocessing
+import os
+import subprocess
+import sys
+from unittest.mock import MagicMock, patch
+
+from mcphub.cli.ports import PortAllocator
+from mcphub.cli.process_manager import ProcessManager
+from mcphub.cli.process_store import ProcessStore
+
+
+def _reserve_ports(path, queue):
+    allocator = PortAllocator(ProcessStore(path))
+    # Owned by the test process, so the reservations outlive this worker
+    queue.put([allocator.reserve(41000, 200, pid=os.getppid()) for _ in range(10)])
+
+
+def test_parallel_reservations_never_collide(tmp_path):
+    path = tmp_path / "processes.db"
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    workers = [context.Process(target=_reserve_ports, args=(path, queue)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    ports = [port for _ in workers for port in queue.get(timeout=60)]
+    for worker in workers:
+        worker.join(timeout=60)
+
+    assert len(ports) == 40
+    assert len(set(ports)) == 40
+    assert set(PortAllocator(ProcessStore(path)).reservations()) == set(ports)
+
+
+def test_reservations_of_exited_processes_are_reclaimed(tmp_path):
+    allocator = PortAllocator(ProcessStore(tmp_path / "processes.db"))
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+
+    with patch("mcphub.cli.ports.port_is_free", return_value=True):
+        assert allocator.reserve(41000) == 41000
+        allocator.assign(41001, exited.pid)
+        assert allocator.reservations() == {41000: os.getpid(), 41001: exited.pid}
+        # The exited owner's port is free again
+        assert allocator.reserve(41000) == 41001
+        assert allocator.reserve(41000) == 41002
+
+        assert allocator.release(port=41000) == [41000]
+        assert sorted(allocator.release(pid=os.getpid())) == [41001, 41002]
+        assert allocator.reservations() == {}
+
+
+def test_start_process_switches_from_reserved_port(tmp_path):
+    manager = ProcessManager(data_dir=tmp_path)
+    command = ["python", "server.py", "--port", "41000"]
+    with patch("mcphub.cli.ports.port_is_free", return_value=True), \
+         patch("mcphub.cli.readiness.listening_ports", return_value={41000, 41001}), \
+         patch.object(manager, "_check_port_conflict", return_value=None), \
+         patch("subprocess.Popen") as mock_popen:
+        manager.ports.assign(41000, os.getpid())
+        mock_popen.return_value = MagicMock(pid=os.getpid())
+        mock_popen.return_value.poll.return_value = None
+        manager.start_process("test-server", command)
+
+    assert command[-1] == "41001"
+    assert manager.ports.reservations() == {41000: os.getpid(), 41001: os.getpid()}
+    with patch("os.kill"), patch("psutil.Process"):
+        manager.stop_process(os.getpid())
+    assert manager.ports.reservations() == {}
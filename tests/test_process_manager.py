@@ -9,6 +9,8 @@ import psutil
 import socket
 from datetime import datetime
 from mcphub.cli.process_manager import ProcessManager
+from mcphub.cli.process_store import env_digest
+from mcphub.cli.sockets import SocketSnapshot
 
 @pytest.fixture
 def temp_data_dir(tmp_path):
@@ -33,6 +35,11 @@ def mock_processes_file():
         }
     }
 
+def _store_records(manager, records):
+    """Write process records straight into the manager's store."""
+    for pid, info in records.items():
+        manager.store.put(int(pid), info)
+
 @pytest.fixture
 def process_manager(temp_data_dir):
     """Create a ProcessManager instance with a temporary data directory."""
@@ -49,7 +56,8 @@ def test_init_default_data_dir():
             with patch("builtins.open", mock_open(read_data="{}")):
                 manager = ProcessManager()
                 assert manager.data_dir == Path("/tmp/test/.mcphub")
-                assert manager.processes_file == Path("/tmp/test/.mcphub/processes.json")
+                assert manager.db_path == Path("/tmp/test/.mcphub/processes.db")
+                assert manager.legacy_file == Path("/tmp/test/.mcphub/processes.json")
                 mock_mkdir.assert_called_once_with(parents=True, exist_ok=True)
 
 def test_init_custom_data_dir(temp_data_dir):
@@ -57,7 +65,7 @@ def test_init_custom_data_dir(temp_data_dir):
     with patch("builtins.open", mock_open(read_data="{}")):
         manager = ProcessManager(data_dir=temp_data_dir)
         assert manager.data_dir == temp_data_dir
-        assert manager.processes_file == temp_data_dir / "processes.json"
+        assert manager.db_path == temp_data_dir / "processes.db"
 
 def test_ensure_data_dir(temp_data_dir):
     """Test that data directory is created if it doesn't exist."""
@@ -73,40 +81,69 @@ def test_load_processes_empty(temp_data_dir):
     
     manager = ProcessManager(data_dir=temp_data_dir)
     assert manager.processes == {}
-    assert processes_file.exists()
+    # Imported into the database, then removed
+    assert not processes_file.exists()
+    assert manager.db_path.exists()
 
 def test_load_processes_existing(mock_processes_file, temp_data_dir):
-    """Test loading processes from an existing file."""
+    """Test importing processes from a legacy processes.json file."""
     # Create a processes.json file with mock data
     processes_file = temp_data_dir / "processes.json"
-    processes_file.write_text(json.dumps(mock_processes_file))
+    legacy = {"1234": {**mock_processes_file["1234"], "env": {"API_KEY": "secret"}}}
+    processes_file.write_text(json.dumps(legacy))
     
     manager = ProcessManager(data_dir=temp_data_dir)
-    assert manager.processes == mock_processes_file
+    expected = {k: v for k, v in mock_processes_file["1234"].items() if k != "env"}
+    expected.update(env_keys=["API_KEY"], env_digest=env_digest({"API_KEY": "secret"}))
+    assert manager.processes == {"1234": expected}
+    assert not processes_file.exists()
 
-def test_save_processes(process_manager, mock_processes_file):
-    """Test saving processes to file."""
-    process_manager.processes = mock_processes_file.copy()
-    process_manager._save_processes()
+def test_env_values_are_not_stored(process_manager, mock_processes_file):
+    """Test that records keep only a digest of the environment."""
+    _store_records(process_manager, {"1234": {**mock_processes_file["1234"], "env": {"API_KEY": "secret"}}})
+    process_manager.store.close()
     
-    # Read the saved file and verify its contents
-    saved_data = json.loads(process_manager.processes_file.read_text())
-    assert saved_data == mock_processes_file
+    assert b"secret" not in process_manager.db_path.read_bytes()
+    wal = process_manager.db_path.with_name("processes.db-wal")
+    assert not wal.exists() or b"secret" not in wal.read_bytes()
+    assert process_manager.processes["1234"]["env_keys"] == ["API_KEY"]
+
+def _snapshot(listening, parents=None):
+    """A socket snapshot of the given {pid: ports} and {pid: parent pid}."""
+    parents = {pid: 1 for pid in listening} | (parents or {})
+    return SocketSnapshot(parents, {pid: 0.0 for pid in parents}, listening)
 
 def test_check_port_conflict(process_manager, mock_processes_file):
     """Test checking for port conflicts."""
-    process_manager.processes = mock_processes_file.copy()
-    with patch("psutil.Process") as mock_process:
-        mock_proc = MagicMock()
-        mock_proc.is_running.return_value = True
-        mock_process.return_value = mock_proc
+    _store_records(process_manager, mock_processes_file)
+    # A child of the managed process holds the port
+    sockets = _snapshot({1235: {3000}}, parents={1234: 1, 1235: 1234})
+    with patch.object(SocketSnapshot, "take", return_value=sockets):
+        conflict = process_manager._check_port_conflict(3000)
+        assert conflict is not None
+        assert conflict["pid"] == 1234
+        assert conflict["name"] == "test-server"
         
-        # Mock _get_process_ports to return a list containing the test port
-        with patch.object(process_manager, "_get_process_ports", return_value=[3000]):
-            conflict = process_manager._check_port_conflict(3000)
-            assert conflict is not None
-            assert conflict["pid"] == 1234
-            assert conflict["name"] == "test-server"
+        assert process_manager._check_port_conflict(3000, exclude_pid=1234) is None
+        assert process_manager._check_port_conflict(3001) is None
+
+def test_port_lookups_share_one_snapshot(process_manager, mock_processes_file):
+    """Test that listing processes takes a single socket snapshot."""
+    records = {str(pid): {**mock_processes_file["1234"], "pid": pid} for pid in range(1000, 1100)}
+    _store_records(process_manager, records)
+    sockets = _snapshot({pid: {pid + 2000} for pid in range(1000, 1100)})
+    def process(pid):
+        proc = MagicMock(pid=pid)
+        proc.is_running.return_value = True
+        proc.name.return_value = "python"
+        return proc
+    
+    with patch.object(SocketSnapshot, "take", return_value=sockets) as mock_take, \
+         patch("psutil.Process", side_effect=process):
+        processes = process_manager.list_processes()
+    mock_take.assert_called_once()
+    assert [p["ports"] for p in processes] == [[pid + 2000] for pid in range(1000, 1100)]
+    assert not any(p["warnings"] for p in processes)
 
 def test_find_available_port(process_manager):
     """Test finding an available port."""
@@ -124,14 +161,20 @@ def test_start_process_with_port(process_manager):
     with patch("subprocess.Popen") as mock_popen:
         mock_process = MagicMock()
         mock_process.pid = 1234
+        mock_process.poll.return_value = None
         mock_popen.return_value = mock_process
         
-        with patch.object(process_manager, "_check_port_conflict", return_value=None):
-            with patch.object(process_manager, "_get_process_ports", return_value=[3000]):
+        with patch.object(process_manager, "_check_port_conflict", return_value=None), \
+             patch("mcphub.cli.ports.port_is_free", return_value=True):
+            with patch("mcphub.cli.readiness.listening_ports", return_value={3000}):
                 pid = process_manager.start_process("test-server", command)
                 assert pid == 1234
                 assert str(pid) in process_manager.processes
-                assert process_manager.processes[str(pid)]["status"] == "running"
+                info = process_manager.processes[str(pid)]
+                assert info["status"] == "running"
+                assert info["readiness"] == "port"
+                assert info["ready_after"] < 1
+                assert info["warnings"] == []
 
 def test_start_process_without_port(process_manager):
     """Test starting a process without a specified port."""
@@ -139,19 +182,36 @@ def test_start_process_without_port(process_manager):
     with patch("subprocess.Popen") as mock_popen:
         mock_process = MagicMock()
         mock_process.pid = 1234
+        mock_process.poll.return_value = None
         mock_popen.return_value = mock_process
         
         with patch.object(process_manager, "_find_available_port", return_value=3000):
             with patch.object(process_manager, "_check_port_conflict", return_value=None):
-                with patch.object(process_manager, "_get_process_ports", return_value=[3000]):
+                with patch("mcphub.cli.readiness.listening_ports", return_value={3000}):
                     pid = process_manager.start_process("test-server", command)
                     assert pid == 1234
                     assert "--port" in process_manager.processes[str(pid)]["command"]
                     assert "3000" in process_manager.processes[str(pid)]["command"]
 
+def test_start_process_records_failed_readiness(process_manager):
+    """Test that a server exiting before it is ready is recorded as failed."""
+    with patch("subprocess.Popen") as mock_popen:
+        mock_process = MagicMock(pid=1234, returncode=1)
+        mock_process.poll.return_value = 1
+        mock_popen.return_value = mock_process
+        
+        with patch.object(process_manager, "_check_port_conflict", return_value=None), \
+             patch("mcphub.cli.ports.port_is_free", return_value=True), \
+             patch("mcphub.cli.readiness.listening_ports", return_value=set()):
+            process_manager.start_process("test-server", ["python", "server.py", "--port", "3000"])
+    info = process_manager.processes["1234"]
+    assert info["status"] == "failed"
+    assert "ready_after" not in info
+    assert "exited with code 1" in info["warnings"][0]
+
 def test_stop_process(process_manager, mock_processes_file):
     """Test stopping a running process."""
-    process_manager.processes = mock_processes_file.copy()
+    _store_records(process_manager, mock_processes_file)
     with patch("os.kill") as mock_kill:
         with patch("psutil.Process") as mock_process:
             mock_proc = MagicMock()
@@ -170,8 +230,9 @@ def test_stop_process_not_found(process_manager):
 
 def test_get_process_info(process_manager, mock_processes_file):
     """Test getting information about a process."""
-    process_manager.processes = mock_processes_file.copy()
-    with patch("psutil.Process") as mock_process:
+    _store_records(process_manager, mock_processes_file)
+    with patch("psutil.Process") as mock_process, \
+         patch.object(SocketSnapshot, "take", return_value=_snapshot({1234: {3000}})):
         mock_proc = MagicMock()
         mock_proc.is_running.return_value = True
         mock_process.return_value = mock_proc
@@ -188,8 +249,9 @@ def test_get_process_info_not_found(process_manager):
 
 def test_list_processes(process_manager, mock_processes_file):
     """Test listing all processes."""
-    process_manager.processes = mock_processes_file.copy()
-    with patch("psutil.Process") as mock_process:
+    _store_records(process_manager, mock_processes_file)
+    with patch("psutil.Process") as mock_process, \
+         patch.object(SocketSnapshot, "take", return_value=_snapshot({1234: {3000}})):
         mock_proc = MagicMock()
         mock_proc.is_running.return_value = True
         mock_process.return_value = mock_proc
@@ -210,14 +272,10 @@ def test_get_uptime(process_manager):
         assert "1h" in uptime
 
 def test_get_process_ports(process_manager):
-    """Test getting ports used by a process."""
-    with patch("psutil.Process") as mock_process:
-        mock_proc = MagicMock()
-        mock_conn = MagicMock()
-        mock_conn.laddr = MagicMock(port=3000)
-        mock_conn.status = "LISTEN"
-        mock_proc.connections.return_value = [mock_conn]
-        mock_process.return_value = mock_proc
-        
+    """Test getting ports used by a process and its children."""
+    mock_proc = MagicMock(pid=1234)
+    mock_proc.name.return_value = "python"
+    sockets = _snapshot({1234: {3000}, 1236: {3001}, 999: {4000}}, parents={1235: 1234, 1236: 1235})
+    with patch.object(SocketSnapshot, "take", return_value=sockets):
         ports = process_manager._get_process_ports(mock_proc)
-        assert 3000 in ports 
\ No newline at end of file
+    assert ports == [3000, 3001]
@@ -0,0 +1,61 @@
+"""Tests for the SQLite process store."""
+import multiprocessing
+from unittest.mock import patch
+
+from mcphub.cli.process_manager import ProcessManager
+from mcphub.cli.process_store import ProcessStore
+
+
+def _record(name, status="running"):
+    return {"name": name, "command": f"python {name}.py", "start_time": "2024-03-20T10:00:00",
+            "env": {"TOKEN": name}, "status": status, "ports": [], "warnings": []}
+
+
+def test_update_touches_one_row(tmp_path):
+    store = ProcessStore(tmp_path / "processes.db")
+    store.put(1, _record("a"))
+    store.put(2, {**_record("b"), "custom": 1})
+
+    assert store.update(2, {"status": "stopped", "custom": 2, "ports": [3000]})
+    assert not store.update(3, {"status": "stopped"})
+
+    assert store.get(1)["status"] == "running"
+    record = store.get(2)
+    assert (record["status"], record["custom"], record["ports"]) == ("stopped", 2, [3000])
+    assert [r["name"] for r in store.all()] == ["a", "b"]
+    assert store.delete(1) and len(store) == 1
+
+
+def _write_rows(path, start):
+    store = ProcessStore(path)
+    for pid in range(start, start + 50):
+        store.put(pid, _record(f"srv-{pid}"))
+        store.update(pid, {"status": "stopped"})
+
+
+def test_concurrent_writers_lose_nothing(tmp_path):
+    path = tmp_path / "processes.db"
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=_write_rows, args=(path, start)) for start in range(0, 200, 50)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+
+    assert [worker.exitcode for worker in workers] == [0] * 4
+    records = ProcessStore(path).all()
+    assert len(records) == 200
+    assert {r["status"] for r in records} == {"stopped"}
+
+
+def test_listing_unchanged_processes_writes_nothing(tmp_path):
+    manager = ProcessManager(data_dir=tmp_path)
+    for pid in range(10, 20):
+        manager.store.put(pid, _record(f"srv-{pid}", status="stopped"))
+
+    with patch.object(manager.store, "update") as mock_update, patch("psutil.Process") as mock_process:
+        processes = manager.list_processes()
+    assert len(processes) == 10
+    mock_update.assert_not_called()
+    # Stopped processes are not probed again; their pids may have been reused
+    mock_process.assert_not_called()
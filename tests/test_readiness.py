@@ -0,0 +1,86 @@
+"""Tests for server readiness probes."""
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from mcphub.cli.readiness import OutputWatcher, ReadinessProbe, wait_until_ready
+
+LISTENER = textwrap.dedent("""
+    import socket, sys, time
+    time.sleep(0.2)
+    s = socket.socket()
+    s.bind(("127.0.0.1", 0))
+    s.listen()
+    print(f"listening on {s.getsockname()[1]}", flush=True)
+    time.sleep(30)
+""")
+
+STDIO_SERVER = textwrap.dedent("""
+    import json, sys
+    for line in sys.stdin:
+        message = json.loads(line)
+        if message.get("method") == "initialize":
+            print(json.dumps({"jsonrpc": "2.0", "id": message["id"], "result": {}}), flush=True)
+        elif message.get("method") == "notifications/initialized":
+            print("initialized", file=sys.stderr, flush=True)
+""")
+
+
+def _start(source, stdin=None):
+    process = subprocess.Popen([sys.executable, "-c", source], stdin=stdin,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    return process, OutputWatcher({"stdout": process.stdout, "stderr": process.stderr})
+
+
+@pytest.fixture
+def processes():
+    started = []
+    yield started
+    for process in started:
+        process.kill()
+        process.wait()
+
+
+def test_probe_from_config():
+    assert ReadinessProbe.from_config(None).kind == "port"
+    assert ReadinessProbe.from_config("mcp").kind == "mcp"
+    probe = ReadinessProbe.from_config({"type": "log", "pattern": "ready", "timeout": 3})
+    assert (probe.kind, probe.pattern, probe.timeout) == ("log", "ready", 3)
+    with pytest.raises(ValueError):
+        ReadinessProbe.from_config("tcp")
+    with pytest.raises(ValueError):
+        ReadinessProbe.from_config({"type": "log"})
+
+
+def test_port_and_log_probes(processes):
+    process, watcher = _start(LISTENER)
+    processes.append(process)
+    result = wait_until_ready(process, ReadinessProbe("log", pattern=r"listening on \d+", timeout=10), watcher=watcher)
+    assert result.ready and result.elapsed < 10
+
+    # Any listening port counts when the server was not given one
+    result = wait_until_ready(process, ReadinessProbe("port", timeout=10))
+    assert result.ready
+    port = int(watcher.tail[-1].split()[-1])
+    assert wait_until_ready(process, ReadinessProbe("port", timeout=10), port=port).ready
+    assert not wait_until_ready(process, ReadinessProbe("port", timeout=0.1), port=port + 1).ready
+
+
+def test_mcp_probe(processes):
+    process, watcher = _start(STDIO_SERVER, stdin=subprocess.PIPE)
+    processes.append(process)
+    initialized = watcher.expect(lambda line: line == "initialized", streams=("stderr",))
+    result = wait_until_ready(process, ReadinessProbe("mcp", timeout=10), watcher=watcher)
+    assert result.ready
+    assert initialized.wait(10)
+
+
+def test_exit_before_ready(processes):
+    process, watcher = _start("import sys; print('boom', file=sys.stderr); sys.exit(3)")
+    processes.append(process)
+    result = wait_until_ready(process, ReadinessProbe("log", pattern="never", timeout=10), watcher=watcher)
+    assert not result.ready
+    assert result.detail == "exited with code 3"
+    assert result.elapsed < 10
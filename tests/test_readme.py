@@ -0,0 +1,81 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from mcphub.mcp_servers.readme import ReadmeFetcher
+
+
+class _RawHandler(BaseHTTPRequestHandler):
+    files = {"/owner/repo/master/README.md": ("# Server", '"v1"')}
+    requests = []
+    barrier = None
+
+    def do_GET(self):
+        self.requests.append((self.path, self.headers.get("If-None-Match")))
+        if self.barrier is not None:
+            # Both branch probes must be in flight at once to get past this
+            self.barrier.wait()
+        body, etag = self.files.get(self.path, (None, None))
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+        else:
+            data = body.encode()
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def raw_host():
+    _RawHandler.requests = []
+    _RawHandler.barrier = None
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _RawHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_branches_are_probed_concurrently(tmp_path, raw_host):
+    _RawHandler.barrier = threading.Barrier(2, timeout=5)
+
+    with ReadmeFetcher(raw_host, cache_dir=tmp_path) as fetcher:
+        assert fetcher.fetch("https://github.com/owner/repo") == "# Server"
+
+    assert sorted(path for path, _ in _RawHandler.requests) == [
+        "/owner/repo/main/README.md", "/owner/repo/master/README.md"
+    ]
+
+
+def test_unchanged_readme_is_revalidated(tmp_path, raw_host):
+    with ReadmeFetcher(raw_host, cache_dir=tmp_path) as fetcher:
+        fetcher.fetch("https://github.com/owner/repo")
+    _RawHandler.requests = []
+
+    with ReadmeFetcher(raw_host, cache_dir=tmp_path) as fetcher:
+        assert fetcher.fetch("https://github.com/owner/repo") == "# Server"
+
+    assert ("/owner/repo/master/README.md", '"v1"') in _RawHandler.requests
+
+
+def test_missing_readme_and_invalid_urls(tmp_path, raw_host):
+    with ReadmeFetcher(raw_host, cache_dir=tmp_path) as fetcher:
+        with pytest.raises(ValueError, match="Could not fetch README"):
+            fetcher.fetch("https://github.com/owner/other")
+        with pytest.raises(ValueError, match="Only GitHub"):
+            fetcher.fetch("https://gitlab.com/owner/repo")
+        with pytest.raises(ValueError, match="Invalid GitHub"):
+            fetcher.fetch("https://github.com/owner")
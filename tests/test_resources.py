@@ -0,0 +1,72 @@
+"""Tests for resource sampling of managed servers."""
+import json
+import subprocess
+import sys
+import time
+from unittest import mock
+
+import psutil
+import pytest
+
+from mcphub.cli import commands
+from mcphub.cli.resources import ResourceSampler
+
+# A parent that spins, with one idle child
+BUSY = """
+import subprocess, sys, time
+child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+print("ready", flush=True)
+end = time.time() + 60
+while time.time() < end:
+    pass
+"""
+
+
+@pytest.fixture
+def busy_server():
+    process = subprocess.Popen([sys.executable, "-c", BUSY], stdout=subprocess.PIPE, text=True)
+    process.stdout.readline()
+    children = psutil.Process(process.pid).children(recursive=True)
+    yield process
+    for child in children:
+        child.kill()
+    process.kill()
+    process.wait()
+
+
+def test_samples_process_tree(busy_server):
+    sampler = ResourceSampler(interval=0.1, capacity=3)
+    assert sampler.track(busy_server.pid, "busy")
+    for _ in range(5):
+        sampler.sample()
+        time.sleep(0.1)
+
+    export = sampler.export()
+    samples = export["servers"][0]["samples"]
+    # The ring buffer keeps the last ``capacity`` samples
+    assert len(samples) == 3
+    latest = sampler.latest()[busy_server.pid]
+    assert latest.processes == 2
+    assert latest.cpu_percent > 10
+    assert latest.rss > 0 and latest.threads >= 2 and latest.fds > 0
+    json.dumps(export)
+
+    busy_server.kill()
+    busy_server.wait()
+    sampler.sample()
+    assert sampler.tracked() == []
+
+
+def test_top_json_without_daemon(busy_server, capfd):
+    manager = mock.Mock()
+    manager.return_value.list_processes.return_value = [
+        {"pid": busy_server.pid, "name": "busy", "status": "running"},
+        {"pid": 1, "name": "old", "status": "stopped"},
+    ]
+    with mock.patch.object(commands.DaemonClient, "connect", return_value=None), \
+         mock.patch.object(commands, "ProcessManager", manager):
+        commands.top_command(commands.parse_args(["top", "--json", "--interval", "0.1", "--samples", "2"]))
+
+    export = json.loads(capfd.readouterr().out)
+    assert [s["name"] for s in export["servers"]] == ["busy"]
+    assert len(export["servers"][0]["samples"]) == 3
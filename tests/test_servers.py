@@ -1,17 +1,30 @@
+import asyncio
+import io
 import json
 import pytest
+import shutil
 import subprocess
+import threading
+import time
 from pathlib import Path
 from unittest import mock
 
 from mcphub.mcp_servers.servers import MCPServers
 from mcphub.mcp_servers.params import MCPServersParams, MCPServerConfig
 from mcphub.mcp_servers.exceptions import ServerConfigNotFoundError, SetupError
+from mcphub.mcphub import MCPHub
+
+
+def _mock_process(returncode, output=""):
+    process = mock.Mock()
+    process.stdout = io.StringIO(output)
+    process.wait.return_value = returncode
+    return process
 
 
 class TestMCPServers:
     
-    @mock.patch('subprocess.run')
+    @mock.patch('subprocess.Popen')
     @mock.patch('pathlib.Path.exists')
     @mock.patch('pathlib.Path.chmod')
     @mock.patch('builtins.open', new_callable=mock.mock_open)
@@ -20,10 +33,8 @@ class TestMCPServers:
         # Mock Path.exists to return True for all paths
         mock_exists.return_value = True
         
-        # Mock subprocess.run to simulate successful script execution
-        mock_process = mock.Mock()
-        mock_process.returncode = 0
-        mock_run.return_value = mock_process
+        # Mock subprocess.Popen to simulate successful script execution
+        mock_run.return_value = _mock_process(0, "added 1 package\n")
         
         # Create a valid JSON config for testing
         config_content = {
@@ -56,7 +67,10 @@ class TestMCPServers:
                 servers._run_setup_script(script_path, setup_script)
                 
                 # Check that the temporary script was created with correct content
-                mock_open.assert_called_with(script_path / "setup_temp.sh", "w")
+                script_file = mock_open.call_args_list[0].args[0]
+                assert script_file.parent == script_path
+                assert script_file.name.startswith(".mcphub-setup-") and script_file.suffix == ".sh"
+                mock_open.assert_any_call(script_file, "w")
                 mock_open().write.assert_any_call("#!/bin/bash\n")
                 mock_open().write.assert_any_call(setup_script + "\n")
                 
@@ -66,15 +80,15 @@ class TestMCPServers:
                 # Check that the script was executed with correct parameters
                 mock_run.assert_called_once()
                 args, kwargs = mock_run.call_args
-                assert str(script_path / "setup_temp.sh") in str(args[0])
+                assert str(script_file) in str(args[0])
                 assert kwargs["cwd"] == script_path
     
-    @mock.patch('subprocess.run')
+    @mock.patch('subprocess.Popen')
     @mock.patch('pathlib.Path.exists')
     def test_run_setup_script_failure(self, mock_exists, mock_run, temp_config_file, mock_current_dir):
         """Test failed setup script execution."""
         mock_exists.return_value = True
-        mock_run.side_effect = subprocess.CalledProcessError(1, "setup_script", stderr="Script failed")
+        mock_run.return_value = _mock_process(1, "Script failed\n")
         
         # Initialize MCPServersParams and MCPServers with mock _setup_all_servers
         params = MCPServersParams(str(temp_config_file))
@@ -152,7 +166,7 @@ class TestMCPServers:
             assert tools == ["tool1", "tool2"]
             mock_server_instance.list_tools.assert_called_once()
     
-    @mock.patch('subprocess.run')
+    @mock.patch('subprocess.Popen')
     @mock.patch('pathlib.Path.exists')
     @mock.patch.object(MCPServers, '_get_cache_dir')
     def test_clone_repository_success(self, mock_get_cache_dir, mock_exists, mock_run, temp_config_file, mock_current_dir):
@@ -163,9 +177,11 @@ class TestMCPServers:
         
         # Set up mocks for subprocess and exists
         mock_exists.return_value = False  # Repository doesn't exist yet
-        mock_process = mock.Mock()
-        mock_process.returncode = 0
-        mock_run.return_value = mock_process
+
+        def clone(command, **kwargs):
+            Path(command[-1]).mkdir(parents=True)
+            return _mock_process(0, "Cloning into 'repo'...\n")
+        mock_run.side_effect = clone
         
         # Initialize MCPServersParams and MCPServers with mock _setup_all_servers
         params = MCPServersParams(str(temp_config_file))
@@ -177,19 +193,24 @@ class TestMCPServers:
             repo_name = "test/repo"
             result = servers._clone_repository(repo_url, repo_name)
             
-            # Expected result should be the cache_dir / repo
-            expected_path = mock_cache_dir / "repo"
+            # Expected result is named after the full package name
+            expected_path = mock_cache_dir / "test--repo"
             assert result == expected_path
+            assert expected_path.is_dir()
             
-            # Check that git clone was called with correct parameters
+            # Check that git clone was called with correct parameters, cloning
+            # into a temporary sibling that is then moved into place
             mock_run.assert_called_once()
             args, kwargs = mock_run.call_args
-            assert args[0] == ["git", "clone", repo_url, str(expected_path)]
-            assert kwargs["check"] == True
-            assert kwargs["capture_output"] == True
+            assert args[0][:-1] == ["git", "clone", "--depth", "1", repo_url]
+            clone_dir = Path(args[0][-1])
+            assert clone_dir.parent == mock_cache_dir and clone_dir.name.startswith("test--repo.")
+            assert not clone_dir.exists()
+            assert kwargs["stdout"] == subprocess.PIPE
+            assert kwargs["stderr"] == subprocess.STDOUT
             assert kwargs["text"] == True
 
-    @mock.patch('subprocess.run')
+    @mock.patch('subprocess.Popen')
     @mock.patch('pathlib.Path.exists')
     @mock.patch.object(MCPServers, '_get_cache_dir')
     def test_clone_repository_failure(self, mock_get_cache_dir, mock_exists, mock_run, temp_config_file, mock_current_dir):
@@ -200,9 +221,7 @@ class TestMCPServers:
         
         # Set up mocks
         mock_exists.return_value = False  # Repository doesn't exist yet
-        mock_run.side_effect = subprocess.CalledProcessError(
-            128, "git clone", stderr="Error: Repository not found"
-        )
+        mock_run.return_value = _mock_process(128, "Error: Repository not found\n")
         
         # Initialize MCPServersParams and MCPServers with mock _setup_all_servers
         params = MCPServersParams(str(temp_config_file))
@@ -218,4 +237,409 @@ class TestMCPServers:
                 servers._clone_repository(repo_url, repo_name)
                 
             # Check error message
-            assert f"Failed to clone repository {repo_url}" in str(exc_info.value)
\ No newline at end of file
+            assert f"Failed to clone repository {repo_url}" in str(exc_info.value)
+
+def _write_servers_config(path, count, package="org/repo-{i}"):
+    config = {"mcpServers": {
+        f"server-{i}": {
+            "package_name": package.format(i=i),
+            "command": "python",
+            "args": [],
+            "repo_url": f"https://github.com/org/repo-{i}",
+            "setup_script": "make"
+        }
+        for i in range(count)
+    }}
+    path.write_text(json.dumps(config))
+
+
+class TestParallelSetup:
+    def test_servers_set_up_concurrently(self, tmp_path, mock_current_dir):
+        config_file = tmp_path / "servers.json"
+        _write_servers_config(config_file, 4)
+        params = MCPServersParams(str(config_file))
+
+        barrier = threading.Barrier(4, timeout=5)
+
+        def fake_setup(self, server_config, force=False):
+            # Every worker must be running at once for the barrier to release
+            barrier.wait()
+            if server_config.server_name == "server-2":
+                raise SetupError("boom")
+            return True
+
+        with mock.patch.object(MCPServers, "setup_server", fake_setup):
+            servers = MCPServers(params, max_workers=4)
+
+        statuses = {name: r.status for name, r in servers.setup_results.items()}
+        assert statuses == {
+            "server-0": "succeeded", "server-1": "succeeded",
+            "server-2": "failed", "server-3": "succeeded",
+        }
+        assert servers.setup_results["server-2"].error == "boom"
+
+    def test_shared_repository_is_set_up_serially(self, tmp_path, mock_current_dir):
+        config_file = tmp_path / "servers.json"
+        _write_servers_config(config_file, 3, package="org/same-repo")
+        params = MCPServersParams(str(config_file))
+
+        active = []
+        overlaps = []
+
+        def fake_setup(self, server_config, force=False):
+            active.append(server_config.server_name)
+            overlaps.append(len(active))
+            time.sleep(0.01)
+            active.remove(server_config.server_name)
+            return True
+
+        with mock.patch.object(MCPServers, "setup_server", fake_setup):
+            servers = MCPServers(params, max_workers=4)
+
+        assert max(overlaps) == 1
+        assert all(r.status == "succeeded" for r in servers.setup_results.values())
+
+    def test_output_is_prefixed_with_server_name(self, tmp_path, mock_current_dir, capsys):
+        config_file = tmp_path / "servers.json"
+        _write_servers_config(config_file, 1)
+        params = MCPServersParams(str(config_file))
+
+        def fake_setup(self, server_config, force=False):
+            self._log("installing\ndone")
+            return True
+
+        with mock.patch.object(MCPServers, "setup_server", fake_setup):
+            MCPServers(params)
+
+        out = capsys.readouterr().out
+        assert "[server-0] installing\n[server-0] done" in out
+        assert "Setup summary: 1 succeeded, 0 up to date, 0 failed, 0 skipped" in out
+
+    def test_background_setup_inside_event_loop(self, tmp_path, mock_current_dir):
+        config_file = tmp_path / "servers.json"
+        _write_servers_config(config_file, 2)
+        params = MCPServersParams(str(config_file))
+        release = threading.Event()
+
+        def fake_setup(self, server_config, force=False):
+            if server_config.server_name == "server-0":
+                release.wait(5)
+            return True
+
+        async def main():
+            # Constructed inside a running loop, so initialization must not block
+            servers = MCPServers(params, max_workers=2)
+            assert not servers.ready_future("server-0").done()
+
+            # Waiting for one server does not wait for the others
+            assert (await servers.wait_ready("server-1")).status == "succeeded"
+            assert not servers.ready_future("server-0").done()
+
+            release.set()
+            assert (await servers.wait_ready("server-0")).status == "succeeded"
+            assert await servers.wait_ready("unknown") is None
+            servers.shutdown()
+
+        with mock.patch.object(MCPServers, "setup_server", fake_setup):
+            asyncio.run(main())
+
+    def test_openai_server_waits_for_setup(self, temp_config_file, mock_current_dir):
+        _write_servers_config(temp_config_file, 1)
+        release = threading.Event()
+
+        def fake_setup(self, server_config, force=False):
+            release.wait(5)
+            return True
+
+        with mock.patch.object(MCPServers, "setup_server", fake_setup):
+            hub = MCPHub(background_setup=True)
+            hub._openai_adapter = mock.Mock()
+            fetched = threading.Thread(target=hub.fetch_openai_mcp_server, args=("server-0",))
+            fetched.start()
+            fetched.join(0.2)
+            assert fetched.is_alive()
+            hub._openai_adapter.create_server.assert_not_called()
+
+            release.set()
+            fetched.join(5)
+            hub._openai_adapter.create_server.assert_called_once_with("server-0", cache_tools_list=True)
+            hub.servers.shutdown()
+
+
+class TestSetupStamps:
+    def _make_repo(self, path, head="a" * 40):
+        (path / ".git" / "refs" / "heads").mkdir(parents=True)
+        (path / ".git" / "HEAD").write_text("ref: refs/heads/main\n")
+        (path / ".git" / "refs" / "heads" / "main").write_text(head + "\n")
+        return path
+
+    def _servers(self, tmp_path):
+        config_file = tmp_path / "servers.json"
+        _write_servers_config(config_file, 1)
+        with mock.patch.object(MCPServers, "_setup_all_servers"):
+            return MCPServers(MCPServersParams(str(config_file)))
+
+    def test_unchanged_setup_is_skipped(self, tmp_path, mock_current_dir):
+        repo_dir = self._make_repo(tmp_path / "repo")
+        servers = self._servers(tmp_path)
+        server_config = servers.servers_params.retrieve_server_params("server-0")
+
+        with mock.patch.object(MCPServers, "_clone_repository", return_value=repo_dir), \
+                mock.patch.object(MCPServers, "_run_setup_script") as mock_run_setup:
+            assert servers.setup_server(server_config) is True
+            assert servers.setup_server(server_config) is False
+            assert mock_run_setup.call_count == 1
+
+            # --force always re-runs the script
+            assert servers.setup_server(server_config, force=True) is True
+            assert mock_run_setup.call_count == 2
+
+            # A new commit invalidates the stamp
+            (repo_dir / ".git" / "refs" / "heads" / "main").write_text("b" * 40 + "\n")
+            assert servers.setup_server(server_config) is True
+            assert mock_run_setup.call_count == 3
+
+        assert server_config.cwd == str(repo_dir)
+
+    def test_failed_setup_leaves_no_stamp(self, tmp_path, mock_current_dir):
+        repo_dir = self._make_repo(tmp_path / "repo")
+        servers = self._servers(tmp_path)
+        server_config = servers.servers_params.retrieve_server_params("server-0")
+
+        with mock.patch.object(MCPServers, "_clone_repository", return_value=repo_dir), \
+                mock.patch.object(MCPServers, "_run_setup_script", side_effect=SetupError("boom")):
+            with pytest.raises(SetupError):
+                servers.setup_server(server_config)
+
+        assert servers.stamps.read("server-0") is None
+
+    def test_setup_servers_reports_cached(self, tmp_path, mock_current_dir):
+        repo_dir = self._make_repo(tmp_path / "repo")
+        servers = self._servers(tmp_path)
+
+        with mock.patch.object(MCPServers, "_clone_repository", return_value=repo_dir), \
+                mock.patch.object(MCPServers, "_run_setup_script"):
+            assert servers.setup_servers()["server-0"].status == "succeeded"
+            assert servers.setup_servers(["server-0"])["server-0"].status == "cached"
+            assert servers.setup_servers(force=True)["server-0"].status == "succeeded"
+
+
+def test_fingerprint_inputs(tmp_path):
+    from mcphub.mcp_servers.fingerprint import git_head, setup_tools
+
+    git_dir = tmp_path / ".git"
+    git_dir.mkdir()
+    (git_dir / "HEAD").write_text("ref: refs/heads/main\n")
+    (git_dir / "packed-refs").write_text("# pack-refs with: peeled\n" + "c" * 40 + " refs/heads/main\n")
+
+    assert git_head(tmp_path) == "c" * 40
+    assert setup_tools("cd src && FOO=1 uv sync; npm install | tee log") == ["uv", "npm", "tee"]
+
+
+def _git(*args, cwd=None):
+    return subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+class TestCloneStrategies:
+    @pytest.fixture
+    def origin(self, tmp_path):
+        origin = tmp_path / "origin"
+        origin.mkdir()
+        _git("init", "--quiet", "-b", "main", cwd=origin)
+        for version in ("1", "2", "3"):
+            (origin / "VERSION").write_text(version)
+            _git("add", "VERSION", cwd=origin)
+            _git("commit", "--quiet", "-m", f"v{version}", cwd=origin)
+            _git("tag", "-a", f"v{version}", "-m", f"v{version}", cwd=origin)
+        return origin
+
+    def _servers(self, tmp_path, **kwargs):
+        config_file = tmp_path / "servers.json"
+        _write_servers_config(config_file, 1)
+        with mock.patch.object(MCPServers, "_setup_all_servers"):
+            return MCPServers(MCPServersParams(str(config_file)), **kwargs)
+
+    def test_shallow_clone(self, tmp_path, mock_current_dir, origin):
+        servers = self._servers(tmp_path)
+
+        repo_dir = servers._clone_repository(origin.as_uri(), "org/shallow")
+
+        assert _git("rev-parse", "--is-shallow-repository", cwd=repo_dir) == "true"
+        assert _git("rev-list", "--count", "HEAD", cwd=repo_dir) == "1"
+        assert (repo_dir / "VERSION").read_text() == "3"
+
+    def test_pinned_tag_and_commit(self, tmp_path, mock_current_dir, origin):
+        servers = self._servers(tmp_path)
+        repo_dir = servers._clone_repository(origin.as_uri(), "org/pinned")
+
+        servers._checkout_ref(repo_dir, "v1")
+        assert (repo_dir / "VERSION").read_text() == "1"
+
+        # The tag is kept locally, so checking it out again needs no fetch
+        with mock.patch("mcphub.mcp_servers.servers.fetch_ref_command") as mock_fetch:
+            servers._checkout_ref(repo_dir, "v1")
+        mock_fetch.assert_not_called()
+
+        servers._checkout_ref(repo_dir, _git("rev-parse", "v2^{commit}", cwd=origin))
+        assert (repo_dir / "VERSION").read_text() == "2"
+
+    def test_shared_mirror_is_referenced(self, tmp_path, mock_current_dir, origin):
+        mirror_root = tmp_path / "mirrors"
+        first = self._servers(tmp_path, git_mirror_dir=mirror_root)
+        second = self._servers(tmp_path, git_mirror_dir=mirror_root)
+
+        first_dir = first._clone_repository(origin.as_uri(), "org/first")
+        second_dir = second._clone_repository(origin.as_uri(), "org/second")
+
+        mirrors = [p for p in mirror_root.iterdir() if p.suffix == ".git"]
+        assert len(mirrors) == 1
+        for repo_dir in (first_dir, second_dir):
+            alternates = (repo_dir / ".git" / "objects" / "info" / "alternates").read_text()
+            assert alternates.strip() == str(mirrors[0] / "objects")
+            assert (repo_dir / "VERSION").read_text() == "3"
+
+    def test_global_cache_is_shared_between_projects(self, tmp_path, origin, monkeypatch):
+        from mcphub.mcp_servers.cache import RepositoryCache
+
+        cache = RepositoryCache(tmp_path / "global")
+        projects = []
+        for name in ("project-a", "project-b"):
+            project = tmp_path / name
+            project.mkdir()
+            config_file = project / ".mcphub.json"
+            config_file.write_text(json.dumps({"mcpServers": {"srv": {
+                "package_name": "org/srv", "command": "python", "args": [],
+                "repo_url": origin.as_uri(), "repo_ref": "v2", "setup_script": "true",
+            }}}))
+            monkeypatch.chdir(project)
+            with mock.patch.object(MCPServers, "_run_setup_script") as mock_run_setup:
+                servers = MCPServers(MCPServersParams(str(config_file)), global_cache=cache)
+            projects.append((servers, mock_run_setup))
+
+        entries = cache.entries()
+        assert len(entries) == 1
+        assert (entries[0].path / "VERSION").read_text() == "2"
+        for servers, _ in projects:
+            link = servers.cache_dir / "org--srv@v2"
+            assert link.is_symlink() and link.resolve() == entries[0].path.resolve()
+            assert servers.servers_params.retrieve_server_params("srv").cwd == str(link)
+        # The second project reuses the stamp written by the first
+        assert [run_setup.call_count for _, run_setup in projects] == [1, 0]
+
+    def test_setup_scripts_sharing_a_global_entry_keep_their_stamps(self, tmp_path, origin, monkeypatch):
+        from mcphub.mcp_servers.cache import RepositoryCache
+
+        cache = RepositoryCache(tmp_path / "global")
+        project = tmp_path / "project"
+        project.mkdir()
+        config_file = project / ".mcphub.json"
+        config_file.write_text(json.dumps({"mcpServers": {
+            name: {"package_name": f"org/{name}", "command": "python", "args": [],
+                   "repo_url": origin.as_uri(), "repo_ref": "v2", "setup_script": f"echo {name}"}
+            for name in ("a", "b")
+        }}))
+        monkeypatch.chdir(project)
+        runs = []
+        for _ in range(2):
+            with mock.patch.object(MCPServers, "_run_setup_script") as mock_run_setup:
+                MCPServers(MCPServersParams(str(config_file)), global_cache=cache, background_setup=False)
+            runs.append(mock_run_setup.call_count)
+
+        assert runs == [2, 0]
+        entry = cache.entries()[0].path
+        assert len(cache.stamp_paths(entry)) == 2
+        cache.remove(entry)
+        assert cache.stamp_paths(entry) == []
+
+    def test_imported_bundle_skips_setup(self, tmp_path, origin, monkeypatch):
+        from mcphub.mcp_servers.bundle import export_bundle, import_bundle
+
+        project = tmp_path / "project"
+        project.mkdir()
+        config_file = project / ".mcphub.json"
+        config_file.write_text(json.dumps({"mcpServers": {"srv": {
+            "package_name": "org/srv", "command": "python", "args": [],
+            "repo_url": origin.as_uri(), "setup_script": "touch built",
+        }}}))
+        monkeypatch.chdir(project)
+        servers = MCPServers(MCPServersParams(str(config_file)), background_setup=False)
+        assert servers.setup_results["srv"].status == "succeeded"
+        export_bundle(servers.cache_dir, tmp_path / "bundle.tar.gz")
+
+        shutil.rmtree(servers.cache_dir)
+        import_bundle(tmp_path / "bundle.tar.gz", project / ".mcphub_cache")
+
+        with mock.patch.object(MCPServers, "_run_setup_script") as mock_run_setup:
+            servers = MCPServers(MCPServersParams(str(config_file)), background_setup=False)
+        mock_run_setup.assert_not_called()
+        assert servers.setup_results["srv"].status == "cached"
+        assert (servers.cache_dir / "org--srv" / "built").exists()
+
+    def test_update_fast_forwards_moved_repositories(self, tmp_path, origin, monkeypatch):
+        project = tmp_path / "project"
+        project.mkdir()
+        runs = tmp_path / "runs"
+        config_file = project / ".mcphub.json"
+        config_file.write_text(json.dumps({"mcpServers": {
+            "srv": {"package_name": "org/srv", "command": "python", "args": [],
+                    "repo_url": origin.as_uri(), "setup_script": f"echo run >> {runs}"},
+            "pinned": {"package_name": "org/pinned", "command": "python", "args": [],
+                       "repo_url": origin.as_uri(), "repo_ref": "v2", "setup_script": "true"},
+            "new": {"package_name": "org/new", "command": "python", "args": [],
+                    "repo_url": origin.as_uri()},
+        }}))
+        monkeypatch.chdir(project)
+        servers = MCPServers(MCPServersParams(str(config_file)), auto_setup=False)
+        servers.setup_servers(["srv", "pinned"])
+        servers.tool_catalog.put("srv", "fingerprint", [])
+        old_head = _git("rev-parse", "HEAD", cwd=origin)
+
+        results = servers.update_servers()
+        assert {name: r.status for name, r in results.items()} == \
+            {"srv": "unchanged", "pinned": "unchanged", "new": "skipped"}
+
+        (origin / "VERSION").write_text("4")
+        _git("commit", "--quiet", "-am", "v4", cwd=origin)
+        results = servers.update_servers()
+
+        assert results["srv"].status == "updated"
+        assert (results["srv"].old_head, results["srv"].new_head) == (old_head, _git("rev-parse", "HEAD", cwd=origin))
+        assert (servers.cache_dir / "org--srv" / "VERSION").read_text() == "4"
+        assert runs.read_text() == "run\nrun\n"
+        assert servers.tool_catalog.get("srv", "fingerprint") is None
+        assert results["pinned"].status == "unchanged"
+        assert (servers.cache_dir / "org--pinned" / "VERSION").read_text() == "2"
+
+
+class TestStreamingOutput:
+    def test_output_is_streamed_to_log_and_callback(self, tmp_path, mock_current_dir):
+        config_file = tmp_path / "servers.json"
+        _write_servers_config(config_file, 1)
+        lines = []
+        with mock.patch.object(MCPServers, "_setup_all_servers"):
+            servers = MCPServers(MCPServersParams(str(config_file)),
+                                 on_output=lambda name, line: lines.append((name, line)))
+        servers._log_context.server_name = "server-0"
+        script_dir = tmp_path / "repo"
+        script_dir.mkdir()
+
+        servers._run_setup_script(script_dir, "echo one; echo two >&2")
+
+        assert lines == [("server-0", "one"), ("server-0", "two")]
+        assert servers.log_path("server-0").read_text().splitlines()[1:] == ["one", "two"]
+
+    def test_failure_reports_bounded_tail(self, tmp_path):
+        from mcphub.mcp_servers.streaming import run_streaming
+
+        with pytest.raises(subprocess.CalledProcessError) as exc_info:
+            run_streaming(["bash", "-c", "for i in $(seq 1 1000); do echo line-$i; done; exit 3"],
+                          log_path=tmp_path / "out.log", tail_lines=5)
+
+        assert exc_info.value.returncode == 3
+        assert exc_info.value.stderr.splitlines() == [
+            "... 995 earlier lines omitted", "line-996", "line-997", "line-998", "line-999", "line-1000"
+        ]
+        assert len((tmp_path / "out.log").read_text().splitlines()) == 1001